@@ -1,20 +1,29 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends, status, File, UploadFile, Form, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends, status, File, UploadFile, Form, WebSocket, WebSocketDisconnect, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import FileResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
+import math
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, EmailStr, ValidationError
+from typing import List, Optional, Dict, Any, Union
 import uuid
 from datetime import datetime, timedelta
 from enum import Enum
 import bcrypt
 from jose import JWTError, jwt
 import json
+import hashlib
 import cloudinary
 import cloudinary.uploader
 import emails
@@ -22,7 +31,13 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 import io
 import base64
+import re
+import random
+import socket
+import unicodedata
 import pytz
+import numpy as np
+from bson import json_util
 
 # Dhaka timezone configuration
 DHAKA_TZ = pytz.timezone('Asia/Dhaka')
@@ -262,6 +277,7 @@ class OfferRequest(BaseModel):
     campaign_name: str
     campaign_type: str  # 'new' or 'existing'
     existing_campaign_id: Optional[str] = None
+    campaign_id: Optional[str] = None  # Resolved campaign link; every join uses this, see resolve_offer_campaign_id
     contract_duration: str
     estimated_budget: Optional[float] = None
     service_bundles: ServiceBundles
@@ -479,6 +495,7 @@ class MonitoringServiceSubscription(BaseModel):
     })
     service_level: str = "standard"  # standard, premium
     status: str = "active"  # active, paused, expired, cancelled
+    tasks_generated_through: Optional[datetime] = None  # Last scheduled date materialized as tasks
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -490,6 +507,7 @@ class MonitoringTask(BaseModel):
     status: TaskStatus = TaskStatus.PENDING
     priority: TaskPriority = TaskPriority.MEDIUM
     scheduled_date: datetime
+    scheduled_day: Optional[str] = None  # UTC YYYY-MM-DD of scheduled_date; one task per subscription, asset and day
     due_date: datetime
     completed_at: Optional[datetime] = None
     estimated_duration: int = 30  # minutes
@@ -598,6 +616,15 @@ class TaskAssignment(BaseModel):
     priority: Optional[TaskPriority] = None
     special_instructions: Optional[str] = None
 
+class GeoPoint(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
+
+class RouteOptimizationRequest(BaseModel):
+    date: str  # YYYY-MM-DD (UTC day of scheduled_date)
+    operator_id: Optional[str] = None  # Managers/admins pick the operator; operators get their own route
+    start_location: Optional[GeoPoint] = None  # where the operator sets out from
+
 class TaskUpdate(BaseModel):
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
@@ -643,6 +670,73 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so hashing never blocks the event loop.
+
+    bcrypt releases the GIL while it works, so threads give real parallelism here.
+    Admission is gated by a semaphore on the event loop side, which lets us report
+    how many calls are queued behind the pool.
+    """
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.active = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        enqueued_at = time.perf_counter()
+        # Only calls that actually have to wait for a worker count as queued
+        waiting = self._semaphore.locked()
+        if waiting:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            if waiting:
+                self.queued -= 1
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - enqueued_at
+        self.active += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(verify_password, password, hashed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queued,
+            "active": self.active,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait_seconds * 1000 / self.completed, 2) if self.completed else 0.0,
+            "avg_run_ms": round(self.total_run_seconds * 1000 / self.completed, 2) if self.completed else 0.0,
+        }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -653,6 +747,156 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# ====================================
+# PRINCIPAL CACHE & LAST LOGIN WRITE-BEHIND
+# ====================================
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '60'))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.environ.get('PRINCIPAL_CACHE_MAX_SIZE', '10000'))
+LAST_LOGIN_FLUSH_INTERVAL_SECONDS = float(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL_SECONDS', '30'))
+
+class TTLCache:
+    """TTL + size bounded in-process LRU cache with hit/miss counters.
+
+    Caches are per-process: explicit invalidation only reaches the current worker,
+    so the TTL bounds how long other workers can serve a stale entry.
+    """
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+class PrincipalCache(TTLCache):
+    """Resolved users keyed on the token subject"""
+    def get(self, user_id: str) -> Optional["User"]:
+        user = super().get(user_id)
+        # Hand out a copy so request handlers can't mutate the cached principal
+        return user.copy() if user is not None else None
+
+class LastLoginBuffer:
+    """Coalesces last_login stamps in memory and flushes them with one bulk_write"""
+    def __init__(self, flush_interval_seconds: float):
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending: Dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.flushes = 0
+        self.flushed_users = 0
+        self.flush_errors = 0
+
+    def record(self, user_id: str, timestamp: Optional[datetime] = None):
+        self._pending[user_id] = timestamp or datetime.utcnow()
+        self.recorded += 1
+
+    def discard(self, user_id: str):
+        self._pending.pop(user_id, None)
+
+    async def flush(self) -> int:
+        """Write all pending timestamps; failed batches are re-queued unless superseded"""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        operations = [
+            UpdateOne({"id": user_id}, {"$max": {"last_login": timestamp}})
+            for user_id, timestamp in batch.items()
+        ]
+        try:
+            await db.users.bulk_write(operations, ordered=False)
+        except Exception as e:
+            self.flush_errors += 1
+            logger.error(f"Error flushing last_login buffer: {e}")
+            for user_id, timestamp in batch.items():
+                self._pending.setdefault(user_id, timestamp)
+            return 0
+        self.flushes += 1
+        self.flushed_users += len(batch)
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "flushed_users": self.flushed_users,
+            "flush_errors": self.flush_errors,
+        }
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
+last_login_buffer = LastLoginBuffer(LAST_LOGIN_FLUSH_INTERVAL_SECONDS)
+
+def invalidate_principal(user_id: str):
+    """Drop a cached principal after its user document changes"""
+    principal_cache.invalidate(user_id)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -667,17 +911,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except JWTError:
         raise credentials_exception
     
-    user = await db.users.find_one({"id": user_id})
-    if user is None:
-        raise credentials_exception
+    user_obj = principal_cache.get(user_id)
+    if user_obj is None:
+        user = await db.users.find_one({"id": user_id})
+        if user is None:
+            raise credentials_exception
+        user_obj = User(**user)
+        principal_cache.set(user_id, user_obj)
     
-    # Update last login
-    await db.users.update_one(
-        {"id": user_id},
-        {"$set": {"last_login": datetime.utcnow()}}
-    )
+    # Update last login (coalesced and flushed in the background)
+    last_login_buffer.record(user_id)
     
-    return User(**user)
+    return user_obj
 
 async def require_admin(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
@@ -737,6 +982,569 @@ def clean_mongodb_doc(doc):
     else:
         return doc
 
+# ====================================
+# MARKETPLACE VISIBILITY
+# ====================================
+
+# Existing Assets only appear in the marketplace while they are in one of these statuses
+MARKETPLACE_VISIBLE_STATUSES = [AssetStatus.LIVE.value, AssetStatus.AVAILABLE.value, AssetStatus.PENDING_OFFER.value]
+
+# Aggregation-expression form of is_marketplace_visible, evaluated server-side in pipeline updates
+MARKETPLACE_VISIBLE_EXPR = {"$or": [
+    # Public Assets (explicit category, or missing/null/empty category for legacy assets)
+    {"$in": [{"$ifNull": ["$category", ""]}, [AssetCategory.PUBLIC.value, ""]]},
+    # Existing Assets ONLY if shown in marketplace and in a visible status
+    {"$and": [
+        {"$eq": ["$category", AssetCategory.EXISTING_ASSET.value]},
+        {"$eq": ["$show_in_marketplace", True]},
+        {"$in": ["$status", MARKETPLACE_VISIBLE_STATUSES]}
+    ]}
+]}
+
+def is_marketplace_visible(asset: dict) -> bool:
+    """Marketplace visibility rule: never Private Assets, always Public/legacy assets,
+    Existing Assets only when show_in_marketplace is set and the status is visible"""
+    category = asset.get("category")
+    if category in (None, "", AssetCategory.PUBLIC.value):
+        return True
+    if category == AssetCategory.EXISTING_ASSET.value:
+        return asset.get("show_in_marketplace") is True and asset.get("status") in MARKETPLACE_VISIBLE_STATUSES
+    return False
+
+def with_marketplace_visibility(set_fields: dict) -> list:
+    """Build a pipeline update that applies set_fields and recomputes marketplace_visible
+    from the resulting document in the same write"""
+    return [
+        {"$set": {key: {"$literal": value} for key, value in set_fields.items()}},
+        {"$set": {"marketplace_visible": MARKETPLACE_VISIBLE_EXPR}}
+    ]
+
+async def backfill_marketplace_visibility(only_missing: bool = True) -> int:
+    """Materialize marketplace_visible on stored assets (idempotent)"""
+    query = {"marketplace_visible": {"$exists": False}} if only_missing else {}
+    result = await db.assets.update_many(query, [{"$set": {"marketplace_visible": MARKETPLACE_VISIBLE_EXPR}}])
+    return result.modified_count
+
+# ====================================
+# GEOSPATIAL
+# ====================================
+
+def to_geojson_point(location: Optional[dict]) -> Optional[dict]:
+    """Convert a {lat, lng} location into a GeoJSON Point (None when missing or out of range)"""
+    if not isinstance(location, dict):
+        return None
+    try:
+        lat, lng = float(location["lat"]), float(location["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+# Aggregation-expression form of to_geojson_point, for server-side backfills
+GEO_LOCATION_EXPR = {"$cond": {
+    "if": {"$and": [
+        {"$isNumber": "$location.lat"},
+        {"$isNumber": "$location.lng"},
+        {"$gte": ["$location.lat", -90]}, {"$lte": ["$location.lat", 90]},
+        {"$gte": ["$location.lng", -180]}, {"$lte": ["$location.lng", 180]}
+    ]},
+    "then": {"type": "Point", "coordinates": ["$location.lng", "$location.lat"]},
+    "else": None
+}}
+
+async def backfill_geo_locations() -> int:
+    """Materialize geo_location from location on assets that don't have it yet"""
+    result = await db.assets.update_many(
+        {"geo_location": {"$exists": False}},
+        [{"$set": {"geo_location": GEO_LOCATION_EXPR}}]
+    )
+    return result.modified_count
+
+BBOX_EDGE_MARGIN_DEGREES = 1e-6  # Absorbs float error where a padded edge just touches the bbox
+
+def parse_bbox(bbox: str) -> tuple:
+    """Parse "west,south,east,north" (degrees) into floats"""
+    try:
+        west, south, east, north = [float(part) for part in bbox.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'west,south,east,north'")
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range or empty")
+    return west, south, east, north
+
+def geodesic_edge_latitude(lat: float, span: float) -> float:
+    """Latitude whose great-circle edge over `span` degrees of longitude peaks at `lat`"""
+    return math.degrees(math.atan(math.tan(math.radians(lat)) * math.cos(math.radians(span) / 2)))
+
+def bbox_geometry(west: float, south: float, east: float, north: float) -> dict:
+    """GeoJSON polygon covering a bbox (spanning less than 180 degrees of longitude).
+
+    MongoDB treats polygon edges as great circles, so an edge at constant latitude
+    bows towards the pole and would cut off points just inside the equatorward side.
+    Equatorward edges are moved out until their great circle clears the bbox; callers
+    still filter exact coordinate ranges.
+    """
+    if south > 0:
+        south = geodesic_edge_latitude(south, east - west) - BBOX_EDGE_MARGIN_DEGREES
+    if north < 0:
+        north = geodesic_edge_latitude(north, east - west) + BBOX_EDGE_MARGIN_DEGREES
+    return {"type": "Polygon", "coordinates": [[
+        [west, south], [east, south], [east, north], [west, north], [west, south]
+    ]]}
+
+def geo_coordinate_range_stage(west: float, south: float, east: float, north: float) -> dict:
+    """Exact lng/lat range check for points matched by a padded bbox_geometry"""
+    lng = {"$arrayElemAt": ["$geo_location.coordinates", 0]}
+    lat = {"$arrayElemAt": ["$geo_location.coordinates", 1]}
+    return {"$match": {"$expr": {"$and": [
+        {"$gte": [lng, west]}, {"$lte": [lng, east]},
+        {"$gte": [lat, south]}, {"$lte": [lat, north]}
+    ]}}}
+
+# Distance kernel: one vectorized haversine shared by GPS verification, batch
+# re-verification and route planning. Inputs are degrees and broadcast like NumPy arrays.
+EARTH_RADIUS_METERS = 6371000
+GPS_DISTANCE_UNKNOWN = 999.0  # Reported when either location is missing or malformed
+GPS_VERIFICATION_RADIUS_METERS = 50.0
+
+def haversine_distances(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distances in meters between (lat1, lng1) and (lat2, lng2), elementwise"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def haversine_matrix(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Pairwise distances in meters between the given points"""
+    lats, lngs = np.asarray(lats, dtype=float), np.asarray(lngs, dtype=float)
+    return haversine_distances(lats[:, None], lngs[:, None], lats[None, :], lngs[None, :])
+
+def location_arrays(locations: List[Optional[dict]]) -> tuple:
+    """(lats, lngs) arrays for {lat, lng} dicts; missing or malformed entries become NaN"""
+    lats = np.full(len(locations), np.nan)
+    lngs = np.full(len(locations), np.nan)
+    for index, location in enumerate(locations):
+        try:
+            lats[index], lngs[index] = float(location["lat"]), float(location["lng"])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return lats, lngs
+
+# ====================================
+# ASSET SEARCH
+# ====================================
+
+# Every word of the searchable fields is materialized as its edge n-grams in
+# search_terms, so prefix queries ("gul" -> Gulshan, "dhanm" -> Dhanmondi) are plain
+# multikey index lookups instead of unanchored regex scans. Bangla script is kept.
+SEARCH_FIELDS = ["name", "address", "area", "district", "division", "description"]
+SEARCH_MIN_PREFIX = 2
+SEARCH_MAX_PREFIX = 15
+SEARCH_TOKEN_RE = re.compile(r"[\w\u0980-\u09FF]+")
+
+def tokenize_search_text(text) -> List[str]:
+    return SEARCH_TOKEN_RE.findall(unicodedata.normalize("NFKC", str(text)).casefold())
+
+def build_search_fields(asset: dict) -> dict:
+    """search_terms (edge n-grams) and search_tokens (whole words) for an asset document"""
+    tokens = set()
+    for field in SEARCH_FIELDS:
+        if asset.get(field):
+            tokens.update(tokenize_search_text(asset[field]))
+    terms = {
+        token[:end]
+        for token in tokens
+        for end in range(SEARCH_MIN_PREFIX, min(len(token), SEARCH_MAX_PREFIX) + 1)
+    }
+    return {"search_terms": sorted(terms), "search_tokens": sorted(tokens)}
+
+def search_query_terms(q: Optional[str]) -> List[str]:
+    """Query words usable as prefixes (too-short words are dropped, long ones truncated)"""
+    terms = []
+    for token in tokenize_search_text(q or ""):
+        term = token[:SEARCH_MAX_PREFIX]
+        if len(term) >= SEARCH_MIN_PREFIX and term not in terms:
+            terms.append(term)
+    return terms
+
+def build_search_score(q: str) -> dict:
+    """Relevance: a word matching the start of a word in the name scores 2, an exact
+    word anywhere scores 1, on top of the prefix match every result already has"""
+    scores = []
+    for token in tokenize_search_text(q):
+        if len(token) < SEARCH_MIN_PREFIX:
+            continue
+        scores.append({"$cond": [
+            {"$regexMatch": {"input": {"$ifNull": ["$name", ""]}, "regex": f"(^|\\W){re.escape(token)}", "options": "i"}},
+            2, 0
+        ]})
+        scores.append({"$cond": [{"$in": [token, {"$ifNull": ["$search_tokens", []]}]}, 1, 0]})
+    return {"$add": scores or [0]}
+
+async def backfill_search_fields(batch_size: int = 500) -> int:
+    """Materialize search_terms on assets that don't have them yet"""
+    updated = 0
+    operations = []
+    projection = {"_id": 0, "id": 1, **{field: 1 for field in SEARCH_FIELDS}}
+    async for asset in db.assets.find({"search_terms": {"$exists": False}}, projection):
+        operations.append(UpdateOne({"id": asset["id"]}, {"$set": build_search_fields(asset)}))
+        if len(operations) >= batch_size:
+            updated += (await db.assets.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await db.assets.bulk_write(operations, ordered=False)).modified_count
+    return updated
+
+# ====================================
+# PUBLIC RESPONSE CACHE (ETag / 304)
+# ====================================
+
+PUBLIC_RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('PUBLIC_RESPONSE_CACHE_TTL_SECONDS', '60'))
+PUBLIC_RESPONSE_CACHE_MAX_SIZE = int(os.environ.get('PUBLIC_RESPONSE_CACHE_MAX_SIZE', '512'))
+
+DATA_VERSION_REFRESH_SECONDS = float(os.environ.get('DATA_VERSION_REFRESH_SECONDS', '1'))
+DATA_VERSION_ID = "public"
+
+class ResponseCache(TTLCache):
+    """Serialized JSON bodies for public endpoints, tagged with the data version they were built at.
+
+    The data version is a counter in the data_versions collection shared by every worker;
+    each asset, offer or campaign write path bumps it once, after its last write. ETags are
+    the version plus a hash of the cache key, so If-None-Match is answered before any body
+    is looked up or rebuilt. Concurrent misses for the same key share one computation.
+    """
+    def __init__(self, ttl_seconds: float, max_size: int):
+        super().__init__(ttl_seconds, max_size)
+        self.data_version = 0
+        self.version_checked_at = 0.0
+        self.coalesced = 0
+        self.not_modified = 0
+        self._inflight: Dict[Any, asyncio.Future] = {}
+
+    def observe(self, version: int):
+        """Adopt a version read from (or just written to) the shared counter"""
+        self.version_checked_at = time.monotonic()
+        if version > self.data_version:
+            self.data_version = version
+            self.clear()
+
+    def bump(self):
+        """Local-only invalidation, used when the shared counter can't be reached"""
+        self.data_version += 1
+        self.clear()
+
+    async def get_or_compute(self, key, compute, version: int) -> bytes:
+        """Return the body for key at version, running compute() at most once per miss"""
+        entry = self.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        task = self._inflight.get((key, version))
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, compute, version))
+            self._inflight[(key, version)] = task
+            task.add_done_callback(lambda done: self._settle((key, version), done))
+        else:
+            self.coalesced += 1
+        # Shielded so one client disconnecting doesn't cancel the fill for the others
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, compute, version: int) -> bytes:
+        body = json.dumps(jsonable_encoder(await compute()), separators=(",", ":")).encode()
+        # A write landed while computing: serve the result but don't cache it
+        if self.data_version == version:
+            self.set(key, (version, body))
+        return body
+
+    def _settle(self, inflight_key, task: asyncio.Future):
+        self._inflight.pop(inflight_key, None)
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "data_version": self.data_version,
+            "coalesced": self.coalesced,
+            "not_modified": self.not_modified,
+            "inflight": len(self._inflight),
+        }
+
+public_response_cache = ResponseCache(PUBLIC_RESPONSE_CACHE_TTL_SECONDS, PUBLIC_RESPONSE_CACHE_MAX_SIZE)
+
+async def current_data_version() -> int:
+    """Shared data version, re-read at most every DATA_VERSION_REFRESH_SECONDS per worker"""
+    cache = public_response_cache
+    if time.monotonic() - cache.version_checked_at >= DATA_VERSION_REFRESH_SECONDS:
+        doc = await db.data_versions.find_one({"_id": DATA_VERSION_ID})
+        cache.observe(doc["version"] if doc else 0)
+    return cache.data_version
+
+async def bump_data_version():
+    """Invalidate cached public responses on every worker after an asset, offer or campaign write"""
+    try:
+        doc = await db.data_versions.find_one_and_update(
+            {"_id": DATA_VERSION_ID},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=True
+        )
+        public_response_cache.observe(doc["version"])
+    except Exception as e:
+        # The write itself succeeded; other workers catch up when their entries expire
+        logger.warning(f"Could not bump shared data version: {str(e)}")
+        public_response_cache.bump()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def public_etag(key, version: int) -> str:
+    return f'"{version}-{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}"'
+
+async def cached_json_response(request: Request, key, compute) -> Response:
+    """Serve a public response by data version: 304 when If-None-Match is current (no body
+    lookup or Mongo query beyond the version check), otherwise the cached or rebuilt body
+    """
+    version = await current_data_version()
+    etag = public_etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        public_response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    body = await public_response_cache.get_or_compute(key, compute, version)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ====================================
+# MAP CLUSTERING
+# ====================================
+
+# Tiles are equirectangular: at zoom z the world is split into 2^z x 2^z tiles of
+# 360/2^z degrees longitude by 180/2^z degrees latitude, each further split into
+# CLUSTER_GRID_SIZE x CLUSTER_GRID_SIZE cells. Assets in the same cell form one cluster.
+CLUSTER_GRID_SIZE = int(os.environ.get('CLUSTER_GRID_SIZE', '8'))
+CLUSTER_CACHE_TTL_SECONDS = float(os.environ.get('CLUSTER_CACHE_TTL_SECONDS', '300'))
+CLUSTER_CACHE_MAX_TILES = int(os.environ.get('CLUSTER_CACHE_MAX_TILES', '20000'))
+CLUSTER_MAX_TILES_PER_REQUEST = 256
+CLUSTER_MAX_ZOOM = 20
+
+cluster_cache = TTLCache(CLUSTER_CACHE_TTL_SECONDS, CLUSTER_CACHE_MAX_TILES)
+
+async def invalidate_asset_caches():
+    """Drop cached derived views after an asset's location or visibility may have changed"""
+    cluster_cache.clear()
+    await bump_data_version()
+
+def tile_size_degrees(zoom: int) -> tuple:
+    tiles = 2 ** zoom
+    return 360.0 / tiles, 180.0 / tiles
+
+def tile_range_for_bbox(west: float, south: float, east: float, north: float, zoom: int) -> tuple:
+    """Inclusive (x0, y0, x1, y1) tile range covering a bbox; y grows southwards"""
+    tiles = 2 ** zoom
+    tile_w, tile_h = tile_size_degrees(zoom)
+    x0 = min(tiles - 1, max(0, int((west + 180) // tile_w)))
+    x1 = min(tiles - 1, max(0, int((east + 180) // tile_w)))
+    y0 = min(tiles - 1, max(0, int((90 - north) // tile_h)))
+    y1 = min(tiles - 1, max(0, int((90 - south) // tile_h)))
+    return x0, y0, x1, y1
+
+async def compute_tile_clusters(zoom: int, x0: int, y0: int, x1: int, y1: int) -> Dict[tuple, list]:
+    """Cluster marketplace-visible assets in a rectangle of tiles with one aggregation"""
+    tile_w, tile_h = tile_size_degrees(zoom)
+    cell_w, cell_h = tile_w / CLUSTER_GRID_SIZE, tile_h / CLUSTER_GRID_SIZE
+    west, east = -180 + x0 * tile_w, -180 + (x1 + 1) * tile_w
+    north, south = 90 - y0 * tile_h, 90 - (y1 + 1) * tile_h
+    
+    match = {"marketplace_visible": True}
+    if east - west < 180 and north - south < 90:
+        match["geo_location"] = {"$geoWithin": {"$geometry": bbox_geometry(west, south, east, north)}}
+    else:
+        # GeoJSON polygons can't span a hemisphere; the cell range check below bounds it
+        match["geo_location"] = {"$ne": None}
+    
+    lng = {"$arrayElemAt": ["$geo_location.coordinates", 0]}
+    lat = {"$arrayElemAt": ["$geo_location.coordinates", 1]}
+    pipeline = [
+        {"$match": match},
+        {"$project": {
+            "id": 1,
+            "type": 1,
+            "lng": lng,
+            "lat": lat,
+            "cx": {"$floor": {"$divide": [{"$add": [lng, 180]}, cell_w]}},
+            "cy": {"$floor": {"$divide": [{"$subtract": [90, lat]}, cell_h]}}
+        }},
+        {"$match": {
+            "cx": {"$gte": x0 * CLUSTER_GRID_SIZE, "$lt": (x1 + 1) * CLUSTER_GRID_SIZE},
+            "cy": {"$gte": y0 * CLUSTER_GRID_SIZE, "$lt": (y1 + 1) * CLUSTER_GRID_SIZE}
+        }},
+        {"$group": {
+            "_id": {"cx": "$cx", "cy": "$cy", "type": "$type"},
+            "count": {"$sum": 1},
+            "sum_lng": {"$sum": "$lng"},
+            "sum_lat": {"$sum": "$lat"},
+            "asset_id": {"$first": "$id"}
+        }},
+        {"$group": {
+            "_id": {"cx": "$_id.cx", "cy": "$_id.cy"},
+            "count": {"$sum": "$count"},
+            "sum_lng": {"$sum": "$sum_lng"},
+            "sum_lat": {"$sum": "$sum_lat"},
+            "types": {"$push": {"type": "$_id.type", "count": "$count"}},
+            "asset_id": {"$first": "$asset_id"}
+        }}
+    ]
+    cells = await db.assets.aggregate(pipeline).to_list(None)
+    
+    clusters_by_tile = {(zoom, x, y): [] for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)}
+    for cell in cells:
+        cx, cy = int(cell["_id"]["cx"]), int(cell["_id"]["cy"])
+        count = cell["count"]
+        cluster = {
+            "lat": round(cell["sum_lat"] / count, 6),
+            "lng": round(cell["sum_lng"] / count, 6),
+            "count": count,
+            "types": {t["type"]: t["count"] for t in cell["types"]},
+        }
+        if count == 1:
+            cluster["asset_id"] = cell["asset_id"]
+        clusters_by_tile[(zoom, cx // CLUSTER_GRID_SIZE, cy // CLUSTER_GRID_SIZE)].append(cluster)
+    return clusters_by_tile
+
+# ====================================
+# BACKGROUND JOBS & TRANSACTIONS
+# ====================================
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-run
+_background_tasks: set = set()
+_transactions_supported: Optional[bool] = None
+
+def spawn_background_task(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def transactions_supported() -> bool:
+    """Multi-document transactions need a replica set or mongos; probed once per process"""
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await client.admin.command("hello")
+            _transactions_supported = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception as e:
+            logger.warning(f"Could not detect replica set, running without transactions: {e}")
+            _transactions_supported = False
+    return _transactions_supported
+
+async def create_job(job_type: str, params: dict) -> dict:
+    """Record a background job; its progress is persisted so any worker can report it"""
+    now = datetime.utcnow()
+    job = {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "params": params,
+        "status": "queued",
+        "progress": {"done": 0, "total": None},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now
+    }
+    await db.jobs.insert_one(dict(job))
+    return job
+
+async def update_job(job_id: str, **fields):
+    fields["updated_at"] = datetime.utcnow()
+    await db.jobs.update_one({"id": job_id}, {"$set": fields})
+
+def run_job(job: dict, work) -> asyncio.Task:
+    """Run work(progress) in the background, where progress(done, total) records progress"""
+    async def report_progress(done: int, total: int):
+        await update_job(job["id"], progress={"done": done, "total": total})
+    
+    async def runner():
+        await update_job(job["id"], status="running", started_at=datetime.utcnow())
+        try:
+            result = await work(report_progress)
+            await update_job(job["id"], status="completed", result=result, finished_at=datetime.utcnow())
+        except Exception as e:
+            logger.exception(f"Background job {job['id']} ({job['type']}) failed")
+            await update_job(job["id"], status="failed", error=str(e), finished_at=datetime.utcnow())
+    
+    return spawn_background_task(runner())
+
+async def ensure_indexes():
+    """Create the indexes the API queries rely on (no-op when they already exist)"""
+    await db.assets.create_index(
+        [("marketplace_visible", 1), ("type", 1), ("division", 1), ("status", 1)],
+        name="marketplace_visible_type_division_status"
+    )
+    await db.offer_requests.create_index(
+        [("asset_id", 1), ("status", 1), ("created_at", -1)],
+        name="asset_id_status_created_at"
+    )
+    await db.assets.create_index(
+        [("geo_location", "2dsphere"), ("marketplace_visible", 1)],
+        name="geo_location_2dsphere_marketplace_visible"
+    )
+    await db.assets.create_index(
+        [("search_terms", 1), ("marketplace_visible", 1)],
+        name="search_terms_marketplace_visible"
+    )
+    # Offers join campaigns by campaign_id alone; (buyer_id, campaign_name) links offers
+    # to a campaign created after them
+    await db.offer_requests.create_index("campaign_id")
+    await db.offer_requests.create_index([("buyer_id", 1), ("campaign_name", 1)])
+    await db.campaigns.create_index([("buyer_id", 1), ("created_at", -1), ("id", -1)])
+    # Admin offer queue: filtered by status, or the unfiltered newest-first list
+    await db.offer_requests.create_index([("status", 1), ("created_at", -1), ("id", -1)])
+    await db.offer_requests.create_index([("created_at", -1), ("id", -1)])
+    await db.jobs.create_index("id", unique=True)
+    for collection in (db.assets, db.campaigns, db.offer_requests):
+        await collection.create_index("id")
+    await db.assets.create_index([("buyer_id", 1), ("status", 1)])
+    await db.assets.create_index([("seller_id", 1), ("id", 1)])
+    await db.monitoring_records.create_index([("asset_id", 1), ("inspection_date", -1)])
+    await db.monitoring_subscriptions.create_index([("status", 1), ("tasks_generated_through", 1)])
+    await db.monitoring_subscriptions.create_index([("status", 1), ("end_date", 1)])
+    await db.monitoring_tasks.create_index([("status", 1), ("due_date", 1)])
+    await db.monitoring_tasks.create_index([("assigned_operator_id", 1), ("scheduled_date", 1)])
+    # One task per subscription, asset and day; legacy tasks without scheduled_day are exempt
+    await db.monitoring_tasks.create_index(
+        [("subscription_id", 1), ("asset_id", 1), ("scheduled_day", 1)],
+        name="subscription_id_asset_id_scheduled_day",
+        unique=True,
+        partialFilterExpression={"scheduled_day": {"$type": "string"}}
+    )
+
+async def run_startup_migrations():
+    """Apply idempotent data migrations before serving requests"""
+    backfilled = await backfill_marketplace_visibility()
+    if backfilled:
+        logger.info(f"Backfilled marketplace_visible on {backfilled} assets")
+    backfilled = await backfill_geo_locations()
+    if backfilled:
+        logger.info(f"Backfilled geo_location on {backfilled} assets")
+    backfilled = await backfill_search_fields()
+    if backfilled:
+        logger.info(f"Backfilled search terms on {backfilled} assets")
+    backfilled = await backfill_offer_request_defaults()
+    if backfilled:
+        logger.info(f"Backfilled legacy defaults on {backfilled} offer request fields")
+    backfilled = await backfill_task_scheduled_days()
+    if backfilled:
+        logger.info(f"Backfilled scheduled_day on {backfilled} monitoring tasks")
+    backfilled = await backfill_monitoring_horizons()
+    if backfilled:
+        logger.info(f"Backfilled tasks_generated_through on {backfilled} monitoring subscriptions")
+    backfilled = await backfill_offer_campaign_ids()
+    if backfilled:
+        logger.info(f"Backfilled campaign_id on {backfilled} offer requests")
+    await reconcile_campaign_counters()
+
 # Email notification functions
 def send_notification_email(to_email: str, subject: str, content: str):
     """Send notification email (demo implementation)"""
@@ -800,8 +1608,9 @@ async def update_assets_status_for_campaign(campaign_id: str, campaign_status: s
     # Update all assets in the campaign
     await db.assets.update_many(
         {"id": {"$in": asset_ids}},
-        {"$set": {"status": new_asset_status, "updated_at": datetime.utcnow()}}
+        with_marketplace_visibility({"status": new_asset_status, "updated_at": datetime.utcnow()})
     )
+    await invalidate_asset_caches()
     
     logger.info(f"Updated {len(asset_ids)} assets to status '{new_asset_status}' for campaign {campaign_id}")
 
@@ -829,6 +1638,7 @@ async def update_campaign_status(
         {"id": campaign_id},
         {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
     )
+    await bump_data_version()
     
     # Update asset statuses based on campaign status
     await update_assets_status_for_campaign(campaign_id, new_status)
@@ -843,13 +1653,15 @@ async def init_bangladesh_sample_data():
     await db.assets.delete_many({})
     await db.campaigns.delete_many({})
     await db.offer_requests.delete_many({})
+    await invalidate_asset_caches()
     await db.users.delete_many({})
+    principal_cache.clear()
     
     # Create only admin user
     admin_user = {
         "id": str(uuid.uuid4()),
         "email": "admin@beatspace.com",
-        "password_hash": hash_password("admin123"),
+        "password_hash": await password_hasher.hash("admin123"),
         "company_name": "BeatSpace Admin",
         "contact_name": "System Administrator",
         "phone": "+8801234567890",
@@ -958,6 +1770,9 @@ async def create_dummy_booked_assets_data():
     
     # Insert booked assets
     for asset in booked_assets:
+        asset["marketplace_visible"] = is_marketplace_visible(asset)
+        asset["geo_location"] = to_geojson_point(asset.get("location"))
+        asset.update(build_search_fields(asset))
         await db.assets.insert_one(asset)
     
     # Create Live campaigns with booked assets
@@ -1029,6 +1844,7 @@ async def create_dummy_booked_assets_data():
         "campaign_type": "existing",
         "campaign_name": "Weekend Data Pack Promotion",
         "existing_campaign_id": campaign2_id,
+        "campaign_id": campaign2_id,
         "contract_duration": "1_month",
         "estimated_budget": 45000,
         "service_bundles": {
@@ -1044,6 +1860,8 @@ async def create_dummy_booked_assets_data():
     }
     
     await db.offer_requests.insert_one(offer_request)
+    await apply_campaign_counter_change(None, offer_request)
+    await invalidate_asset_caches()
     
     print("✅ Dummy booked assets data created successfully!")
     print(f"📊 Created {len(booked_assets)} assets (3 Booked, 1 Available)")
@@ -1064,6 +1882,10 @@ async def create_dummy_data(current_user: User = Depends(get_current_user)):
 async def startup_event():
     """Initialize only essential admin user for production - NO DUMMY DATA"""
     await init_essential_users_only()
+    await ensure_indexes()
+    await run_startup_migrations()
+    last_login_buffer.start()
+    scheduler.start()
 
 async def init_essential_users_only():
     """Initialize only essential admin user for production - NO DUMMY DATA"""
@@ -1076,7 +1898,7 @@ async def init_essential_users_only():
         admin_user = {
             "id": str(uuid.uuid4()),
             "email": "admin@beatspace.com",
-            "password_hash": hash_password("admin123"),
+            "password_hash": await password_hasher.hash("admin123"),
             "company_name": "BeatSpace Admin",
             "contact_name": "System Administrator",
             "phone": "+8801234567890",
@@ -1098,7 +1920,7 @@ async def register_user(user_data: UserCreate):
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     user_dict = user_data.dict()
     del user_dict['password']
     user = User(**user_dict)
@@ -1124,7 +1946,7 @@ async def register_user(user_data: UserCreate):
 @api_router.post("/auth/login", response_model=Token)
 async def login_user(login_data: UserLogin):
     user = await db.users.find_one({"email": login_data.email})
-    if not user or not verify_password(login_data.password, user['password_hash']):
+    if not user or not await password_hasher.verify(login_data.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     if user['status'] != UserStatus.APPROVED:
@@ -1145,46 +1967,250 @@ async def login_user(login_data: UserLogin):
     }
 
 # Phase 3: Advanced Admin Routes
-@api_router.get("/admin/offer-requests", response_model=List[OfferRequest])
-async def get_offer_requests(admin_user: User = Depends(require_admin)):
-    """Get all offer requests for admin mediation"""
-    requests = await db.offer_requests.find().to_list(1000)
-    
-    # Clean and validate offer requests, handling missing fields gracefully
-    valid_requests = []
-    for req in requests:
+# ============= ADMIN OFFER QUEUE =============
+
+# Legacy offer requests predate these fields; backfill_offer_request_defaults writes them
+# once so reads can validate documents as stored
+OFFER_REQUEST_DEFAULTS = {
+    "campaign_name": "Legacy Campaign",
+    "campaign_type": "existing",
+    "contract_duration": "1_month",
+    "service_bundles": {"printing": False, "setup": False, "monitoring": False},
+}
+# Defaults copied from another field: field -> (source expression, fallback)
+OFFER_REQUEST_DERIVED_DEFAULTS = {
+    "buyer_name": ("$buyer_id", "Unknown Buyer"),
+    "asset_name": ("$asset_id", "Unknown Asset"),
+}
+# Only the fields the mediation panel renders (everything OfferRequest serializes)
+ADMIN_OFFER_REQUEST_PROJECTION = {"_id": 0, **{field: 1 for field in OfferRequest.model_fields}}
+# Asset offers carry no request_type; other request types store theirs explicitly
+ASSET_OFFER_REQUEST_TYPE = "asset_offer"
+
+class OfferRequestPage(BaseModel):
+    items: List[OfferRequest]
+    total: int
+    next_cursor: Optional[str] = None
+    limit: int
+
+async def backfill_offer_request_defaults() -> int:
+    """Write the legacy defaults onto offer requests missing them (idempotent)"""
+    updated = 0
+    for field, value in OFFER_REQUEST_DEFAULTS.items():
+        result = await db.offer_requests.update_many({field: {"$exists": False}}, {"$set": {field: value}})
+        updated += result.modified_count
+    for field, (source, fallback) in OFFER_REQUEST_DERIVED_DEFAULTS.items():
+        result = await db.offer_requests.update_many(
+            {field: {"$exists": False}}, [{"$set": {field: {"$ifNull": [source, fallback]}}}]
+        )
+        updated += result.modified_count
+    return updated
+
+def build_admin_offer_request_query(
+    status: Optional[str],
+    request_type: Optional[str],
+    buyer_id: Optional[str],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+) -> dict:
+    """Mongo filter for the admin offer queue; status accepts a comma-separated list"""
+    query = {}
+    if status:
+        statuses = [value.strip() for value in status.split(",") if value.strip()]
+        query["status"] = statuses[0] if len(statuses) == 1 else {"$in": statuses}
+    if request_type:
+        query["request_type"] = None if request_type == ASSET_OFFER_REQUEST_TYPE else request_type
+    if buyer_id:
+        query["buyer_id"] = buyer_id
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lte"] = created_to
+    return query
+
+def validate_offer_requests(docs: list) -> List[OfferRequest]:
+    """Build OfferRequest models, skipping documents the backfill could not repair"""
+    offer_requests = []
+    for doc in docs:
         try:
-            # Clean MongoDB document
-            cleaned_req = clean_mongodb_doc(req)
-            
-            # Ensure required fields exist with defaults
-            if 'buyer_name' not in cleaned_req:
-                cleaned_req['buyer_name'] = cleaned_req.get('buyer_id', 'Unknown Buyer')
-            if 'asset_name' not in cleaned_req:
-                cleaned_req['asset_name'] = cleaned_req.get('asset_id', 'Unknown Asset')
-            if 'campaign_name' not in cleaned_req:
-                cleaned_req['campaign_name'] = 'Legacy Campaign'
-            if 'campaign_type' not in cleaned_req:
-                cleaned_req['campaign_type'] = 'existing'
-            if 'contract_duration' not in cleaned_req:
-                cleaned_req['contract_duration'] = '1_month'
-            if 'service_bundles' not in cleaned_req:
-                cleaned_req['service_bundles'] = {
-                    'printing': False,
-                    'setup': False,
-                    'monitoring': False
-                }
-            
-            # Create OfferRequest object
-            offer_request = OfferRequest(**cleaned_req)
-            valid_requests.append(offer_request)
-            
-        except Exception as e:
-            # Log the error but continue processing other requests
-            print(f"⚠️  Skipping invalid offer request {req.get('id', 'unknown')}: {str(e)}")
-            continue
-    
-    return valid_requests
+            offer_requests.append(OfferRequest.model_validate(doc))
+        except ValidationError as e:
+            logger.warning(f"Skipping invalid offer request {doc.get('id', 'unknown')}: {e.error_count()} errors")
+    return offer_requests
+
+@api_router.get("/admin/offer-requests", response_model=Union[List[OfferRequest], OfferRequestPage])
+async def get_offer_requests_admin(
+    status: Optional[str] = Query(None, description="Status or comma-separated statuses"),
+    request_type: Optional[str] = Query(None, description="'asset_offer' or a stored request_type such as 'monitoring_service'"),
+    buyer_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; enables paginated response"),
+    admin_user: User = Depends(require_admin)
+):
+    """Get offer requests for admin mediation, newest first
+    
+    Filters run server-side on the (status, created_at) index. Without limit the legacy
+    list (capped at 1000) is returned; with limit the response is {items, total, next_cursor, limit}.
+    """
+    query = build_admin_offer_request_query(status, request_type, buyer_id, created_from, created_to)
+    if limit is None:
+        docs = await db.offer_requests.find(query, ADMIN_OFFER_REQUEST_PROJECTION).sort(
+            [("created_at", -1), ("id", -1)]
+        ).to_list(1000)
+        return validate_offer_requests(docs)
+    
+    docs, next_cursor = await fetch_newest_page(db.offer_requests, query, cursor, limit, ADMIN_OFFER_REQUEST_PROJECTION)
+    total = await db.offer_requests.count_documents(query)
+    return {"items": validate_offer_requests(docs), "total": total, "next_cursor": next_cursor, "limit": limit}
+
+# ============= OFFER STATE MACHINE =============
+
+# Every offer transition is a single conditional find_one_and_update matching the statuses
+# it may start from, so of two concurrent actions on one offer only the first applies; the
+# other gets a 409. Asset and campaign side effects then go out as one write per collection.
+OFFER_OPEN_STATUSES = ["Pending", "Processing", "In Process", "On Hold", "Quoted", "Revision Requested", "Revise Request"]
+OFFER_TRANSITIONS = {
+    # action: (statuses it may start from, resulting status)
+    "quote": (OFFER_OPEN_STATUSES, "Quoted"),
+    "accept": (["Quoted"], "PO Required"),
+    "reject": (OFFER_OPEN_STATUSES + ["PO Required"], "Rejected"),
+    "request_revision": (["Quoted"], "Revise Request"),
+    "upload_po": (["Quoted", "PO Required", "PO Uploaded"], "PO Uploaded"),
+    "make_live": (["PO Required", "PO Uploaded", "Approved"], "Live"),
+}
+ADMIN_OFFER_STATUSES = ["Pending", "In Process", "On Hold", "Approved", "Rejected", "PO Required"]
+# Admin status overrides may start anywhere except a live booking
+ADMIN_LOCKED_OFFER_STATUSES = ["Live"]
+CONTRACT_DURATION_DAYS = {"1_month": 30, "3_months": 90, "6_months": 180, "12_months": 365}
+DEFAULT_CONTRACT_DAYS = 30
+# quote_count may be stored as a string on legacy offers
+QUOTE_COUNT_INCREMENT_EXPR = {"$add": [
+    {"$convert": {"input": "$quote_count", "to": "int", "onError": 0, "onNull": 0}}, 1
+]}
+
+def offer_booking_window(offer: dict, now: datetime) -> tuple:
+    """(start, end) of an offer's booking: tentative dates, else now + contract duration"""
+    start = offer.get("tentative_start_date") or now
+    end = offer.get("tentative_end_date")
+    if not end:
+        days = CONTRACT_DURATION_DAYS.get(offer.get("contract_duration", "1_month"), DEFAULT_CONTRACT_DAYS)
+        end = start + timedelta(days=days)
+    return start, end
+
+def offer_booking_window_exprs(now: datetime) -> dict:
+    """offer_booking_window as update expressions for confirmed_start_date / confirmed_end_date"""
+    start = {"$ifNull": ["$tentative_start_date", now]}
+    days = {"$switch": {
+        "branches": [
+            {"case": {"$eq": ["$contract_duration", duration]}, "then": value}
+            for duration, value in CONTRACT_DURATION_DAYS.items()
+        ],
+        "default": DEFAULT_CONTRACT_DAYS
+    }}
+    return {
+        "confirmed_start_date": start,
+        "confirmed_end_date": {"$ifNull": ["$tentative_end_date", {"$add": [start, {"$multiply": [days, 86400000]}]}]},
+    }
+
+async def offer_transition_error(request_id: str, target: str, buyer_id: Optional[str]) -> HTTPException:
+    """Explain why a conditional transition matched nothing (only runs on the failure path)"""
+    offer = await db.offer_requests.find_one({"id": request_id}, {"_id": 0, "status": 1, "buyer_id": 1})
+    if not offer:
+        return HTTPException(status_code=404, detail="Offer request not found")
+    if buyer_id and offer.get("buyer_id") != buyer_id:
+        return HTTPException(status_code=403, detail="Can only respond to your own requests")
+    return HTTPException(
+        status_code=409, detail=f"Offer request is {offer.get('status')} and cannot move to {target}"
+    )
+
+async def transition_offer(
+    request_id: str,
+    sources: Optional[List[str]],
+    target: str,
+    fields: Optional[dict] = None,
+    *,
+    exprs: Optional[dict] = None,
+    buyer_id: Optional[str] = None,
+    book: bool = False,
+    now: Optional[datetime] = None,
+) -> dict:
+    """Move an offer from one of sources (None = any unlocked status) to target in one write
+    
+    fields are stored as literals, exprs are update expressions evaluated against the stored
+    offer; book=True also confirms the booking window. Returns the offer as it was before.
+    """
+    now = now or datetime.utcnow()
+    query = {"id": request_id, "status": {"$in": sources} if sources is not None else {"$nin": ADMIN_LOCKED_OFFER_STATUSES}}
+    if buyer_id:
+        query["buyer_id"] = buyer_id
+    set_fields = {key: {"$literal": value} for key, value in {
+        "status": target, "updated_at": now, **(fields or {})
+    }.items()}
+    if book:
+        set_fields.update(offer_booking_window_exprs(now))
+    set_fields.update(exprs or {})
+    
+    previous = await db.offer_requests.find_one_and_update(query, [{"$set": set_fields}])
+    if previous is None:
+        raise await offer_transition_error(request_id, target, buyer_id)
+    return previous
+
+def campaign_live_operation(offer: dict, from_statuses: List[str], now: datetime) -> list:
+    """Conditionally mark the offer's campaign Live (no read needed)"""
+    campaign_id = offer_campaign_id(offer)
+    if not campaign_id:
+        return []
+    return [UpdateOne(
+        {"id": campaign_id, "status": {"$in": from_statuses}},
+        {"$set": {"status": "Live", "updated_at": now}}
+    )]
+
+def booked_asset_update(offer: dict, booking_end: datetime, now: datetime) -> list:
+    return with_marketplace_visibility({
+        "status": AssetStatus.LIVE,
+        "buyer_id": offer["buyer_id"],
+        "buyer_name": offer["buyer_name"],
+        "next_available_date": booking_end,  # Asset becomes available after booking ends
+        "updated_at": now
+    })
+
+def released_asset_update(now: datetime) -> list:
+    return with_marketplace_visibility({
+        "status": AssetStatus.AVAILABLE,
+        "buyer_id": None,
+        "buyer_name": None,
+        "next_available_date": None,  # Clear next available date when asset becomes available
+        "updated_at": now
+    })
+
+async def apply_offer_side_effects(
+    before: dict,
+    after: dict,
+    asset_update: Optional[Any] = None,
+    campaign_operations: Optional[list] = None,
+):
+    """Write a transition's asset update and campaign changes (counter move included) concurrently"""
+    writes = []
+    if asset_update is not None and before.get("asset_id"):
+        writes.append(db.assets.update_one({"id": before["asset_id"]}, asset_update))
+    operations = [
+        UpdateOne(campaign_filter, {"$inc": inc})
+        for campaign_filter, inc in campaign_counter_increments(before, after)
+    ] + (campaign_operations or [])
+    if operations:
+        writes.append(db.campaigns.bulk_write(operations, ordered=False))
+    try:
+        await asyncio.gather(*writes)
+    finally:
+        # One invalidation covers the transition and its side effects
+        if asset_update is not None:
+            await invalidate_asset_caches()
+        else:
+            await bump_data_version()
 
 @api_router.patch("/admin/offer-requests/{request_id}/status")
 async def update_offer_request_status_admin(
@@ -1193,109 +2219,27 @@ async def update_offer_request_status_admin(
     admin_user: User = Depends(require_admin)
 ):
     """Update offer request status (admin only)"""
-    offer_request = await db.offer_requests.find_one({"id": request_id})
-    if not offer_request:
-        raise HTTPException(status_code=404, detail="Offer request not found")
-    
     new_status = status_data.get("status")
-    valid_statuses = ["Pending", "In Process", "On Hold", "Approved", "Rejected", "PO Required"]
+    if new_status not in ADMIN_OFFER_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Valid statuses: {ADMIN_OFFER_STATUSES}")
     
-    if new_status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Valid statuses: {valid_statuses}")
+    # Approving confirms the booking window (tentative dates or contract duration) in the same write
+    now = datetime.utcnow()
+    offer_request = await transition_offer(request_id, None, new_status, book=new_status == "Approved", now=now)
     
-    # Update offer request status
-    # If approved, update asset status to Booked and set buyer information
+    asset_update, campaign_operations = None, []
     if new_status == "Approved":
-        # Calculate confirmed dates based on tentative dates or contract duration
-        tentative_start = offer_request.get("tentative_start_date")
-        tentative_end = offer_request.get("tentative_end_date")
-        
-        # If no tentative dates, calculate from current date + contract duration
-        if not tentative_start:
-            tentative_start = datetime.utcnow()
-        
-        if not tentative_end:
-            # Calculate end date based on contract duration
-            contract_duration = offer_request.get("contract_duration", "1_month")
-            if contract_duration == "1_month":
-                tentative_end = tentative_start + timedelta(days=30)
-            elif contract_duration == "3_months":
-                tentative_end = tentative_start + timedelta(days=90)
-            elif contract_duration == "6_months":
-                tentative_end = tentative_start + timedelta(days=180)
-            elif contract_duration == "12_months":
-                tentative_end = tentative_start + timedelta(days=365)
-            else:
-                tentative_end = tentative_start + timedelta(days=30)  # Default to 1 month
-        
-        # Update offer request with confirmed dates
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": {
-                "status": new_status,
-                "confirmed_start_date": tentative_start,
-                "confirmed_end_date": tentative_end,
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        
-        # Update asset with booking info and next_available_date
-        await db.assets.update_one(
-            {"id": offer_request["asset_id"]},
-            {"$set": {
-                "status": AssetStatus.LIVE,
-                "buyer_id": offer_request["buyer_id"],
-                "buyer_name": offer_request["buyer_name"],
-                "next_available_date": tentative_end,  # Asset becomes available after booking ends
-                "updated_at": datetime.utcnow()
-            }}
-        )
-
-        # Update campaign status to "Live" if asset gets booked
-        campaign_id = offer_request.get("existing_campaign_id")
-        if campaign_id:
-            # Check if campaign should be marked as Live
-            campaign = await db.campaigns.find_one({"id": campaign_id})
-            if campaign and campaign.get("status") == "Draft":
-                # If campaign has at least one booked asset, mark as Live
-                await db.campaigns.update_one(
-                    {"id": campaign_id},
-                    {"$set": {"status": "Live", "updated_at": datetime.utcnow()}}
-                )
-    
-    # If PO Required, just update the offer request status without making asset live
-    elif new_status == "PO Required":
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": {
-                "status": new_status,
-                "updated_at": datetime.utcnow()
-            }}
-        )
-    
-    # If rejected or on hold, make asset available again and clear buyer information
+        # Book the asset for the buyer and mark a Draft campaign Live
+        _, booking_end = offer_booking_window(offer_request, now)
+        asset_update = booked_asset_update(offer_request, booking_end, now)
+        campaign_operations = campaign_live_operation(offer_request, ["Draft"], now)
     elif new_status in ["Rejected", "On Hold"]:
-        await db.assets.update_one(
-            {"id": offer_request["asset_id"]},
-            {"$set": {
-                "status": AssetStatus.AVAILABLE,
-                "buyer_id": None,
-                "buyer_name": None,
-                "next_available_date": None,  # Clear next available date when asset becomes available
-                "updated_at": datetime.utcnow()
-            }}
-        )
-    
-    # For all other statuses (Pending, In Process), just update the offer request status
-    else:
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": {
-                "status": new_status,
-                "updated_at": datetime.utcnow()
-            }}
-        )
+        # Make the asset available again and clear buyer information
+        asset_update = released_asset_update(now)
     
+    await apply_offer_side_effects(
+        offer_request, {**offer_request, "status": new_status}, asset_update, campaign_operations
+    )
     return {"message": f"Offer request status updated to {new_status}"}
 
 @api_router.post("/admin/submit-final-offer")
@@ -1307,17 +2251,20 @@ async def submit_final_offer(
     offer = FinalOffer(**offer_data.dict())
     await db.final_offers.insert_one(offer.dict())
     
-    # Update offer request status
-    await db.offer_requests.update_one(
+    # Update offer request status (returns the document as it was before)
+    previous_request = await db.offer_requests.find_one_and_update(
         {"id": offer_data.request_id},
         {"$set": {"status": "Offer Ready", "updated_at": datetime.utcnow()}}
     )
+    if previous_request:
+        await apply_campaign_counter_change(previous_request, {**previous_request, "status": "Offer Ready"})
     
     # Update campaign status
     await db.campaigns.update_one(
         {"id": offer_data.campaign_id},
         {"$set": {"status": CampaignStatus.NEGOTIATING, "updated_at": datetime.utcnow()}}
     )
+    await bump_data_version()
     
     return {"message": "Final offer submitted successfully", "offer_id": offer.id}
 
@@ -1593,6 +2540,9 @@ async def create_offer_request(
     
     offer_request = OfferRequest(
         **offer_dict,
+        campaign_id=await resolve_offer_campaign_id(
+            current_user.id, offer_dict.get("existing_campaign_id"), offer_dict.get("campaign_name")
+        ),
         buyer_id=current_user.id,
         buyer_name=current_user.company_name,
         asset_name=asset["name"],
@@ -1602,12 +2552,14 @@ async def create_offer_request(
     
     # Insert into database
     await db.offer_requests.insert_one(offer_request.dict())
+    await apply_campaign_counter_change(None, offer_request.dict())
     
     # Update asset status to Pending Offer
     await db.assets.update_one(
         {"id": offer_data.asset_id},
-        {"$set": {"status": AssetStatus.PENDING_OFFER}}
+        with_marketplace_visibility({"status": AssetStatus.PENDING_OFFER})
     )
+    await invalidate_asset_caches()
     
     # Send notification email to admin (placeholder)
     logger.info(f"New offer request submitted: {offer_request.id} by {current_user.company_name}")
@@ -1646,9 +2598,8 @@ async def get_offer_requests(current_user: User = Depends(get_current_user)):
         # Admin can see all requests
         pass
     else:
-        # Sellers can see requests for their assets
-        user_assets = await db.assets.find({"seller_id": current_user.id}).to_list(1000)
-        asset_ids = [asset["id"] for asset in user_assets]
+        # Sellers can see requests for their assets (ids only, covered by the seller_id index)
+        asset_ids = await db.assets.distinct("id", {"seller_id": current_user.id})
         query["asset_id"] = {"$in": asset_ids}
     
     requests = await db.offer_requests.find(query).sort("created_at", -1).to_list(1000)
@@ -1728,6 +2679,9 @@ async def update_offer_request(
     
     # Update the offer request
     update_data = offer_data.dict()
+    update_data["campaign_id"] = await resolve_offer_campaign_id(
+        request["buyer_id"], update_data.get("existing_campaign_id"), update_data.get("campaign_name")
+    )
     update_data["updated_at"] = datetime.utcnow()
     
     await db.offer_requests.update_one(
@@ -1737,6 +2691,8 @@ async def update_offer_request(
     
     # Get updated request
     updated_request = await db.offer_requests.find_one({"id": request_id})
+    await apply_campaign_counter_change(request, updated_request)
+    await bump_data_version()
     return OfferRequest(**updated_request)
 
 @api_router.delete("/offers/requests/{request_id}")
@@ -1758,11 +2714,13 @@ async def delete_offer_request(
     # Reset asset status to Available
     await db.assets.update_one(
         {"id": request["asset_id"]},
-        {"$set": {"status": AssetStatus.AVAILABLE}}
+        with_marketplace_visibility({"status": AssetStatus.AVAILABLE})
     )
     
     # Delete the offer request
     await db.offer_requests.delete_one({"id": request_id})
+    await apply_campaign_counter_change(request, None)
+    await invalidate_asset_caches()
     
     return {"message": "Offer request deleted successfully"}
 
@@ -1773,36 +2731,28 @@ async def update_offer_quote(
     admin_user: User = Depends(require_admin)
 ):
     """Admin: Add quote to offer request"""
-    request = await db.offer_requests.find_one({"id": request_id})
-    if not request:
-        raise HTTPException(status_code=404, detail="Offer request not found")
-    
-    # Update offer request with quote - use consistent field names
-    # Increment quote count to track how many times admin has quoted
-    current_quote_count = request.get("quote_count", 0)
-    # Ensure we're working with an integer
-    if isinstance(current_quote_count, str):
-        try:
-            current_quote_count = int(current_quote_count)
-        except:
-            current_quote_count = 0
-    elif current_quote_count is None:
-        current_quote_count = 0
-    
-    new_quote_count = current_quote_count + 1
-    
-    await db.offer_requests.update_one(
-        {"id": request_id},
-        {"$set": {
-            "status": "Quoted",
-            "admin_quoted_price": quote_data.get("quoted_price"),  # Frontend sends quoted_price
-            "final_offer": quote_data.get("quoted_price"),  # Keep both for compatibility
+    # Frontend sends quoted_price; final_offer / admin_response are kept for compatibility.
+    # quote_count tracks how many times admin has quoted.
+    now = datetime.utcnow()
+    quoted_price = quote_data.get("quoted_price")
+    request = await transition_offer(
+        request_id,
+        *OFFER_TRANSITIONS["quote"],
+        {
+            "admin_quoted_price": quoted_price,
+            "final_offer": quoted_price,
             "admin_response": quote_data.get("admin_notes"),
             "admin_notes": quote_data.get("admin_notes"),
-            "quoted_at": datetime.utcnow(),
-            "quote_count": new_quote_count  # Track quote iteration
-        }}
+            "quoted_at": now
+        },
+        exprs={"quote_count": QUOTE_COUNT_INCREMENT_EXPR},
+        now=now
     )
+    await apply_offer_side_effects(request, {**request, "status": "Quoted", "admin_quoted_price": quoted_price})
+    try:
+        new_quote_count = int(request.get("quote_count") or 0) + 1
+    except (TypeError, ValueError):
+        new_quote_count = 1
     
     # Send notification to buyer (placeholder)
     logger.info(f"Quote provided for offer request: {request_id} - Price: {quote_data.get('quoted_price')}")
@@ -1884,84 +2834,49 @@ async def respond_to_offer(
     if current_user.role != UserRole.BUYER:
         raise HTTPException(status_code=403, detail="Only buyers can respond to offers")
     
-    request = await db.offer_requests.find_one({"id": request_id})
-    if not request:
-        raise HTTPException(status_code=404, detail="Offer request not found")
-    
-    if request["buyer_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Can only respond to your own requests")
-    
     response_action = response_data.get("action")  # "accept", "reject", "modify"
+    if response_action not in ["accept", "reject", "modify", "request_revision"]:
+        raise HTTPException(status_code=400, detail="Invalid action. Valid actions: accept, reject, modify, request_revision")
     
+    now = datetime.utcnow()
     if response_action == "accept":
-        # Calculate confirmed dates based on tentative dates or contract duration
-        tentative_start = request.get("tentative_start_date")
-        tentative_end = request.get("tentative_end_date")
-        
-        # If no tentative dates, calculate from current date + contract duration
-        if not tentative_start:
-            tentative_start = datetime.utcnow()
-        
-        if not tentative_end:
-            # Calculate end date based on contract duration
-            contract_duration = request.get("contract_duration", "1_month")
-            if contract_duration == "1_month":
-                tentative_end = tentative_start + timedelta(days=30)
-            elif contract_duration == "3_months":
-                tentative_end = tentative_start + timedelta(days=90)
-            elif contract_duration == "6_months":
-                tentative_end = tentative_start + timedelta(days=180)
-            elif contract_duration == "12_months":
-                tentative_end = tentative_start + timedelta(days=365)
-            else:
-                tentative_end = tentative_start + timedelta(days=30)  # Default to 1 month
-        
-        # Update request status with confirmed dates - Status should be "PO Required" for buyer approval
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": {
-                "status": "PO Required",  # Changed from "Accepted" to "PO Required"
-                "confirmed_start_date": tentative_start,
-                "confirmed_end_date": tentative_end
-            }}
+        # Status becomes "PO Required" for buyer approval; the booking window (tentative dates
+        # or contract duration) is confirmed in the same write
+        request = await transition_offer(
+            request_id, *OFFER_TRANSITIONS["accept"], buyer_id=current_user.id, book=True, now=now
         )
+        tentative_start, tentative_end = offer_booking_window(request, now)
+        
+        # Add asset to campaign if it's linked to an existing campaign
+        # Note: Campaign will be made Live only when admin clicks "Make it Live"
+        campaign_operations = []
+        if offer_campaign_id(request):
+            campaign_operations.append(UpdateOne(
+                {"id": offer_campaign_id(request)},
+                {
+                    "$addToSet": {"campaign_assets": {
+                        "asset_id": request["asset_id"],
+                        "asset_name": request.get("asset_name", ""),
+                        "asset_start_date": tentative_start,  # Use calculated confirmed dates
+                        "asset_expiration_date": tentative_end
+                    }},
+                    "$set": {"updated_at": now}
+                }
+            ))
         
         # Update asset with buyer information and next_available_date, but keep original status
-        await db.assets.update_one(
-            {"id": request["asset_id"]},
+        await apply_offer_side_effects(
+            request,
+            {**request, "status": "PO Required"},
             {"$set": {
                 "buyer_id": current_user.id,
                 "buyer_name": current_user.company_name,
                 "next_available_date": tentative_end,  # Asset becomes available after booking ends
-                "updated_at": datetime.utcnow()
-            }}
+                "updated_at": now
+            }},
+            campaign_operations
         )
         
-        # Add asset to campaign if it's linked to an existing campaign
-        if request.get("existing_campaign_id"):
-            campaign_id = request["existing_campaign_id"]
-            asset_data = await db.assets.find_one({"id": request["asset_id"]})
-            
-            if asset_data:
-                campaign_asset = {
-                    "asset_id": request["asset_id"],
-                    "asset_name": asset_data.get("name", ""),
-                    "asset_start_date": tentative_start,  # Use calculated confirmed dates
-                    "asset_expiration_date": tentative_end
-                }
-                
-                # Add asset to campaign's assets array
-                await db.campaigns.update_one(
-                    {"id": campaign_id},
-                    {
-                        "$addToSet": {"campaign_assets": campaign_asset},
-                        "$set": {"updated_at": datetime.utcnow()}
-                    }
-                )
-                logger.info(f"Added asset {request['asset_id']} to campaign {campaign_id}")
-                
-                # Note: Campaign will be made Live only when admin clicks "Make it Live"
-        
         logger.info(f"Offer accepted: {request_id}")
         
         # 🚀 REAL-TIME EVENT: Notify admin of offer approval
@@ -1983,23 +2898,9 @@ async def respond_to_offer(
         
         
     elif response_action == "reject":
-        # Update request status
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": {"status": "Rejected"}}
-        )
-        
         # Return asset to Available status and clear buyer information
-        await db.assets.update_one(
-            {"id": request["asset_id"]},
-            {"$set": {
-                "status": AssetStatus.AVAILABLE,
-                "buyer_id": None,
-                "buyer_name": None,
-                "next_available_date": None,  # Clear next available date when asset becomes available
-                "updated_at": datetime.utcnow()
-            }}
-        )
+        request = await transition_offer(request_id, *OFFER_TRANSITIONS["reject"], buyer_id=current_user.id, now=now)
+        await apply_offer_side_effects(request, {**request, "status": "Rejected"}, released_asset_update(now))
         
         logger.info(f"Offer rejected: {request_id}")
         
@@ -2020,17 +2921,20 @@ async def respond_to_offer(
             print(f"❌ WebSocket notification failed: {ws_error}")
         
     
-    elif response_action == "modify" or response_action == "request_revision":
+    else:
         # Buyer requests price revision - Status should be "Revise Request"
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": {
-                "status": "Revise Request",  # Changed from "Revision Requested" to "Revise Request"
+        request = await transition_offer(
+            request_id,
+            *OFFER_TRANSITIONS["request_revision"],
+            {
                 "revision_requested": True,
-                "revision_requested_at": datetime.utcnow(),
+                "revision_requested_at": now,
                 "revision_reason": response_data.get("reason", "Buyer requested price revision")
-            }}
+            },
+            buyer_id=current_user.id,
+            now=now
         )
+        await apply_offer_side_effects(request, {**request, "status": "Revise Request"})
         
         logger.info(f"Offer revision requested: {request_id}")
         
@@ -2140,23 +3044,32 @@ async def upload_multiple_images(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 # Public Stats Route
+async def load_public_stats() -> dict:
+    # count_documents on a missing collection is simply 0
+    total_assets, available_assets, total_users, active_campaigns = await asyncio.gather(
+        db.assets.count_documents({}),
+        db.assets.count_documents({"status": "Available"}),
+        db.users.count_documents({}),
+        db.campaigns.count_documents({"status": "Live"})
+    )
+    return {
+        "total_assets": total_assets,
+        "available_assets": available_assets,
+        "total_users": total_users,
+        "active_campaigns": active_campaigns,
+        "success_rate": 95.2,  # Demo metric
+        "platform_uptime": "99.9%"  # Demo metric
+    }
+
 @api_router.get("/stats/public")
-async def get_public_stats():
-    """Get public statistics for homepage and marketplace"""
+async def get_public_stats(request: Request):
+    """Get public statistics for homepage and marketplace
+    
+    Served from the public response cache; If-None-Match with the current ETag gets a 304.
+    User counts aren't versioned, so they only refresh with the next data write.
+    """
     try:
-        total_assets = await db.assets.count_documents({})
-        available_assets = await db.assets.count_documents({"status": "Available"})
-        total_users = await db.users.count_documents({})
-        active_campaigns = await db.campaigns.count_documents({"status": "Live"}) if "campaigns" in await db.list_collection_names() else 0
-        
-        return {
-            "total_assets": total_assets,
-            "available_assets": available_assets,
-            "total_users": total_users,
-            "active_campaigns": active_campaigns,
-            "success_rate": 95.2,  # Demo metric
-            "platform_uptime": "99.9%"  # Demo metric
-        }
+        return await cached_json_response(request, ("stats",), load_public_stats)
     except Exception as e:
         logger.error(f"Error fetching public stats: {e}")
         # Return default stats in case of error
@@ -2169,118 +3082,479 @@ async def get_public_stats():
             "platform_uptime": "99.9%"
         }
 
-# Public Assets Route
-@api_router.get("/assets/public")
-async def get_public_assets():
-    """Get all public assets for marketplace display with proper filtering - OPTIMIZED"""
+# ====================================
+# MARKETPLACE LISTING: FILTERS, SORTING & KEYSET PAGINATION
+# ====================================
+
+# Sort key -> (field, direction); price sorts use the requested pricing key
+ASSET_SORT_OPTIONS = {
+    "newest": ("created_at", -1),
+    "oldest": ("created_at", 1),
+    "name": ("name", 1),
+    "price_asc": ("pricing.{price_key}", 1),
+    "price_desc": ("pricing.{price_key}", -1),
+}
+
+class AssetPage(BaseModel):
+    items: List[Dict[str, Any]]
+    total: int
+    next_cursor: Optional[str] = None
+    limit: int
+
+def build_asset_filter_query(
+    query: dict,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    division: Optional[str] = None,
+    district: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_key: str = "monthly_rate",
+    q: Optional[str] = None
+) -> dict:
+    """Add the marketplace sidebar filters to an asset query ("all" means no filter)"""
+    if type and type != "all":
+        query["type"] = type
+    if status and status != "all":
+        query["status"] = status
+    if division and division != "all":
+        query["division"] = division
+    if district and district != "all":
+        query["district"] = district
+    if min_price is not None or max_price is not None:
+        price_range = {}
+        if min_price is not None:
+            price_range["$gte"] = min_price
+        if max_price is not None:
+            price_range["$lte"] = max_price
+        query[f"pricing.{price_key}"] = price_range
+    terms = search_query_terms(q)
+    if terms:
+        query["search_terms"] = {"$all": terms}
+    elif q and q.strip():
+        # Single-character queries have no indexed prefix; fall back to a scan
+        pattern = {"$regex": re.escape(q.strip()), "$options": "i"}
+        query.setdefault("$and", []).append({"$or": [
+            {field: pattern} for field in SEARCH_FIELDS
+        ]})
+    return query
+
+def resolve_asset_sort(sort: str, price_key: str) -> tuple:
+    if sort not in ASSET_SORT_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Valid options: {list(ASSET_SORT_OPTIONS)}")
+    field, direction = ASSET_SORT_OPTIONS[sort]
+    return field.format(price_key=price_key), direction
+
+def get_sort_value(doc: dict, field: str):
+    value = doc
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+def encode_asset_cursor(doc: dict, sort: str, field: str) -> str:
+    """Opaque keyset cursor: the sort value and id of the last item on the page"""
+    payload = json_util.dumps({"s": sort, "v": get_sort_value(doc, field), "id": doc["id"]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_asset_cursor(cursor: str, sort: str) -> dict:
     try:
-        # Apply same marketplace filtering logic as the main assets endpoint
-        query = {}
-        
-        # Marketplace visibility filtering:
-        # 1. NEVER show Private Assets (category = "Private Asset")
-        # 2. ONLY show Existing Assets if show_in_marketplace=True AND status=Live  
-        # 3. Show Public Assets (category = "Public" or no category - legacy assets)
-        # 4. Show legacy assets (no category field) as they are treated as Public
-        
-        query["$and"] = [
-            # Exclude Private Assets explicitly
-            {"category": {"$ne": "Private Asset"}},
-            
-            # Apply marketplace visibility rules
-            {"$or": [
-                # Show Public Assets (explicit category or no category for legacy)
-                {"$or": [
-                    {"category": "Public"},
-                    {"category": {"$exists": False}},  # Legacy assets without category
-                    {"category": None},                # Assets with null category
-                    {"category": ""}                   # Assets with empty string category
-                ]},
-                
-                # Show Existing Assets ONLY if conditions are met
-                {"$and": [
-                    {"category": "Existing Asset"},
-                    {"show_in_marketplace": True},
-                    {"$or": [
-                        {"status": "Live"},
-                        {"status": "Available"},
-                        {"status": "Pending Offer"}
-                    ]}
-                ]}
-            ]}
-        ]
-        
-        # OPTIMIZATION: Use aggregation pipeline to join assets with offer_requests in one query
-        # This eliminates the N+1 query problem
-        pipeline = [
-            {"$match": query},
-            {"$lookup": {
-                "from": "offer_requests",
-                "let": {"asset_id": "$id"},
-                "pipeline": [
-                    {"$match": {
-                        "$expr": {"$eq": ["$asset_id", "$$asset_id"]},
-                        "status": {"$in": ["PO Uploaded", "Live"]}  # Include both PO Uploaded and Live offers
-                    }},
-                    {"$sort": {"created_at": -1}},  # Get the most recent offer
-                    {"$limit": 1}
-                ],
-                "as": "active_offers"
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        if payload["s"] != sort:
+            raise ValueError("cursor was issued for a different sort")
+        return payload
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def build_keyset_condition(cursor: dict, field: str, direction: int) -> dict:
+    """Match documents strictly after the cursor in (field, id) order"""
+    op = "$gt" if direction > 0 else "$lt"
+    value, last_id = cursor["v"], cursor["id"]
+    if value is None:
+        # Nulls sort first ascending / last descending
+        if direction > 0:
+            return {"$or": [{field: {"$ne": None}}, {field: None, "id": {op: last_id}}]}
+        return {field: None, "id": {op: last_id}}
+    after_value = {field: {op: value}}
+    if direction < 0:
+        after_value = {"$or": [after_value, {field: None}]}
+    return {"$or": [after_value, {field: value, "id": {op: last_id}}]}
+
+def apply_asset_page(query: dict, sort: str, price_key: str, cursor: Optional[str]) -> tuple:
+    """Return (page_query, sort_spec) for a keyset page of the given filter query"""
+    field, direction = resolve_asset_sort(sort, price_key)
+    page_query = query
+    if cursor:
+        page_query = {"$and": [query, build_keyset_condition(decode_asset_cursor(cursor, sort), field, direction)]}
+    return page_query, [(field, direction), ("id", direction)]
+
+def split_asset_page(docs: list, limit: int, sort: str, price_key: str) -> tuple:
+    """docs holds up to limit+1 raw documents; the extra one only signals a next page"""
+    if len(docs) <= limit:
+        return docs, None
+    field, _ = resolve_asset_sort(sort, price_key)
+    docs = docs[:limit]
+    return docs, encode_asset_cursor(docs[-1], sort, field)
+
+# Marketplace offer enrichment: join each asset with its most recent PO Uploaded/Live
+# offer in the same aggregation, flag assets waiting for go-live and surface the
+# booked expiry date
+PUBLIC_ASSET_OFFER_STAGES = [
+    {"$lookup": {
+        "from": "offer_requests",
+        "let": {"asset_id": "$id"},
+        "pipeline": [
+            {"$match": {
+                "$expr": {"$eq": ["$asset_id", "$$asset_id"]},
+                "status": {"$in": ["PO Uploaded", "Live"]}  # Include both PO Uploaded and Live offers
             }},
-            {"$addFields": {
-                "waiting_for_go_live": {
-                    "$gt": [{
-                        "$size": {
-                            "$filter": {
-                                "input": "$active_offers",
-                                "cond": {"$eq": ["$$this.status", "PO Uploaded"]}
-                            }
-                        }
-                    }, 0]
-                },
-                "asset_expiry_date": {
-                    "$cond": {
-                        "if": {"$gt": [{"$size": "$active_offers"}, 0]},
-                        "then": {
-                            "$ifNull": [
-                                {"$arrayElemAt": ["$active_offers.confirmed_end_date", 0]},
-                                {"$arrayElemAt": ["$active_offers.tentative_end_date", 0]}
-                            ]
-                        },
-                        "else": "$asset_expiry_date"
+            {"$sort": {"created_at": -1}},  # Get the most recent offer
+            {"$limit": 1}
+        ],
+        "as": "active_offers"
+    }},
+    {"$addFields": {
+        "waiting_for_go_live": {
+            "$gt": [{
+                "$size": {
+                    "$filter": {
+                        "input": "$active_offers",
+                        "cond": {"$eq": ["$$this.status", "PO Uploaded"]}
                     }
                 }
-            }},
-            {"$project": {"active_offers": 0}}  # Remove the joined field
-        ]
-        
-        assets_cursor = db.assets.aggregate(pipeline)
-        assets = await assets_cursor.to_list(1000)
-        
-        # Convert to proper format and validate with Pydantic
-        enhanced_assets = []
-        for asset in assets:
-            try:
-                # Create Asset object to ensure proper serialization
-                asset_obj = Asset(**asset)
-                asset_dict = asset_obj.dict()
-                
-                # Add the computed fields from aggregation
-                asset_dict["waiting_for_go_live"] = asset.get("waiting_for_go_live", False)
-                if asset.get("asset_expiry_date"):
-                    asset_dict["asset_expiry_date"] = asset.get("asset_expiry_date")
-                
-                enhanced_assets.append(asset_dict)
-            except Exception as asset_error:
-                logger.warning(f"Error processing asset {asset.get('id', 'unknown')}: {asset_error}")
-                continue
-        
-        logger.info(f"Fetched {len(enhanced_assets)} public assets (optimized)")
-        return enhanced_assets
+            }, 0]
+        },
+        "asset_expiry_date": {
+            "$cond": {
+                "if": {"$gt": [{"$size": "$active_offers"}, 0]},
+                "then": {
+                    "$ifNull": [
+                        {"$arrayElemAt": ["$active_offers.confirmed_end_date", 0]},
+                        {"$arrayElemAt": ["$active_offers.tentative_end_date", 0]}
+                    ]
+                },
+                "else": "$asset_expiry_date"
+            }
+        }
+    }},
+    {"$project": {"active_offers": 0, "search_terms": 0, "search_tokens": 0}}  # Remove the joined and index-only fields
+]
+
+def serialize_public_assets(assets: list, extra_fields: tuple = ()) -> list:
+    """Validate aggregated public assets through Asset and re-attach computed fields"""
+    enhanced_assets = []
+    for asset in assets:
+        try:
+            # Create Asset object to ensure proper serialization
+            asset_obj = Asset(**asset)
+            asset_dict = asset_obj.dict()
+            
+            # Add the computed fields from aggregation
+            asset_dict["waiting_for_go_live"] = asset.get("waiting_for_go_live", False)
+            if asset.get("asset_expiry_date"):
+                asset_dict["asset_expiry_date"] = asset.get("asset_expiry_date")
+            for field in extra_fields:
+                asset_dict[field] = asset.get(field)
+            
+            enhanced_assets.append(asset_dict)
+        except Exception as asset_error:
+            logger.warning(f"Error processing asset {asset.get('id', 'unknown')}: {asset_error}")
+            continue
+    return enhanced_assets
+
+# Public Assets Route
+@api_router.get("/assets/public")
+async def get_public_assets(
+    request: Request,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    division: Optional[str] = None,
+    district: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_key: str = Query("monthly_rate", pattern=r"^[A-Za-z0-9_]+$"),
+    q: Optional[str] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size; enables paginated response")
+):
+    """Get all public assets for marketplace display with proper filtering - OPTIMIZED
+    
+    Without limit the full (capped) list is returned as before; with limit the response
+    is a page: {items, total, next_cursor, limit}. Responses are served from the public
+    response cache and honour If-None-Match.
+    """
+    key = ("assets", type, status, division, district, min_price, max_price, price_key, q, sort, cursor, limit)
+    
+    async def compute():
+        return await load_public_assets(
+            type, status, division, district, min_price, max_price, price_key, q, sort, cursor, limit
+        )
+    
+    try:
+        return await cached_json_response(request, key, compute)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching public assets: {e}")
         return []
 
+async def load_public_assets(
+    type: Optional[str],
+    status: Optional[str],
+    division: Optional[str],
+    district: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    price_key: str,
+    q: Optional[str],
+    sort: str,
+    cursor: Optional[str],
+    limit: Optional[int]
+):
+    # Apply same marketplace filtering logic as the main assets endpoint
+    # (visibility rule is materialized on write, see is_marketplace_visible)
+    query = build_asset_filter_query(
+        {"marketplace_visible": True}, type, status, division, district,
+        min_price, max_price, price_key, q
+    )
+    
+    page_stages = []
+    if limit is not None:
+        page_query, sort_spec = apply_asset_page(query, sort, price_key, cursor)
+        page_stages = [
+            {"$match": page_query},
+            {"$sort": dict(sort_spec)},
+            {"$limit": limit + 1}
+        ]
+    
+    # OPTIMIZATION: Use aggregation pipeline to join assets with offer_requests in one query
+    # This eliminates the N+1 query problem; when paginating, only the page is joined
+    pipeline = (page_stages or [{"$match": query}]) + PUBLIC_ASSET_OFFER_STAGES
+    
+    assets_cursor = db.assets.aggregate(pipeline)
+    assets = await assets_cursor.to_list(1000)
+    next_cursor = None
+    if limit is not None:
+        assets, next_cursor = split_asset_page(assets, limit, sort, price_key)
+    
+    # Convert to proper format and validate with Pydantic
+    enhanced_assets = serialize_public_assets(assets)
+    
+    logger.info(f"Fetched {len(enhanced_assets)} public assets (optimized)")
+    if limit is not None:
+        total = await db.assets.count_documents(query)
+        return {"items": enhanced_assets, "total": total, "next_cursor": next_cursor, "limit": limit}
+    return enhanced_assets
+
+# Price buckets for the facet sidebar; assets without a price for the key count as unpriced
+PRICE_FACET_BOUNDARIES = [0, 10000, 25000, 50000, 100000, 250000, 500000, float("inf")]
+ASSET_FACET_FIELDS = ["type", "division", "district", "status"]
+
+def build_asset_facet_pipeline(
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    division: Optional[str] = None,
+    district: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_key: str = "monthly_rate",
+    q: Optional[str] = None
+) -> list:
+    """One $facet aggregation computing every sidebar count for the current filters
+    
+    Facets are disjunctive: each one applies every filter except its own, so the
+    sidebar still shows the counts for alternatives to the current selection.
+    """
+    selected = {"type": type, "status": status, "division": division, "district": district}
+    
+    def other_filters(facet: Optional[str]) -> list:
+        filters = {field: value for field, value in selected.items() if field != facet}
+        if facet != "price":
+            filters.update(min_price=min_price, max_price=max_price)
+        match = build_asset_filter_query({}, price_key=price_key, **filters)
+        return [{"$match": match}] if match else []
+    
+    facets = {
+        field: other_filters(field) + [
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ]
+        for field in ASSET_FACET_FIELDS
+    }
+    facets["price"] = other_filters("price") + [{"$bucket": {
+        "groupBy": f"$pricing.{price_key}",
+        "boundaries": PRICE_FACET_BOUNDARIES,
+        "default": "unpriced",
+        "output": {"count": {"$sum": 1}}
+    }}]
+    facets["total"] = other_filters(None) + [{"$count": "count"}]
+    
+    return [
+        {"$match": build_asset_filter_query({"marketplace_visible": True}, q=q)},
+        {"$facet": facets}
+    ]
+
+def format_asset_facets(result: dict) -> dict:
+    facets = {
+        field: [{"value": row["_id"], "count": row["count"]} for row in result.get(field, []) if row["_id"] is not None]
+        for field in ASSET_FACET_FIELDS
+    }
+    upper_bounds = dict(zip(PRICE_FACET_BOUNDARIES, PRICE_FACET_BOUNDARIES[1:]))
+    facets["price"] = [
+        {"min": row["_id"], "max": None if upper_bounds[row["_id"]] == float("inf") else upper_bounds[row["_id"]], "count": row["count"]}
+        for row in result.get("price", []) if row["_id"] != "unpriced"
+    ]
+    facets["unpriced"] = next((row["count"] for row in result.get("price", []) if row["_id"] == "unpriced"), 0)
+    total = result.get("total") or [{"count": 0}]
+    facets["total"] = total[0]["count"]
+    return facets
+
+@api_router.get("/assets/facets")
+async def get_asset_facets(
+    request: Request,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    division: Optional[str] = None,
+    district: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_key: str = Query("monthly_rate", pattern=r"^[A-Za-z0-9_]+$"),
+    q: Optional[str] = None
+):
+    """Get per-type, per-division, per-district, per-status and price-bucket counts
+    for the marketplace filter sidebar in one round trip (cached, honours If-None-Match)
+    """
+    key = ("facets", type, status, division, district, min_price, max_price, price_key, q)
+    
+    async def compute():
+        pipeline = build_asset_facet_pipeline(
+            type, status, division, district, min_price, max_price, price_key, q
+        )
+        result = await db.assets.aggregate(pipeline).to_list(1)
+        return format_asset_facets(result[0] if result else {})
+    
+    return await cached_json_response(request, key, compute)
+
+@api_router.get("/assets/search")
+async def search_assets(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    division: Optional[str] = None,
+    district: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    """Search marketplace-visible assets by name, address, area, district, division and
+    description with prefix matching; results are ranked by relevance (search_score)"""
+    if not search_query_terms(q):
+        raise HTTPException(status_code=400, detail=f"Search terms must be at least {SEARCH_MIN_PREFIX} characters")
+    query = build_asset_filter_query({"marketplace_visible": True}, type, status, division, district, q=q)
+    pipeline = [
+        {"$match": query},
+        {"$addFields": {"search_score": build_search_score(q)}},
+        {"$sort": {"search_score": -1, "id": 1}},
+        {"$limit": limit}
+    ] + PUBLIC_ASSET_OFFER_STAGES
+    
+    assets = await db.assets.aggregate(pipeline).to_list(limit)
+    return serialize_public_assets(assets, extra_fields=("search_score",))
+
+@api_router.get("/assets/nearby")
+async def get_nearby_assets(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(2000, gt=0, le=100000, description="Search radius in meters"),
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=1000)
+):
+    """Get marketplace-visible assets within a radius, nearest first"""
+    query = build_asset_filter_query({"marketplace_visible": True}, type, status)
+    pipeline = [
+        {"$geoNear": {
+            "near": {"type": "Point", "coordinates": [lng, lat]},
+            "key": "geo_location",
+            "distanceField": "distance_m",
+            "maxDistance": radius_m,
+            "spherical": True,
+            "query": query
+        }},
+        {"$limit": limit}
+    ] + PUBLIC_ASSET_OFFER_STAGES
+    
+    assets = await db.assets.aggregate(pipeline).to_list(limit)
+    return serialize_public_assets(assets, extra_fields=("distance_m",))
+
+@api_router.get("/assets/clusters")
+async def get_asset_clusters(
+    bbox: str = Query(..., description="west,south,east,north in degrees"),
+    zoom: int = Query(..., ge=0, le=CLUSTER_MAX_ZOOM)
+):
+    """Get pre-aggregated map clusters (count, centroid, type breakdown) for a viewport
+    
+    Results are cached per (zoom, tile); only uncached tiles hit the database.
+    """
+    x0, y0, x1, y1 = tile_range_for_bbox(*parse_bbox(bbox), zoom)
+    tile_keys = [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+    if len(tile_keys) > CLUSTER_MAX_TILES_PER_REQUEST:
+        raise HTTPException(status_code=400, detail="Viewport covers too many tiles for this zoom level")
+    
+    tiles = {}
+    missing = []
+    for key in tile_keys:
+        cached = cluster_cache.get(key)
+        if cached is None:
+            missing.append(key)
+        else:
+            tiles[key] = cached
+    
+    if missing:
+        # One aggregation over the rectangle spanning every uncached tile
+        computed = await compute_tile_clusters(
+            zoom,
+            min(key[1] for key in missing), min(key[2] for key in missing),
+            max(key[1] for key in missing), max(key[2] for key in missing)
+        )
+        for key, clusters in computed.items():
+            cluster_cache.set(key, clusters)
+            tiles[key] = clusters
+    
+    clusters = [cluster for key in tile_keys for cluster in tiles[key]]
+    return {
+        "zoom": zoom,
+        "tiles": len(tile_keys),
+        "cached_tiles": len(tile_keys) - len(missing),
+        "total": sum(cluster["count"] for cluster in clusters),
+        "clusters": clusters
+    }
+
+@api_router.get("/assets/within")
+async def get_assets_within(
+    bbox: str = Query(..., description="west,south,east,north in degrees"),
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000)
+):
+    """Get marketplace-visible assets inside a map viewport bounding box"""
+    query = build_asset_filter_query({"marketplace_visible": True}, type, status)
+    west, south, east, north = parse_bbox(bbox)
+    if east - west < 180 and north - south < 90:
+        query["geo_location"] = {"$geoWithin": {"$geometry": bbox_geometry(west, south, east, north)}}
+    else:
+        # GeoJSON polygons can't span a hemisphere; the range check below bounds it
+        query["geo_location"] = {"$ne": None}
+    pipeline = [
+        {"$match": query},
+        geo_coordinate_range_stage(west, south, east, north),
+        {"$limit": limit}
+    ] + PUBLIC_ASSET_OFFER_STAGES
+    
+    assets = await db.assets.aggregate(pipeline).to_list(limit)
+    return serialize_public_assets(assets)
+
+# Offer statuses that attach an asset to a campaign's asset view
+CAMPAIGN_ACTIVE_OFFER_STATUSES = ["Pending", "Processing", "In Process", "Quoted", "Accepted", "Approved", "PO Required", "PO Uploaded", "Live"]
+
 # Campaign Assets Endpoint - NEW OPTIMIZED ENDPOINT
 @api_router.get("/campaigns/{campaign_id}/assets")
 async def get_campaign_assets(campaign_id: str, current_user: User = Depends(get_current_user)):
@@ -2295,86 +3569,39 @@ async def get_campaign_assets(campaign_id: str, current_user: User = Depends(get
         if campaign.get("buyer_id") != current_user.id and current_user.role != "admin":
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # Use aggregation pipeline to get campaign assets and related offer requests efficiently
-        pipeline = [
-            # Step 1: Get all public assets first (for potential matching)
-            {"$match": {
-                "$and": [
-                    {"category": {"$ne": "Private Asset"}},
-                    {"$or": [
-                        {"$or": [
-                            {"category": "Public"},
-                            {"category": {"$exists": False}},
-                            {"category": None},
-                            {"category": ""}
-                        ]},
-                        {"$and": [
-                            {"category": "Existing Asset"},
-                            {"show_in_marketplace": True},
-                            {"$or": [
-                                {"status": "Live"},
-                                {"status": "Available"},
-                                {"status": "Pending Offer"}
-                            ]}
-                        ]}
-                    ]}
-                ]
-            }},
-            # Step 2: Add campaign asset info if asset is in campaign_assets
-            {"$addFields": {
-                "campaign_asset_info": {
-                    "$arrayElemAt": [
-                        {"$filter": {
-                            "input": campaign.get("campaign_assets", []),
-                            "cond": {"$eq": ["$$this.asset_id", "$id"]}
-                        }},
-                        0
-                    ]
-                }
-            }},
-            # Step 3: Join with offer requests for this campaign
-            {"$lookup": {
-                "from": "offer_requests",
-                "let": {"asset_id": "$id"},
-                "pipeline": [
-                    {"$match": {
-                        "$expr": {"$and": [
-                            {"$eq": ["$asset_id", "$$asset_id"]},
-                            {"$or": [
-                                {"$eq": ["$existing_campaign_id", campaign_id]},
-                                {"$eq": ["$campaign_name", campaign.get("name", "")]}
-                            ]},
-                            {"$in": ["$status", ["Pending", "Processing", "In Process", "Quoted", "Accepted", "Approved", "PO Required", "PO Uploaded", "Live"]]}
-                        ]}
-                    }}
-                ],
-                "as": "campaign_offers"
-            }},
-            # Step 4: Filter to only include assets that are either in campaign_assets OR have offers for this campaign
-            {"$match": {
-                "$or": [
-                    {"campaign_asset_info": {"$ne": None}},
-                    {"campaign_offers": {"$not": {"$size": 0}}}
-                ]
-            }},
-            # Step 5: Add computed fields
-            {"$addFields": {
-                "isInCampaign": {"$ne": ["$campaign_asset_info", None]},
-                "isRequested": {"$gt": [{"$size": "$campaign_offers"}, 0]},
-                "offerStatus": {"$arrayElemAt": ["$campaign_offers.status", 0]},
-                "offerId": {"$arrayElemAt": ["$campaign_offers.id", 0]},
-                "asset_start_date": "$campaign_asset_info.asset_start_date",
-                "asset_expiration_date": "$campaign_asset_info.asset_expiration_date"
-            }},
-            # Step 6: Clean up fields
-            {"$project": {
-                "campaign_asset_info": 0,
-                "campaign_offers": 0
-            }}
-        ]
+        # Driven from the campaign side: its offer requests and campaign_assets give the
+        # asset ids, then only those assets are fetched - cost scales with the campaign
+        campaign_offers = await db.offer_requests.find(
+            {"campaign_id": campaign_id, "status": {"$in": CAMPAIGN_ACTIVE_OFFER_STATUSES}, **ASSET_OFFER_MATCH},
+            {"_id": 0, "id": 1, "asset_id": 1, "status": 1}
+        ).sort("created_at", 1).to_list(None)
+        offers_by_asset = {}
+        for offer in campaign_offers:
+            offers_by_asset.setdefault(offer.get("asset_id"), offer)
         
-        assets_cursor = db.assets.aggregate(pipeline)
-        campaign_assets = await assets_cursor.to_list(1000)
+        campaign_asset_info = {}
+        for info in campaign.get("campaign_assets") or []:
+            campaign_asset_info.setdefault(info.get("asset_id"), info)
+        
+        asset_ids = [asset_id for asset_id in {**campaign_asset_info, **offers_by_asset} if asset_id]
+        assets = await db.assets.find(
+            {"id": {"$in": asset_ids}, "marketplace_visible": True},
+            {"_id": 0, "search_terms": 0, "search_tokens": 0}
+        ).to_list(None) if asset_ids else []
+        
+        campaign_assets = []
+        for asset in assets:
+            info = campaign_asset_info.get(asset["id"])
+            offer = offers_by_asset.get(asset["id"])
+            campaign_assets.append({
+                **asset,
+                "isInCampaign": info is not None,
+                "isRequested": offer is not None,
+                "offerStatus": offer.get("status") if offer else None,
+                "offerId": offer.get("id") if offer else None,
+                "asset_start_date": info.get("asset_start_date") if info else None,
+                "asset_expiration_date": info.get("asset_expiration_date") if info else None
+            })
         
         # Convert to proper format
         formatted_assets = []
@@ -2417,25 +3644,118 @@ async def refresh_application_data(current_user: User = Depends(require_admin)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error refreshing data: {str(e)}")
 
+@api_router.post("/admin/migrations/marketplace-visibility")
+async def recompute_marketplace_visibility(current_user: User = Depends(require_admin)):
+    """Recompute the materialized marketplace_visible flag for every asset - Admin only"""
+    updated = await backfill_marketplace_visibility(only_missing=False)
+    await invalidate_asset_caches()
+    return {"message": "Marketplace visibility recomputed", "assets_updated": updated}
+
+async def get_campaign_names(campaign_ids: List[str]) -> Dict[str, str]:
+    if not campaign_ids:
+        return {}
+    campaigns = await db.campaigns.find(
+        {"id": {"$in": campaign_ids}}, {"_id": 0, "id": 1, "name": 1}
+    ).to_list(None)
+    return {campaign["id"]: campaign.get("name", "Unknown Campaign") for campaign in campaigns}
+
+async def get_last_inspection_dates(asset_ids: List[str]) -> Dict[str, Any]:
+    """Latest monitoring inspection_date per asset (optional data: failures yield {})"""
+    if not asset_ids:
+        return {}
+    try:
+        rows = await db.monitoring_records.aggregate([
+            {"$match": {"asset_id": {"$in": asset_ids}}},
+            {"$group": {"_id": "$asset_id", "last_inspection_date": {"$max": "$inspection_date"}}}
+        ]).to_list(None)
+        return {row["_id"]: row["last_inspection_date"] for row in rows}
+    except Exception as monitoring_error:
+        # Don't fail the whole request if monitoring data is unavailable
+        print(f"Warning: Could not fetch monitoring data for live assets: {monitoring_error}")
+        return {}
+
+def live_asset_terms(asset: dict, offer: Optional[dict]) -> tuple:
+    """(cost, duration, expiry_date) for a live asset based on its category"""
+    cost = 0
+    expiry_date = None
+    duration = "N/A"
+    
+    asset_category = asset.get("category", "Public")
+    
+    if asset_category == "Private Asset":
+        # For Private Assets: Use one_off_investment, duration and expiry are N/A
+        cost = asset.get("one_off_investment", 0)
+        duration = "N/A"
+        expiry_date = None
+        
+    elif asset_category == "Existing Asset":
+        # For Existing Assets: Calculate cost from monthly price and duration, use asset_expiry_date
+        expiry_date = asset.get("asset_expiry_date")
+        
+        if expiry_date and asset.get("pricing", {}).get("monthly_rate"):
+            # Calculate duration from created_at to asset_expiry_date
+            created_at = asset.get("created_at")
+            if created_at:
+                if isinstance(created_at, str):
+                    created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+                if isinstance(expiry_date, str):
+                    expiry_date = datetime.fromisoformat(expiry_date.replace("Z", "+00:00"))
+                
+                # Calculate duration in months
+                duration_months = max(1, round((expiry_date - created_at).days / 30.44))  # Average days per month
+                duration = f"{duration_months} month{'s' if duration_months > 1 else ''}"
+                
+                # Calculate cost: monthly_rate * duration_months
+                monthly_rate = asset.get("pricing", {}).get("monthly_rate", 0)
+                cost = monthly_rate * duration_months
+            else:
+                # Fallback if no created_at
+                cost = asset.get("pricing", {}).get("monthly_rate", 0)
+                duration = "1 month"
+        else:
+            # Fallback to pricing if available
+            cost = asset.get("pricing", {}).get("monthly_rate", 0)
+            
+    else:
+        # For Public Assets: Use offer data (existing logic)
+        cost = offer.get("final_offer") or offer.get("admin_quoted_price") if offer else 0
+        duration = offer.get("contract_duration", "1 month") if offer else "N/A"
+        expiry_date = offer.get("confirmed_end_date") or offer.get("tentative_end_date") if offer else asset.get("next_available_date")
+    
+    return cost, duration, expiry_date
+
 @api_router.get("/assets/live")
 async def get_live_assets(current_user: User = Depends(get_current_user)):
     """Get live assets for the current buyer"""
     try:
-        # Filter assets by buyer and Live status
-        live_assets = await db.assets.find({
-            "status": AssetStatus.LIVE,
-            "buyer_id": current_user.id
-        }).to_list(None)
-        
-        # Get approved/accepted/live offers for campaign details
-        approved_offers = await db.offer_requests.find({
-            "buyer_id": current_user.id,
-            "status": {"$in": ["Approved", "Accepted", "Live"]}  # Include Live status
-        }).to_list(None)
+        # Filter assets by buyer and Live status; get approved/accepted/live offers for campaign details
+        live_assets, approved_offers = await asyncio.gather(
+            db.assets.find(
+                {"status": AssetStatus.LIVE, "buyer_id": current_user.id},
+                {"_id": 0, "search_terms": 0, "search_tokens": 0}
+            ).to_list(None),
+            db.offer_requests.find({
+                "buyer_id": current_user.id,
+                "status": {"$in": ["Approved", "Accepted", "Live"]},  # Include Live status
+                **ASSET_OFFER_MATCH
+            }).to_list(None)
+        )
         
         # Create lookup for offers by asset_id for campaign details
         offers_by_asset = {offer["asset_id"]: offer for offer in approved_offers}
         
+        # Campaign names with one $in and last inspection dates with one $group/$max,
+        # fetched concurrently instead of two queries per asset
+        campaign_ids = list({
+            offers_by_asset[asset["id"]]["campaign_id"]
+            for asset in live_assets
+            if offers_by_asset.get(asset["id"], {}).get("campaign_id")
+        })
+        campaign_names, last_inspections = await asyncio.gather(
+            get_campaign_names(campaign_ids),
+            get_last_inspection_dates([asset["id"] for asset in live_assets])
+        )
+        
         live_assets_data = []
         
         for asset in live_assets:
@@ -2445,11 +3765,9 @@ async def get_live_assets(current_user: User = Depends(get_current_user)):
             # Get actual campaign name from campaigns collection
             campaign_name = "Unknown Campaign"
             if offer:
-                campaign_id = offer.get("existing_campaign_id") or offer.get("campaign_id")
+                campaign_id = offer.get("campaign_id")
                 if campaign_id:
-                    campaign = await db.campaigns.find_one({"id": campaign_id})
-                    if campaign:
-                        campaign_name = campaign.get("name", "Unknown Campaign")
+                    campaign_name = campaign_names.get(campaign_id, "Unknown Campaign")
                 elif offer.get("campaign_name"):
                     campaign_name = offer.get("campaign_name")
             
@@ -2460,65 +3778,8 @@ async def get_live_assets(current_user: User = Depends(get_current_user)):
             elif asset_category == "Existing Asset":
                 campaign_name = "Existing Asset"
             
-            # Get monitoring data for inspection dates (optional, non-blocking)
-            last_inspection_date = None
-            try:
-                monitoring_records = await db.monitoring_records.find({
-                    "asset_id": asset["id"]
-                }).sort("inspection_date", -1).limit(1).to_list(1)
-                
-                if monitoring_records:
-                    last_inspection_date = monitoring_records[0].get("inspection_date")
-            except Exception as monitoring_error:
-                # Don't fail the whole request if monitoring data is unavailable
-                print(f"Warning: Could not fetch monitoring data for asset {asset['id']}: {monitoring_error}")
-            
-            # Calculate cost and expiry based on asset category
-            cost = 0
-            expiry_date = None
-            duration = "N/A"
-            
-            asset_category = asset.get("category", "Public")
-            
-            if asset_category == "Private Asset":
-                # For Private Assets: Use one_off_investment, duration and expiry are N/A
-                cost = asset.get("one_off_investment", 0)
-                duration = "N/A"
-                expiry_date = None
-                
-            elif asset_category == "Existing Asset":
-                # For Existing Assets: Calculate cost from monthly price and duration, use asset_expiry_date
-                expiry_date = asset.get("asset_expiry_date")
-                
-                if expiry_date and asset.get("pricing", {}).get("monthly_rate"):
-                    # Calculate duration from created_at to asset_expiry_date
-                    created_at = asset.get("created_at")
-                    if created_at:
-                        if isinstance(created_at, str):
-                            created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-                        if isinstance(expiry_date, str):
-                            expiry_date = datetime.fromisoformat(expiry_date.replace("Z", "+00:00"))
-                        
-                        # Calculate duration in months
-                        duration_months = max(1, round((expiry_date - created_at).days / 30.44))  # Average days per month
-                        duration = f"{duration_months} month{'s' if duration_months > 1 else ''}"
-                        
-                        # Calculate cost: monthly_rate * duration_months
-                        monthly_rate = asset.get("pricing", {}).get("monthly_rate", 0)
-                        cost = monthly_rate * duration_months
-                    else:
-                        # Fallback if no created_at
-                        cost = asset.get("pricing", {}).get("monthly_rate", 0)
-                        duration = "1 month"
-                else:
-                    # Fallback to pricing if available
-                    cost = asset.get("pricing", {}).get("monthly_rate", 0)
-                    
-            else:
-                # For Public Assets: Use offer data (existing logic)
-                cost = offer.get("final_offer") or offer.get("admin_quoted_price") if offer else 0
-                duration = offer.get("contract_duration", "1 month") if offer else "N/A"
-                expiry_date = offer.get("confirmed_end_date") or offer.get("tentative_end_date") if offer else asset.get("next_available_date")
+            cost, duration, expiry_date = live_asset_terms(asset, offer)
+            last_inspection_date = last_inspections.get(asset["id"])
             
             live_asset = {
                 "id": asset["id"],
@@ -2559,15 +3820,15 @@ async def upload_po(
 ):
     """Upload PO document for an offer request"""
     try:
-        # Verify the offer request exists
-        offer_request = await db.offer_requests.find_one({"id": request_id})
-        if not offer_request:
-            raise HTTPException(status_code=404, detail="Offer request not found")
-        
         # Verify file is PDF
         if not file.content_type == "application/pdf":
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
+        # Cheap existence/status check so a doomed request never reaches Cloudinary
+        sources, new_status = OFFER_TRANSITIONS["upload_po"]
+        if not await db.offer_requests.find_one({"id": request_id, "status": {"$in": sources}}, {"_id": 0, "id": 1}):
+            raise await offer_transition_error(request_id, new_status, None)
+        
         # Read file content
         file_content = await file.read()
         
@@ -2579,7 +3840,9 @@ async def upload_po(
         file_base64 = base64.b64encode(file_content).decode('utf-8')
         data_uri = f"data:application/pdf;base64,{file_base64}"
         
-        upload_result = cloudinary.uploader.upload(
+        # The Cloudinary SDK blocks on network I/O, so keep it off the event loop
+        upload_result = await asyncio.to_thread(
+            cloudinary.uploader.upload,
             data_uri,
             resource_type="raw",  # Use raw resource type for public PDF access
             folder="purchase_orders",
@@ -2592,53 +3855,40 @@ async def upload_po(
         # Use the direct secure_url without signing for now
         po_document_url = upload_result["secure_url"]
         
-        # Determine new status based on uploader
-        new_status = "PO Uploaded"
-        
-        # Calculate tentative end date for next_available_date
-        tentative_start = offer_request.get("tentative_start_date")
-        tentative_end = offer_request.get("tentative_end_date")
-        
-        # If no tentative dates, calculate from current date + contract duration
-        if not tentative_start:
-            tentative_start = datetime.utcnow()
-        
-        if not tentative_end:
-            # Calculate end date based on contract duration
-            contract_duration = offer_request.get("contract_duration", "1_month")
-            if contract_duration == "1_month":
-                tentative_end = tentative_start + timedelta(days=30)
-            elif contract_duration == "3_months":
-                tentative_end = tentative_start + timedelta(days=90)
-            elif contract_duration == "6_months":
-                tentative_end = tentative_start + timedelta(days=180)
-            elif contract_duration == "12_months":
-                tentative_end = tentative_start + timedelta(days=365)
-            else:
-                tentative_end = tentative_start + timedelta(days=30)  # Default to 1 month
-        
-        # Update offer request with PO info
-        update_data = {
-            "po_document_url": po_document_url,  # Use the generated signed URL or secure_url
-            "po_uploaded_by": uploaded_by,
-            "po_uploaded_at": datetime.utcnow(),
-            "status": new_status,
-            "updated_at": datetime.utcnow()
-        }
-        
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": update_data}
-        )
+        # Record the PO and move the offer to "PO Uploaded" in one conditional write
+        now = datetime.utcnow()
+        try:
+            offer_request = await transition_offer(
+                request_id,
+                sources,
+                new_status,
+                {
+                    "po_document_url": po_document_url,
+                    "po_uploaded_by": uploaded_by,
+                    "po_uploaded_at": now
+                },
+                now=now
+            )
+        except HTTPException:
+            # The offer changed between the check and the write; don't orphan the upload
+            try:
+                await asyncio.to_thread(
+                    cloudinary.uploader.destroy, upload_result["public_id"], resource_type="raw"
+                )
+            except Exception as e:
+                logger.warning(f"Could not delete orphaned PO upload {upload_result.get('public_id')}: {str(e)}")
+            raise
         
         # Update asset next_available_date for calendar blocking, but keep original status
-        await db.assets.update_one(
-            {"id": offer_request["asset_id"]},
+        _, tentative_end = offer_booking_window(offer_request, now)
+        await apply_offer_side_effects(
+            offer_request,
+            {**offer_request, "status": new_status},
             {"$set": {
                 "buyer_id": offer_request["buyer_id"],
                 "buyer_name": offer_request["buyer_name"],
                 "next_available_date": tentative_end,  # Set next available date for calendar blocking
-                "updated_at": datetime.utcnow()
+                "updated_at": now
             }}
         )
         
@@ -2648,80 +3898,34 @@ async def upload_po(
             "status": new_status
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading PO: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error uploading PO: {str(e)}")
 
-
-@api_router.post("/offers/{request_id}/make-live")
-async def make_offer_live(
-    request_id: str,
-    admin_user: User = Depends(require_admin)
-):
-    """Make an offer live (admin only)"""
-    try:
-        # Get offer request details
-        offer_request = await db.offer_requests.find_one({"id": request_id})
-        if not offer_request:
-            raise HTTPException(status_code=404, detail="Offer request not found")
-        
-        # Calculate confirmed dates based on tentative dates or contract duration
-        tentative_start = offer_request.get("tentative_start_date")
-        tentative_end = offer_request.get("tentative_end_date")
-        
-        # If no tentative dates, calculate from current date + contract duration
-        if not tentative_start:
-            tentative_start = datetime.utcnow()
-        
-        if not tentative_end:
-            # Calculate end date based on contract duration
-            contract_duration = offer_request.get("contract_duration", "1_month")
-            if contract_duration == "1_month":
-                tentative_end = tentative_start + timedelta(days=30)
-            elif contract_duration == "3_months":
-                tentative_end = tentative_start + timedelta(days=90)
-            elif contract_duration == "6_months":
-                tentative_end = tentative_start + timedelta(days=180)
-            elif contract_duration == "12_months":
-                tentative_end = tentative_start + timedelta(days=365)
-            else:
-                tentative_end = tentative_start + timedelta(days=30)  # Default to 1 month
-        
-        # Update offer status to Live with confirmed dates
-        await db.offer_requests.update_one(
-            {"id": request_id},
-            {"$set": {
-                "status": "Live",
-                "confirmed_start_date": tentative_start,
-                "confirmed_end_date": tentative_end,
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        
-        # Update asset status to Live with booking info
-        await db.assets.update_one(
-            {"id": offer_request["asset_id"]},
-            {"$set": {
-                "status": AssetStatus.LIVE,
-                "buyer_id": offer_request["buyer_id"],
-                "buyer_name": offer_request["buyer_name"],
-                "next_available_date": tentative_end,  # Asset becomes available after booking ends
-                "updated_at": datetime.utcnow()
-            }}
+
+@api_router.post("/offers/{request_id}/make-live")
+async def make_offer_live(
+    request_id: str,
+    admin_user: User = Depends(require_admin)
+):
+    """Make an offer live (admin only)"""
+    try:
+        # Move the offer to Live with its confirmed booking window (tentative dates or
+        # contract duration) in one conditional write
+        now = datetime.utcnow()
+        offer_request = await transition_offer(request_id, *OFFER_TRANSITIONS["make_live"], book=True, now=now)
+        tentative_start, tentative_end = offer_booking_window(offer_request, now)
+        
+        # Book the asset for the buyer and mark a Draft / Ready campaign Live
+        await apply_offer_side_effects(
+            offer_request,
+            {**offer_request, "status": "Live"},
+            booked_asset_update(offer_request, tentative_end, now),
+            campaign_live_operation(offer_request, ["Draft", "Ready"], now)
         )
         
-        # Update campaign status to "Live" if asset gets booked
-        campaign_id = offer_request.get("existing_campaign_id") or offer_request.get("campaign_id")
-        if campaign_id:
-            # Check if campaign should be marked as Live
-            campaign = await db.campaigns.find_one({"id": campaign_id})
-            if campaign and campaign.get("status") in ["Draft", "Ready"]:
-                # If campaign has at least one booked asset, mark as Live
-                await db.campaigns.update_one(
-                    {"id": campaign_id},
-                    {"$set": {"status": "Live", "updated_at": datetime.utcnow()}}
-                )
-        
         # Handle monitoring service bundle if included in the offer
         service_bundles = offer_request.get("service_bundles", {})
         if service_bundles.get("monitoring", False):
@@ -2758,6 +3962,8 @@ async def make_offer_live(
         
         return {"message": "Offer is now live"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error making offer live: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error making offer live: {str(e)}")
@@ -2781,57 +3987,39 @@ async def get_users_by_role(
         raise HTTPException(status_code=500, detail=f"Error fetching users: {str(e)}")
 
 # Enhanced Asset CRUD Routes
-@api_router.get("/assets", response_model=List[Asset])
+@api_router.get("/assets", response_model=Union[List[Asset], AssetPage])
 async def get_assets(
     current_user: User = Depends(get_current_user),
     type: Optional[str] = None,
     status: Optional[str] = None,
     division: Optional[str] = None,
-    marketplace: Optional[bool] = None  # New parameter for marketplace filtering
+    marketplace: Optional[bool] = None,  # New parameter for marketplace filtering
+    district: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_key: str = Query("monthly_rate", pattern=r"^[A-Za-z0-9_]+$"),
+    q: Optional[str] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size; enables paginated response")
 ):
-    """Get assets with optional filtering and marketplace visibility control"""
+    """Get assets with optional filtering and marketplace visibility control
+    
+    Without limit the full (capped) list is returned as before; with limit the response
+    is a page: {items, total, next_cursor, limit}.
+    """
     query = {}
     
     # Marketplace filtering - buyers should only see assets with marketplace visibility
     if marketplace or current_user.role == UserRole.BUYER:
-        # Complex filtering for marketplace visibility:
-        # 1. NEVER show Private Assets (category = "Private Asset")
-        # 2. ONLY show Existing Assets if show_in_marketplace=True AND status=Live  
-        # 3. Show Public Assets (category = "Public" or no category - legacy assets)
-        # 4. Show legacy assets (no category field) as they are treated as Public
-        
-        query["$and"] = [
-            # Exclude Private Assets explicitly
-            {"category": {"$ne": "Private Asset"}},
-            
-            # Apply marketplace visibility rules
-            {"$or": [
-                # Show Public Assets (explicit category or no category for legacy)
-                {"$or": [
-                    {"category": "Public"},
-                    {"category": {"$exists": False}},  # Legacy assets without category
-                    {"category": None},                # Assets with null category
-                    {"category": ""}                   # Assets with empty string category
-                ]},
-                
-                # Show Existing Assets ONLY if conditions are met
-                {"$and": [
-                    {"category": "Existing Asset"},
-                    {"show_in_marketplace": True},
-                    {"$or": [
-                        {"status": "Live"},
-                        {"status": "Available"},
-                        {"status": "Pending Offer"}
-                    ]}
-                ]}
-            ]}
-        ]
+        # Visibility rule is materialized on write (see is_marketplace_visible)
+        query["marketplace_visible"] = True
     
     # Filter by seller for seller users (they can see all their assets regardless of category)
     if current_user.role == UserRole.SELLER:
         query["seller_id"] = current_user.id
-        # Remove category filter for sellers to see all their assets
-        query.pop("$and", None)
+        # Remove visibility filter for sellers to see all their assets
+        query.pop("marketplace_visible", None)
     
     # Admin can see all assets by default (no category filter unless marketplace=True)
     if current_user.role in [UserRole.ADMIN, UserRole.MANAGER] and not marketplace:
@@ -2839,25 +4027,35 @@ async def get_assets(
         pass
     
     # Apply filters
-    if type and type != "all":
-        query["type"] = type
-    if status and status != "all":
-        query["status"] = status
-    if division and division != "all":
-        query["division"] = division
+    build_asset_filter_query(query, type, status, division, district, min_price, max_price, price_key, q)
     
-    assets = await db.assets.find(query).to_list(1000)
+    next_cursor = None
+    if limit is not None:
+        page_query, sort_spec = apply_asset_page(query, sort, price_key, cursor)
+        assets = await db.assets.find(page_query).sort(sort_spec).limit(limit + 1).to_list(limit + 1)
+        assets, next_cursor = split_asset_page(assets, limit, sort, price_key)
+    else:
+        assets = await db.assets.find(query).to_list(1000)
     
     # For marketplace requests, enhance assets with offer request status information
     if marketplace or current_user.role == UserRole.BUYER:
+        # Fetch PO Uploaded offers for the whole page in one query and join in memory
+        asset_ids = [asset["id"] for asset in assets]
+        po_uploaded_offers = await db.offer_requests.find(
+            {"asset_id": {"$in": asset_ids}, "status": "PO Uploaded"}
+        ).sort("created_at", -1).to_list(None) if asset_ids else []
+        
+        po_uploaded_by_asset = {}
+        for offer in po_uploaded_offers:
+            # Sorted newest first, so keep the first offer seen per asset
+            po_uploaded_by_asset.setdefault(offer["asset_id"], offer)
+        
         enhanced_assets = []
         for asset in assets:
             asset_dict = dict(asset)
             
-            # Find any offer request for this asset with PO Uploaded status (not just latest)
-            po_uploaded_offer = await db.offer_requests.find_one(
-                {"asset_id": asset["id"], "status": "PO Uploaded"}
-            )
+            # Any offer request for this asset with PO Uploaded status (not just latest)
+            po_uploaded_offer = po_uploaded_by_asset.get(asset["id"])
             
             # Add flag to indicate if asset is waiting for go live
             asset_dict["waiting_for_go_live"] = po_uploaded_offer is not None
@@ -2873,9 +4071,20 @@ async def get_assets(
             
             enhanced_assets.append(asset_dict)
         
-        return enhanced_assets
+        if limit is None:
+            return enhanced_assets
+        items = [
+            {**Asset(**asset).dict(), "waiting_for_go_live": asset["waiting_for_go_live"],
+             "asset_expiry_date": asset.get("asset_expiry_date")}
+            for asset in enhanced_assets
+        ]
+    elif limit is None:
+        return [Asset(**asset) for asset in assets]
+    else:
+        items = [Asset(**asset).dict() for asset in assets]
     
-    return [Asset(**asset) for asset in assets]
+    total = await db.assets.count_documents(query)
+    return {"items": items, "total": total, "next_cursor": next_cursor, "limit": limit}
 
 @api_router.get("/assets/{asset_id}", response_model=Asset)
 async def get_asset(asset_id: str, current_user: User = Depends(get_current_user)):
@@ -2961,7 +4170,12 @@ async def create_asset(
             raise HTTPException(status_code=400, detail="Invalid asset expiry date format")
     
     asset = Asset(**asset_data)
-    await db.assets.insert_one(asset.dict())
+    asset_doc = asset.dict()
+    asset_doc["marketplace_visible"] = is_marketplace_visible(asset_doc)
+    asset_doc["geo_location"] = to_geojson_point(asset_doc.get("location"))
+    asset_doc.update(build_search_fields(asset_doc))
+    await db.assets.insert_one(asset_doc)
+    await invalidate_asset_caches()
     
     return asset
 
@@ -2986,11 +4200,18 @@ async def update_asset(
         asset_data.pop("seller_id", None)
         asset_data.pop("seller_name", None)
     
+    # Keep the indexed GeoJSON point in sync with location
+    if "location" in asset_data:
+        asset_data["geo_location"] = to_geojson_point(asset_data["location"])
+    if any(field in asset_data for field in SEARCH_FIELDS):
+        asset_data.update(build_search_fields({**asset, **asset_data}))
+    
     updated_asset = await db.assets.find_one_and_update(
         {"id": asset_id},
-        {"$set": asset_data},
+        with_marketplace_visibility(asset_data),
         return_document=True
     )
+    await invalidate_asset_caches()
     
     return Asset(**updated_asset)
 
@@ -3009,6 +4230,7 @@ async def delete_asset(
         raise HTTPException(status_code=403, detail="Can only delete your own assets")
     
     await db.assets.delete_one({"id": asset_id})
+    await invalidate_asset_caches()
     return {"message": "Asset deleted successfully"}
 
 @api_router.patch("/assets/{asset_id}/creative")
@@ -3051,6 +4273,18 @@ async def get_all_users(admin_user: User = Depends(require_admin)):
     users = await db.users.find({}).to_list(1000)
     return [User(**user) for user in users]
 
+@api_router.get("/admin/metrics")
+async def get_runtime_metrics(admin_user: User = Depends(require_admin)):
+    """Get in-process runtime metrics for this worker"""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "last_login_buffer": last_login_buffer.stats(),
+        "password_hasher": password_hasher.stats(),
+        "cluster_cache": cluster_cache.stats(),
+        "public_response_cache": public_response_cache.stats(),
+        "scheduler": scheduler.stats(),
+    }
+
 @api_router.get("/users", response_model=List[User])
 async def get_users_by_role(
     role: Optional[str] = Query(None, description="Filter users by role"),
@@ -3089,6 +4323,7 @@ async def update_user_status(
         {"id": user_id},
         {"$set": update_data}
     )
+    invalidate_principal(user_id)
     
     # Send notification email
     user_obj = User(**user)
@@ -3120,7 +4355,7 @@ async def create_user_admin(
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    user_data["password_hash"] = hash_password(user_data.get("password", "tempPassword123"))
+    user_data["password_hash"] = await password_hasher.hash(user_data.get("password", "tempPassword123"))
     if "password" in user_data:
         del user_data["password"]  # Remove plain password
     user_data["status"] = UserStatus.PENDING  # Default status for admin-created users
@@ -3144,7 +4379,7 @@ async def update_user_admin(
     
     # Handle password update with proper hashing
     if "password" in user_data and user_data["password"]:
-        user_data["password_hash"] = hash_password(user_data["password"])
+        user_data["password_hash"] = await password_hasher.hash(user_data["password"])
         del user_data["password"]  # Remove plain text password
     
     # Don't allow updating created_at
@@ -3158,6 +4393,7 @@ async def update_user_admin(
         {"$set": user_data},
         return_document=True
     )
+    invalidate_principal(user_id)
     
     return User(**updated_user)
 
@@ -3181,9 +4417,12 @@ async def delete_user_admin(
     
     # Delete user's assets (if seller)
     await db.assets.delete_many({"seller_id": user_id})
+    await invalidate_asset_caches()
     
     # Delete the user
     await db.users.delete_one({"id": user_id})
+    invalidate_principal(user_id)
+    last_login_buffer.discard(user_id)
     
     return {"message": f"User and associated data deleted successfully"}
 
@@ -3208,8 +4447,9 @@ async def update_asset_status(
     
     await db.assets.update_one(
         {"id": asset_id},
-        {"$set": update_data}
+        with_marketplace_visibility(update_data)
     )
+    await invalidate_asset_caches()
     
     # Notify seller
     seller = await db.users.find_one({"id": asset["seller_id"]})
@@ -3234,6 +4474,9 @@ class Campaign(BaseModel):
     campaign_assets: List[CampaignAsset] = []  # Enhanced asset management
     status: CampaignStatus = CampaignStatus.DRAFT
     budget: Optional[float] = None
+    # Denormalized from offer_requests, see apply_campaign_counter_change
+    asset_counts_by_status: Dict[str, int] = {}
+    total_quoted_value: float = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     start_date: Optional[datetime] = None
@@ -3247,41 +4490,333 @@ class CampaignCreate(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
 
-# Admin Campaign Management Endpoints
-@api_router.get("/admin/campaigns")
-async def get_all_campaigns_admin(admin_user: User = Depends(require_admin)):
-    """Get all campaigns for admin management"""
-    campaigns = await db.campaigns.find({}).to_list(1000)
+# Campaign listing helpers
+CAMPAIGN_OFFER_ASSET_FIELDS = ["asset_id", "asset_name", "status", "buyer_id"]
+
+async def fetch_newest_page(collection, query: dict, cursor: Optional[str], limit: int, projection: Optional[dict] = None) -> tuple:
+    """Return (docs, next_cursor) for a newest-first keyset page on (created_at, id)"""
+    page_query = query
+    if cursor:
+        page_query = {"$and": [query, build_keyset_condition(decode_asset_cursor(cursor, "newest"), "created_at", -1)]}
+    docs = await collection.find(page_query, projection).sort([("created_at", -1), ("id", -1)]).limit(limit + 1).to_list(limit + 1)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_asset_cursor(docs[-1], "newest", "created_at")
+
+async def fetch_campaign_page(query: dict, cursor: Optional[str], limit: Optional[int]) -> tuple:
+    """Return (campaigns, next_cursor); without limit the legacy unsorted list is returned"""
+    if limit is None:
+        return await db.campaigns.find(query).to_list(1000), None
+    return await fetch_newest_page(db.campaigns, query, cursor, limit)
+
+async def attach_campaign_offer_assets(campaigns: list) -> list:
+    """Serialize campaigns with campaign_assets built from their offer requests
+    
+    All campaigns are resolved with a single $in query on campaign_id and joined in memory.
+    """
+    campaign_ids = [campaign["id"] for campaign in campaigns]
+    offers = await db.offer_requests.find(
+        {"campaign_id": {"$in": campaign_ids}, **ASSET_OFFER_MATCH},
+        {"_id": 0, "campaign_id": 1, **{field: 1 for field in CAMPAIGN_OFFER_ASSET_FIELDS}}
+    ).to_list(None) if campaigns else []
+    
+    offers_by_campaign = {}
+    for offer in offers:
+        offers_by_campaign.setdefault(offer["campaign_id"], []).append(offer)
     
-    # Enhance campaigns with asset count information
     enhanced_campaigns = []
     for campaign in campaigns:
         campaign_dict = Campaign(**campaign).dict()
         
-        # Get offer requests for this campaign
-        campaign_offers = await db.offer_requests.find({
-            "$or": [
-                {"existing_campaign_id": campaign["id"]},
-                {"campaign_name": campaign.get("name", "")}
-            ]
-        }).to_list(1000)
-        
-        # Add simple campaign assets information for counting
-        campaign_dict["campaign_assets"] = []
-        for offer in campaign_offers:
-            # Add minimal asset info for counting purposes
-            asset_info = {
-                "asset_id": offer.get("asset_id"),
-                "asset_name": offer.get("asset_name"),
-                "status": offer.get("status"),
-                "buyer_id": offer.get("buyer_id")
-            }
-            campaign_dict["campaign_assets"].append(asset_info)
+        # Add minimal asset info for counting purposes
+        campaign_dict["campaign_assets"] = [
+            {field: offer.get(field) for field in CAMPAIGN_OFFER_ASSET_FIELDS}
+            for offer in offers_by_campaign.get(campaign["id"], [])
+        ]
         
         enhanced_campaigns.append(campaign_dict)
-    
     return enhanced_campaigns
 
+# ====================================
+# OFFER -> CAMPAIGN LINK
+# ====================================
+
+# Offers used to join campaigns on existing_campaign_id OR campaign_name, which can't
+# use one index and mismatches when names collide. campaign_id is resolved once:
+# the explicit campaign id, else the buyer's own campaign of that name.
+OFFER_CAMPAIGN_BACKFILL_BATCH_SIZE = 500
+# Monitoring-service requests live in offer_requests too and store campaign_id at top
+# level (a campaign id or "Existing" / "Private" / "Individual"); every campaign join,
+# counter and cascade on campaign_id must leave them out.
+MONITORING_SERVICE_REQUEST_TYPE = "monitoring_service"
+ASSET_OFFER_MATCH = {"request_type": {"$ne": MONITORING_SERVICE_REQUEST_TYPE}}
+
+def offer_campaign_id(offer: dict) -> Optional[str]:
+    """The campaign an asset offer belongs to (None for monitoring-service requests)"""
+    if offer.get("request_type") == MONITORING_SERVICE_REQUEST_TYPE:
+        return None
+    return offer.get("campaign_id")
+
+def pick_campaign_by_name(candidates: list) -> Optional[dict]:
+    # Several same-named campaigns of one buyer: the most recently created wins
+    if not candidates:
+        return None
+    return max(candidates, key=lambda campaign: campaign.get("created_at") or datetime.min)
+
+async def resolve_offer_campaign_id(buyer_id: str, existing_campaign_id: Optional[str], campaign_name: Optional[str]) -> Optional[str]:
+    if existing_campaign_id:
+        return existing_campaign_id
+    if not campaign_name:
+        return None
+    candidates = await db.campaigns.find(
+        {"buyer_id": buyer_id, "name": campaign_name}, {"_id": 0, "id": 1, "created_at": 1}
+    ).to_list(None)
+    campaign = pick_campaign_by_name(candidates)
+    return campaign["id"] if campaign else None
+
+async def link_offers_to_campaign(campaign: dict):
+    """Attach unlinked offers the buyer made under this campaign's name before it existed"""
+    result = await db.offer_requests.update_many(
+        {"buyer_id": campaign["buyer_id"], "campaign_name": campaign["name"], "campaign_id": None},
+        {"$set": {"campaign_id": campaign["id"]}}
+    )
+    if result.modified_count:
+        await reconcile_campaign_counters([campaign["id"]])
+
+async def backfill_offer_campaign_ids(batch_size: int = OFFER_CAMPAIGN_BACKFILL_BATCH_SIZE) -> int:
+    """Resolve campaign_id on legacy offer requests in batches
+    
+    Resumable: processed offers get campaign_id set (None when nothing matches), so an
+    interrupted run picks up where it stopped. Each batch costs one campaigns query and
+    one bulk write.
+    """
+    updated = 0
+    last_id = None
+    while True:
+        query = {"campaign_id": {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        offers = await db.offer_requests.find(
+            query, {"_id": 1, "buyer_id": 1, "existing_campaign_id": 1, "campaign_name": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not offers:
+            return updated
+        last_id = offers[-1]["_id"]
+        
+        explicit_ids = list({offer["existing_campaign_id"] for offer in offers if offer.get("existing_campaign_id")})
+        names = list({offer["campaign_name"] for offer in offers if offer.get("campaign_name")})
+        buyers = list({offer.get("buyer_id") for offer in offers})
+        campaigns = await db.campaigns.find(
+            {"$or": [
+                {"id": {"$in": explicit_ids}},
+                {"name": {"$in": names}, "buyer_id": {"$in": buyers}}
+            ]},
+            {"_id": 0, "id": 1, "name": 1, "buyer_id": 1, "created_at": 1}
+        ).to_list(None)
+        existing_ids = {campaign["id"] for campaign in campaigns}
+        by_name = {}
+        for campaign in campaigns:
+            by_name.setdefault((campaign.get("buyer_id"), campaign.get("name")), []).append(campaign)
+        
+        operations = []
+        for offer in offers:
+            campaign_id = offer.get("existing_campaign_id")
+            if campaign_id not in existing_ids:
+                campaign = pick_campaign_by_name(by_name.get((offer.get("buyer_id"), offer.get("campaign_name")), []))
+                campaign_id = campaign["id"] if campaign else None
+            operations.append(UpdateOne({"_id": offer["_id"]}, {"$set": {"campaign_id": campaign_id}}))
+        result = await db.offer_requests.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+# ====================================
+# CAMPAIGN OFFER COUNTERS
+# ====================================
+
+# Each campaign stores asset_counts_by_status and total_quoted_value for the offers
+# attached to it. Offer transitions move their contribution with $inc; the
+# reconciliation job recomputes everything from offer_requests and repairs drift.
+QUOTE_EXCLUDED_OFFER_STATUSES = ["Rejected"]
+
+def offer_campaign_filter(offer: dict) -> Optional[dict]:
+    """The campaign an offer counts towards"""
+    campaign_id = offer_campaign_id(offer)
+    return {"id": campaign_id} if campaign_id else None
+
+def offer_counter_contribution(offer: dict) -> dict:
+    status = offer.get("status") or "Unknown"
+    contribution = {f"asset_counts_by_status.{status}": 1}
+    quoted = offer.get("admin_quoted_price")
+    if status not in QUOTE_EXCLUDED_OFFER_STATUSES and isinstance(quoted, (int, float)) and quoted:
+        contribution["total_quoted_value"] = quoted
+    return contribution
+
+def campaign_counter_increments(before: Optional[dict], after: Optional[dict]) -> list:
+    """[(campaign_filter, $inc document)] moving an offer's contribution from before to after"""
+    increments = {}
+    for offer, sign in ((before, -1), (after, 1)):
+        campaign_filter = offer_campaign_filter(offer) if offer else None
+        if campaign_filter is None:
+            continue
+        inc = increments.setdefault(tuple(sorted(campaign_filter.items())), {})
+        for field, value in offer_counter_contribution(offer).items():
+            inc[field] = inc.get(field, 0) + sign * value
+    return [
+        (dict(key), {field: value for field, value in inc.items() if value})
+        for key, inc in increments.items()
+        if any(inc.values())
+    ]
+
+async def apply_campaign_counter_change(before: Optional[dict], after: Optional[dict]):
+    """Atomically apply an offer transition (None before = created, None after = deleted)"""
+    for campaign_filter, inc in campaign_counter_increments(before, after):
+        await db.campaigns.update_one(campaign_filter, {"$inc": inc})
+
+async def reconcile_campaign_counters(campaign_ids: Optional[List[str]] = None) -> dict:
+    """Recompute campaign counters (all, or the given campaigns) from offer_requests and
+    repair the ones that drifted
+    
+    Writes racing with the job can be overwritten with a value that is briefly off;
+    the next run repairs it.
+    """
+    offer_match = {"campaign_id": {"$in": campaign_ids}} if campaign_ids is not None else {}
+    offer_match.update(ASSET_OFFER_MATCH)
+    campaign_match = {"id": {"$in": campaign_ids}} if campaign_ids is not None else {}
+    groups = await db.offer_requests.aggregate([
+        {"$match": offer_match},
+        {"$group": {
+            "_id": {"campaign_id": "$campaign_id", "status": "$status"},
+            "count": {"$sum": 1},
+            "quoted": {"$sum": {"$cond": [
+                {"$in": ["$status", QUOTE_EXCLUDED_OFFER_STATUSES]}, 0, {"$ifNull": ["$admin_quoted_price", 0]}
+            ]}}
+        }}
+    ]).to_list(None)
+    campaigns = await db.campaigns.find(
+        campaign_match, {"_id": 0, "id": 1, "asset_counts_by_status": 1, "total_quoted_value": 1}
+    ).to_list(None)
+    
+    expected = {campaign["id"]: ({}, 0) for campaign in campaigns}
+    for group in groups:
+        campaign_id = group["_id"].get("campaign_id")
+        if campaign_id not in expected:
+            continue
+        status = group["_id"].get("status") or "Unknown"
+        counts, quoted = expected[campaign_id]
+        counts[status] = counts.get(status, 0) + group["count"]
+        expected[campaign_id] = (counts, quoted + group["quoted"])
+    
+    operations = []
+    for campaign in campaigns:
+        counts, quoted = expected[campaign["id"]]
+        stored_counts = {status: count for status, count in (campaign.get("asset_counts_by_status") or {}).items() if count}
+        if stored_counts != counts or abs((campaign.get("total_quoted_value") or 0) - quoted) > 0.005:
+            operations.append(UpdateOne(
+                {"id": campaign["id"]},
+                {"$set": {"asset_counts_by_status": counts, "total_quoted_value": quoted}}
+            ))
+    if operations:
+        await db.campaigns.bulk_write(operations, ordered=False)
+        await bump_data_version()
+        logger.warning(f"Repaired offer counters on {len(operations)} of {len(campaigns)} campaigns")
+    return {"checked": len(campaigns), "repaired": len(operations)}
+
+@api_router.post("/admin/maintenance/reconcile-campaign-counters")
+async def reconcile_campaign_counters_admin(admin_user: User = Depends(require_admin)):
+    """Recompute denormalized campaign offer counters and repair drift (admin only)"""
+    return await reconcile_campaign_counters()
+
+CAMPAIGN_CASCADE_BATCH_SIZE = 500
+
+async def cascade_delete_campaign(campaign: dict, progress=None) -> dict:
+    """Free a campaign's assets, delete its offer requests and then the campaign
+    
+    Assets are released with update_many over the distinct asset ids in batches;
+    everything runs in one transaction when the deployment supports it.
+    """
+    campaign_id = campaign["id"]
+    offer_filter = {"campaign_id": campaign_id, **ASSET_OFFER_MATCH}
+    asset_ids = {asset.get("asset_id") for asset in campaign.get("assets") or [] if asset.get("asset_id")}
+    asset_ids.update(await db.offer_requests.distinct("asset_id", offer_filter))
+    asset_ids.discard(None)
+    asset_ids = sorted(asset_ids)
+    
+    release = with_marketplace_visibility({
+        "status": AssetStatus.AVAILABLE,
+        "buyer_id": None,
+        "buyer_name": None,
+        "next_available_date": None,
+        "updated_at": datetime.utcnow()
+    })
+    
+    async def cascade(session=None) -> tuple:
+        for start in range(0, len(asset_ids), CAMPAIGN_CASCADE_BATCH_SIZE):
+            batch = asset_ids[start:start + CAMPAIGN_CASCADE_BATCH_SIZE]
+            await db.assets.update_many({"id": {"$in": batch}}, release, session=session)
+            if progress:
+                await progress(start + len(batch), len(asset_ids))
+        deleted = await db.offer_requests.delete_many(offer_filter, session=session)
+        await db.campaigns.delete_one({"id": campaign_id}, session=session)
+        return deleted.deleted_count
+    
+    if await transactions_supported():
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                offer_requests_deleted = await cascade(session)
+    else:
+        offer_requests_deleted = await cascade()
+    await invalidate_asset_caches()
+    print(f"✅ Campaign {campaign_id} deleted: {len(asset_ids)} assets freed, {offer_requests_deleted} offer requests deleted")
+    
+    # The buyer lookup is only needed for the WebSocket message; keep it off the request path
+    spawn_background_task(notify_campaign_deleted(campaign))
+    
+    return {"assets_freed": len(asset_ids), "offer_requests_deleted": offer_requests_deleted}
+
+async def notify_campaign_deleted(campaign: dict):
+    """Send real-time notification to the campaign's buyer (if connected)"""
+    try:
+        buyer_id = campaign.get("buyer_id")
+        if buyer_id:
+            buyer = await db.users.find_one({"id": buyer_id}, {"_id": 0, "email": 1})
+            if buyer:
+                await websocket_manager.send_to_user(buyer["email"], {
+                    "type": "campaign_deleted",
+                    "campaign_id": campaign["id"],
+                    "campaign_name": campaign.get("name"),
+                    "message": f"Campaign '{campaign.get('name')}' has been deleted by admin",
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+                print(f"✅ Notified buyer {buyer['email']} of campaign deletion")
+    except Exception as ws_error:
+        print(f"⚠️ WebSocket notification failed: {ws_error}")
+
+# Admin Campaign Management Endpoints
+@api_router.get("/admin/campaigns")
+async def get_all_campaigns_admin(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; enables paginated response"),
+    include_assets: bool = Query(True, description="Attach campaign_assets from offer requests; counters are always included"),
+    admin_user: User = Depends(require_admin)
+):
+    """Get all campaigns for admin management
+    
+    Without limit every campaign is returned as before; with limit the response is a
+    newest-first page: {items, total, next_cursor, limit}.
+    """
+    campaigns, next_cursor = await fetch_campaign_page({}, cursor, limit)
+    
+    # Enhance campaigns with asset count information (one offer query for the whole page)
+    if include_assets:
+        enhanced_campaigns = await attach_campaign_offer_assets(campaigns)
+    else:
+        enhanced_campaigns = [Campaign(**campaign).dict() for campaign in campaigns]
+    
+    if limit is None:
+        return enhanced_campaigns
+    total = await db.campaigns.count_documents({})
+    return {"items": enhanced_campaigns, "total": total, "next_cursor": next_cursor, "limit": limit}
+
 @api_router.post("/admin/campaigns", response_model=Campaign)
 async def create_campaign_admin(
     campaign_data: dict,
@@ -3303,6 +4838,8 @@ async def create_campaign_admin(
     )
     
     await db.campaigns.insert_one(campaign.dict())
+    await link_offers_to_campaign(campaign.dict())
+    await bump_data_version()
     return campaign
 
 @api_router.put("/admin/campaigns/{campaign_id}", response_model=Campaign)
@@ -3329,108 +4866,46 @@ async def update_campaign_admin(
         {"$set": campaign_data},
         return_document=True
     )
+    await bump_data_version()
     
     return Campaign(**updated_campaign)
 
 @api_router.delete("/admin/campaigns/{campaign_id}")
 async def delete_campaign_admin(
     campaign_id: str,
+    background: bool = Query(False, description="Run the cascade as a background job and return its job id"),
     admin_user: User = Depends(require_admin)
 ):
-    """Delete campaign (admin only) - Enhanced with proper cleanup"""
+    """Delete campaign (admin only) - Enhanced with proper cleanup
+    
+    Frees the campaign's assets, deletes its offer requests and the campaign itself.
+    With background=true the API answers immediately with a job id, see /admin/jobs/{job_id}.
+    """
     campaign = await db.campaigns.find_one({"id": campaign_id})
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     
     print(f"🗑️ Admin deleting campaign: {campaign_id} ({campaign.get('name')})")
     
-    # Step 1: Get all assets associated with this campaign and make them available
-    campaign_assets = []
-    if campaign.get("assets"):
-        for asset_data in campaign["assets"]:
-            asset_id = asset_data.get("asset_id")
-            if asset_id:
-                campaign_assets.append(asset_id)
-    
-    # Free up all campaign assets - make them Available
-    if campaign_assets:
-        result = await db.assets.update_many(
-            {"id": {"$in": campaign_assets}},
-            {"$set": {
-                "status": AssetStatus.AVAILABLE,
-                "buyer_id": None,
-                "buyer_name": None, 
-                "next_available_date": None,
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        print(f"✅ Freed up {result.modified_count} assets from campaign")
-    
-    # Step 2: Handle offer requests associated with this campaign
-    # Find offer requests that reference this campaign
-    offer_requests = await db.offer_requests.find({
-        "$or": [
-            {"existing_campaign_id": campaign_id},
-            {"campaign_name": campaign.get("name")}
-        ]
-    }).to_list(None)
-    
-    if offer_requests:
-        print(f"🔍 Found {len(offer_requests)} offer requests associated with campaign")
-        
-        # For each offer request, free up the asset and delete/update the request
-        for request in offer_requests:
-            asset_id = request.get("asset_id")
-            if asset_id:
-                # Make the asset available
-                await db.assets.update_one(
-                    {"id": asset_id},
-                    {"$set": {
-                        "status": AssetStatus.AVAILABLE,
-                        "buyer_id": None,
-                        "buyer_name": None,
-                        "next_available_date": None,
-                        "updated_at": datetime.utcnow()
-                    }}
-                )
-                print(f"✅ Asset {asset_id} made available")
-        
-        # Delete all associated offer requests
-        delete_result = await db.offer_requests.delete_many({
-            "$or": [
-                {"existing_campaign_id": campaign_id},
-                {"campaign_name": campaign.get("name")}
-            ]
-        })
-        print(f"✅ Deleted {delete_result.deleted_count} associated offer requests")
-    
-    # Step 3: Delete the campaign itself
-    await db.campaigns.delete_one({"id": campaign_id})
-    print(f"✅ Campaign {campaign_id} deleted successfully")
-    
-    # Step 4: Send real-time notification to affected buyers (if any)
-    try:
-        buyer_id = campaign.get("buyer_id")
-        if buyer_id:
-            # Find buyer email
-            buyer = await db.users.find_one({"id": buyer_id})
-            if buyer:
-                await websocket_manager.send_to_user(buyer["email"], {
-                    "type": "campaign_deleted",
-                    "campaign_id": campaign_id,
-                    "campaign_name": campaign.get("name"),
-                    "message": f"Campaign '{campaign.get('name')}' has been deleted by admin",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                print(f"✅ Notified buyer {buyer['email']} of campaign deletion")
-    except Exception as ws_error:
-        print(f"⚠️ WebSocket notification failed: {ws_error}")
+    if background:
+        job = await create_job("campaign_delete", {"campaign_id": campaign_id})
+        run_job(job, lambda progress: cascade_delete_campaign(campaign, progress))
+        return {
+            "message": f"Deletion of campaign '{campaign.get('name')}' started",
+            "job_id": job["id"],
+            "status": job["status"]
+        }
     
-    return {
-        "message": f"Campaign '{campaign.get('name')}' deleted successfully",
-        "assets_freed": len(campaign_assets),
-        "offer_requests_deleted": len(offer_requests) if offer_requests else 0
-    }
+    result = await cascade_delete_campaign(campaign)
+    return {"message": f"Campaign '{campaign.get('name')}' deleted successfully", **result}
+
+@api_router.get("/admin/jobs/{job_id}")
+async def get_job_admin(job_id: str, admin_user: User = Depends(require_admin)):
+    """Get status, progress and result of a background job (admin only)"""
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 @api_router.patch("/admin/campaigns/{campaign_id}/status")
 async def update_campaign_status_admin(
@@ -3453,6 +4928,7 @@ async def update_campaign_status_admin(
         {"id": campaign_id},
         {"$set": update_data}
     )
+    await bump_data_version()
     
     return {"message": f"Campaign status updated to {new_status}"}
 
@@ -3470,8 +4946,17 @@ async def get_campaign(campaign_id: str, current_user: User = Depends(get_curren
     return Campaign(**campaign)
 
 @api_router.get("/campaigns")
-async def get_campaigns(current_user: User = Depends(get_current_user)):
-    """Get campaigns for current user"""
+async def get_campaigns(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; enables paginated response"),
+    include_assets: bool = Query(True, description="Attach campaign_assets from offer requests; counters are always included"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get campaigns for current user
+    
+    Without limit every campaign is returned as before; with limit the response is a
+    newest-first page: {items, total, next_cursor, limit}.
+    """
     query = {}
     
     if current_user.role == UserRole.BUYER:
@@ -3482,12 +4967,16 @@ async def get_campaigns(current_user: User = Depends(get_current_user)):
         # Admin can see all campaigns (including demo for debugging)
         pass
     else:
-        # Sellers can see campaigns that include their assets
-        user_assets = await db.assets.find({"seller_id": current_user.id}).to_list(1000)
-        asset_ids = [asset["id"] for asset in user_assets]
-        query["assets"] = {"$in": asset_ids}
+        # Sellers can see campaigns that include their assets: the legacy assets array,
+        # or campaigns holding offers on them (ids only, straight off the indexes)
+        asset_ids = await db.assets.distinct("id", {"seller_id": current_user.id})
+        campaign_ids = await db.offer_requests.distinct("campaign_id", {"asset_id": {"$in": asset_ids}, **ASSET_OFFER_MATCH})
+        query["$or"] = [
+            {"assets": {"$in": asset_ids}},
+            {"id": {"$in": [campaign_id for campaign_id in campaign_ids if campaign_id]}}
+        ]
     
-    campaigns = await db.campaigns.find(query).to_list(1000)
+    campaigns, next_cursor = await fetch_campaign_page(query, cursor, limit)
     
     # Debug logging to identify duplicate campaigns
     campaign_names = [c.get("name") for c in campaigns]
@@ -3506,35 +4995,17 @@ async def get_campaigns(current_user: User = Depends(get_current_user)):
         if campaign_id not in campaigns_by_id:
             campaigns_by_id[campaign_id] = campaign
     
-    # Enhance campaigns with asset count information
-    enhanced_campaigns = []
-    for campaign in campaigns_by_id.values():  # Use deduplicated campaigns
-        campaign_dict = Campaign(**campaign).dict()
-        
-        # Get offer requests for this campaign
-        campaign_offers = await db.offer_requests.find({
-            "$or": [
-                {"existing_campaign_id": campaign["id"]},
-                {"campaign_name": campaign.get("name", "")}
-            ]
-        }).to_list(1000)
-        
-        # Add simple campaign assets information for counting
-        campaign_dict["campaign_assets"] = []
-        for offer in campaign_offers:
-            # Add minimal asset info for counting purposes
-            asset_info = {
-                "asset_id": offer.get("asset_id"),
-                "asset_name": offer.get("asset_name"),
-                "status": offer.get("status"),
-                "buyer_id": offer.get("buyer_id")
-            }
-            campaign_dict["campaign_assets"].append(asset_info)
-        
-        enhanced_campaigns.append(campaign_dict)
+    # Enhance campaigns with asset count information (use deduplicated campaigns)
+    if include_assets:
+        enhanced_campaigns = await attach_campaign_offer_assets(list(campaigns_by_id.values()))
+    else:
+        enhanced_campaigns = [Campaign(**campaign).dict() for campaign in campaigns_by_id.values()]
     
     logger.info(f"Returning {len(enhanced_campaigns)} campaigns for user {current_user.id}")
-    return enhanced_campaigns
+    if limit is None:
+        return enhanced_campaigns
+    total = await db.campaigns.count_documents(query)
+    return {"items": enhanced_campaigns, "total": total, "next_cursor": next_cursor, "limit": limit}
 
 @api_router.post("/campaigns", response_model=Campaign)
 async def create_campaign(
@@ -3552,6 +5023,8 @@ async def create_campaign(
     )
     
     await db.campaigns.insert_one(campaign.dict())
+    await link_offers_to_campaign(campaign.dict())
+    await bump_data_version()
     return campaign
 
 @api_router.put("/campaigns/{campaign_id}", response_model=Campaign)
@@ -3576,6 +5049,7 @@ async def update_campaign(
         {"$set": campaign_data},
         return_document=True
     )
+    await bump_data_version()
     
     return Campaign(**updated_campaign)
 
@@ -3601,7 +5075,9 @@ async def delete_campaign(
         )
     
     # Business rule: Check for associated offer requests
-    offer_requests = await db.offer_requests.find({"existing_campaign_id": campaign_id}).to_list(None)
+    offer_requests = await db.offer_requests.find(
+        {"campaign_id": campaign_id, **ASSET_OFFER_MATCH}, {"_id": 0, "id": 1}
+    ).to_list(None)
     if offer_requests:
         raise HTTPException(
             status_code=400, 
@@ -3610,6 +5086,7 @@ async def delete_campaign(
     
     # Delete the campaign
     result = await db.campaigns.delete_one({"id": campaign_id})
+    await bump_data_version()
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Campaign not found")
@@ -3775,7 +5252,7 @@ async def create_monitoring_service_request(
             "buyer_id": current_user.id,
             "buyer_name": current_user.contact_name,  # Use contact_name from User model
             "buyer_email": current_user.email,
-            "request_type": "monitoring_service",
+            "request_type": MONITORING_SERVICE_REQUEST_TYPE,
             "service_details": service_data.dict(),
             "status": "Pending",
             "campaign_id": service_data.campaign_id,  # Include campaign_id at top level for filtering
@@ -3788,6 +5265,7 @@ async def create_monitoring_service_request(
         }
         
         await db.offer_requests.insert_one(offer_request)
+        await bump_data_version()
         
         return {"message": "Monitoring service request submitted successfully. Admin will review and provide quote.", "request_id": offer_request["id"]}
         
@@ -3901,7 +5379,7 @@ async def activate_monitoring_service(
     """Activate monitoring service after PO upload and admin approval"""
     try:
         # Find the offer request
-        offer_request = await db.offer_requests.find_one({"id": request_id, "request_type": "monitoring_service"})
+        offer_request = await db.offer_requests.find_one({"id": request_id, "request_type": MONITORING_SERVICE_REQUEST_TYPE})
         if not offer_request:
             raise HTTPException(status_code=404, detail="Monitoring service request not found")
         
@@ -3920,6 +5398,7 @@ async def activate_monitoring_service(
             {"id": request_id},
             {"$set": {"status": "Approved", "activated_at": datetime.utcnow(), "updated_at": datetime.utcnow()}}
         )
+        await bump_data_version()
         
         # Generate initial monitoring tasks
         await generate_monitoring_tasks(subscription.id, subscription)
@@ -4047,6 +5526,154 @@ async def assign_monitoring_tasks(
         logger.error(f"Error assigning tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error assigning tasks: {str(e)}")
 
+# ============= ROUTE OPTIMIZATION =============
+
+# Visit order dominates a field day in Dhaka traffic. Straight-line distances are
+# stretched by ROUTE_DETOUR_FACTOR for the road network and converted to minutes at
+# ROUTE_AVERAGE_SPEED_KMH.
+ROUTE_AVERAGE_SPEED_KMH = 15.0
+ROUTE_DETOUR_FACTOR = 1.4
+ROUTE_TWO_OPT_MAX_PASSES = 50
+# Overdue tasks still need a visit, so they stay on the operator's route
+ROUTABLE_TASK_STATUSES = [TaskStatus.PENDING, TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS, TaskStatus.OVERDUE]
+
+def nearest_neighbour_route(distances: np.ndarray, start: int = 0) -> List[int]:
+    """Greedy open route from start, always moving to the closest unvisited point"""
+    count = len(distances)
+    visited = np.zeros(count, dtype=bool)
+    route = [start]
+    visited[start] = True
+    for _ in range(count - 1):
+        candidates = np.where(visited, np.inf, distances[route[-1]])
+        nearest = int(np.argmin(candidates))
+        route.append(nearest)
+        visited[nearest] = True
+    return route
+
+def two_opt_route(route: List[int], distances: np.ndarray, max_passes: int = ROUTE_TWO_OPT_MAX_PASSES) -> List[int]:
+    """Improve an open route (first point fixed) by reversing segments while that shortens it
+    
+    Each step scores every segment end for a given start in one vectorized pass and applies
+    the best improving reversal.
+    """
+    route = np.array(route)
+    count = len(route)
+    if count < 4:
+        return route.tolist()
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, count - 1):
+            ends = np.arange(i + 1, count)
+            before, first, lasts = route[i - 1], route[i], route[ends]
+            # Reversing route[i..j] swaps edges (before, first) + (last, after) for
+            # (before, last) + (first, after); the final segment has no after
+            delta = distances[before, lasts] - distances[before, first]
+            has_after = ends < count - 1
+            afters = route[np.minimum(ends + 1, count - 1)]
+            delta += np.where(has_after, distances[first, afters] - distances[lasts, afters], 0.0)
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-6:
+                j = ends[best]
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return route.tolist()
+
+def travel_minutes(distance_meters: float) -> int:
+    return int(round(distance_meters * ROUTE_DETOUR_FACTOR / (ROUTE_AVERAGE_SPEED_KMH * 1000 / 60)))
+
+def plan_route(tasks: List[dict], start_location: Optional[dict] = None) -> tuple:
+    """Order tasks for one operator: ([(task_id, route_order, estimated_travel_time)], distance_meters)
+    
+    Tasks without a usable asset_location (missing, malformed or non-finite) are visited
+    last, in scheduled order, with no travel estimate. Without a usable start_location the
+    route starts at the first located task.
+    """
+    lats, lngs = location_arrays([task.get("asset_location") for task in tasks])
+    usable = np.isfinite(lats) & np.isfinite(lngs)
+    located = [task for task, ok in zip(tasks, usable) if ok]
+    unlocated = [task for task, ok in zip(tasks, usable) if not ok]
+    lats, lngs = lats[usable], lngs[usable]
+    offset = 0
+    if start_location:
+        start_lats, start_lngs = location_arrays([start_location])
+        if np.isfinite(start_lats[0]) and np.isfinite(start_lngs[0]):
+            lats, lngs = np.concatenate([start_lats, lats]), np.concatenate([start_lngs, lngs])
+            offset = 1
+    
+    plan, total_meters = [], 0.0
+    if len(lats):
+        distances = haversine_matrix(lats, lngs)
+        route = two_opt_route(nearest_neighbour_route(distances), distances)
+        previous = None
+        for point in route:
+            leg = distances[previous, point] if previous is not None else 0.0
+            previous = point
+            if point < offset:
+                continue  # the start location itself is not a stop
+            total_meters += leg
+            plan.append((located[point - offset]["id"], len(plan) + 1, travel_minutes(leg)))
+    for task in unlocated:
+        plan.append((task["id"], len(plan) + 1, None))
+    return plan, total_meters
+
+async def optimize_operator_route(operator_id: str, day: datetime, start_location: Optional[dict] = None) -> dict:
+    """Compute the operator's visit order for the day and write it back in one bulk_write"""
+    day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    tasks = await db.monitoring_tasks.find(
+        {
+            "assigned_operator_id": operator_id,
+            "status": {"$in": ROUTABLE_TASK_STATUSES},
+            "scheduled_date": {"$gte": day_start, "$lt": day_start + timedelta(days=1)}
+        },
+        {"_id": 0, "id": 1, "asset_location": 1, "scheduled_date": 1}
+    ).sort("scheduled_date", 1).to_list(None)
+    
+    plan, total_meters = plan_route(tasks, start_location)
+    if plan:
+        now = datetime.utcnow()
+        await db.monitoring_tasks.bulk_write([
+            UpdateOne(
+                {"id": task_id},
+                {"$set": {"route_order": route_order, "estimated_travel_time": minutes, "updated_at": now}}
+            )
+            for task_id, route_order, minutes in plan
+        ], ordered=False)
+    
+    return {
+        "operator_id": operator_id,
+        "date": day_start.strftime("%Y-%m-%d"),
+        "stops": len(plan),
+        "total_distance_km": round(total_meters / 1000, 2),
+        "total_travel_minutes": sum(minutes or 0 for _, _, minutes in plan),
+        "route": [
+            {"task_id": task_id, "route_order": route_order, "estimated_travel_time": minutes}
+            for task_id, route_order, minutes in plan
+        ]
+    }
+
+@api_router.post("/monitoring/routes/optimize")
+async def optimize_monitoring_route(
+    route_request: RouteOptimizationRequest,
+    current_user: User = Depends(require_monitoring_staff)
+):
+    """Order an operator's open tasks for a day and store route_order / estimated_travel_time"""
+    if current_user.role == UserRole.MONITORING_OPERATOR:
+        operator_id = current_user.id
+    elif route_request.operator_id:
+        operator_id = route_request.operator_id
+    else:
+        raise HTTPException(status_code=400, detail="operator_id is required")
+    
+    try:
+        day = datetime.strptime(route_request.date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+    
+    start_location = route_request.start_location.dict() if route_request.start_location else None
+    return await optimize_operator_route(operator_id, day, start_location)
+
 @api_router.put("/monitoring/tasks/{task_id}")
 async def update_monitoring_task(
     task_id: str,
@@ -4119,7 +5746,7 @@ async def submit_monitoring_report(
         if task.get("asset_location"):
             distance = calculate_gps_distance(report.gps_location, task["asset_location"])
             report.location_accuracy = distance
-            report.location_verified = distance <= 50.0  # 50 meter radius
+            report.location_verified = distance <= GPS_VERIFICATION_RADIUS_METERS
         
         # Save report
         await db.monitoring_reports.insert_one(report.dict())
@@ -4196,6 +5823,160 @@ async def get_monitoring_reports(
         logger.error(f"Error fetching monitoring reports: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching monitoring reports: {str(e)}")
 
+# ============= SELLER SUMMARY =============
+
+SELLER_PENDING_OFFER_STATUSES = ["Pending", "Processing", "In Process", "Quoted", "Revise Request", "PO Required", "PO Uploaded"]
+SELLER_BOOKED_OFFER_STATUSES = ["Approved", "Accepted", "Live"]
+
+def offer_date_expr(*fields: str) -> dict:
+    """First present date among the offer fields, tolerating legacy string dates"""
+    value = f"$$offer.{fields[-1]}"
+    for field in reversed(fields[:-1]):
+        value = {"$ifNull": [f"$$offer.{field}", value]}
+    return {"$convert": {"input": value, "to": "date", "onError": None, "onNull": None}}
+
+def build_seller_summary_pipeline(seller_id: str, window_start: datetime, window_end: datetime) -> list:
+    """Per-asset booking status, pending offers, occupancy over the window and revenue,
+    joining each of the seller's assets to its offers in one pipeline"""
+    window_ms = (window_end - window_start).total_seconds() * 1000
+    booked_offers = {"$filter": {"input": "$offers", "as": "offer", "cond": {"$in": ["$$offer.status", SELLER_BOOKED_OFFER_STATUSES]}}}
+    booked_ms = {"$sum": {"$map": {
+        "input": booked_offers,
+        "as": "offer",
+        "in": {"$let": {
+            "vars": {
+                "start": {"$max": [offer_date_expr("confirmed_start_date", "tentative_start_date"), window_start]},
+                "end": {"$min": [{"$ifNull": [offer_date_expr("confirmed_end_date", "tentative_end_date"), window_start]}, window_end]}
+            },
+            "in": {"$max": [0, {"$subtract": ["$$end", "$$start"]}]}
+        }}
+    }}}
+    return [
+        {"$match": {"seller_id": seller_id}},
+        {"$lookup": {
+            "from": "offer_requests",
+            "let": {"asset_id": "$id"},
+            "pipeline": [{"$match": {"$expr": {"$eq": ["$asset_id", "$$asset_id"]}}}, {"$project": {
+                "_id": 0, "status": 1, "final_offer": 1, "admin_quoted_price": 1,
+                "confirmed_start_date": 1, "confirmed_end_date": 1,
+                "tentative_start_date": 1, "tentative_end_date": 1
+            }}],
+            "as": "offers"
+        }},
+        {"$project": {
+            "_id": 0,
+            "id": 1,
+            "name": 1,
+            "type": 1,
+            "district": 1,
+            "booking_status": "$status",
+            "buyer_name": 1,
+            "next_available_date": 1,
+            "pending_offers": {"$size": {"$filter": {
+                "input": "$offers", "as": "offer",
+                "cond": {"$in": ["$$offer.status", SELLER_PENDING_OFFER_STATUSES]}
+            }}},
+            "booked_offers": {"$size": booked_offers},
+            # Overlapping bookings can't make an asset more than fully occupied
+            "occupancy": {"$min": [1, {"$divide": [booked_ms, window_ms]}]},
+            "revenue": {"$sum": {"$map": {
+                "input": booked_offers,
+                "as": "offer",
+                "in": {"$ifNull": ["$$offer.final_offer", {"$ifNull": ["$$offer.admin_quoted_price", 0]}]}
+            }}}
+        }},
+        {"$sort": {"name": 1, "id": 1}}
+    ]
+
+@api_router.get("/seller/summary")
+async def get_seller_summary(
+    window_days: int = Query(90, ge=1, le=730, description="Occupancy window ending now"),
+    seller_id: Optional[str] = Query(None, description="Admins only: seller to summarize"),
+    current_user: User = Depends(get_current_user)
+):
+    """Seller inventory summary: per-asset booking status, pending offer count,
+    occupancy over the last window_days and booked revenue, plus totals"""
+    if current_user.role == UserRole.SELLER:
+        seller_id = current_user.id
+    elif current_user.role != UserRole.ADMIN or not seller_id:
+        raise HTTPException(status_code=403, detail="Only sellers (or admins with seller_id) can view a seller summary")
+    
+    window_end = datetime.utcnow()
+    window_start = window_end - timedelta(days=window_days)
+    assets = await db.assets.aggregate(
+        build_seller_summary_pipeline(seller_id, window_start, window_end)
+    ).to_list(None)
+    for asset in assets:
+        asset["occupancy"] = round(asset["occupancy"], 4)
+    
+    booking_status_counts = {}
+    for asset in assets:
+        booking_status_counts[asset.get("booking_status")] = booking_status_counts.get(asset.get("booking_status"), 0) + 1
+    return {
+        "seller_id": seller_id,
+        "window_days": window_days,
+        "assets": assets,
+        "totals": {
+            "assets": len(assets),
+            "by_booking_status": booking_status_counts,
+            "pending_offers": sum(asset["pending_offers"] for asset in assets),
+            "revenue": sum(asset["revenue"] for asset in assets),
+            "average_occupancy": round(sum(asset["occupancy"] for asset in assets) / len(assets), 4) if assets else 0.0
+        }
+    }
+
+# ============= BUYER DASHBOARD =============
+
+async def timed_section(name: str, coro, timings: Dict[str, float], errors: Dict[str, str]):
+    """Await one dashboard section, recording its duration and isolating its failure"""
+    started = time.perf_counter()
+    try:
+        return await coro
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Buyer dashboard section {name} failed: {detail}")
+        errors[name] = detail
+        return None
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+@api_router.get("/buyer/dashboard")
+async def get_buyer_dashboard(current_user: User = Depends(get_current_user)):
+    """Everything the buyer dashboard needs for first paint in one round-trip
+    
+    The principal is resolved once and the campaigns, offer requests, live assets,
+    monitoring services and monitoring reports sections are loaded concurrently.
+    A failing section comes back as null with its message in errors; timings_ms
+    holds each section's duration.
+    """
+    if current_user.role != UserRole.BUYER:
+        raise HTTPException(status_code=403, detail="Only buyers have a buyer dashboard")
+    
+    started = time.perf_counter()
+    timings, errors = {}, {}
+    sections = {
+        "campaigns": get_campaigns(cursor=None, limit=None, include_assets=True, current_user=current_user),
+        "offer_requests": get_offer_requests(current_user=current_user),
+        "live_assets": get_live_assets(current_user=current_user),
+        "monitoring_services": get_monitoring_services(current_user=current_user),
+        "monitoring_reports": get_monitoring_reports(
+            asset_id=None, subscription_id=None, operator_id=None, current_user=current_user
+        ),
+    }
+    results = await asyncio.gather(*(
+        timed_section(name, coro, timings, errors) for name, coro in sections.items()
+    ))
+    payload = dict(zip(sections, results))
+    
+    # Unwrap the {"services": [...]} / {"reports": [...]} envelopes of the standalone endpoints
+    if payload["monitoring_services"] is not None:
+        payload["monitoring_services"] = payload["monitoring_services"].get("services", [])
+    if payload["monitoring_reports"] is not None:
+        payload["monitoring_reports"] = clean_mongodb_doc(payload["monitoring_reports"].get("reports", []))
+    
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    return {**payload, "timings_ms": timings, "errors": errors}
+
 # ============= PERFORMANCE & ANALYTICS =============
 
 @api_router.get("/monitoring/performance")
@@ -4229,52 +6010,200 @@ async def get_monitoring_performance(
 
 # ============= HELPER FUNCTIONS =============
 
-async def generate_monitoring_tasks(subscription_id: str, subscription: MonitoringServiceSubscription):
-    """Generate monitoring tasks based on subscription schedule"""
+# Tasks are materialized on a rolling horizon: activation creates the next
+# MONITORING_TASK_HORIZON_DAYS of tasks and the extender tops every active subscription
+# up again. tasks_generated_through on the subscription marks the last date covered.
+MONITORING_TASK_HORIZON_DAYS = 14
+MONITORING_HORIZON_EXTEND_INTERVAL_SECONDS = 6 * 3600
+MONITORING_TASK_WINDOW = timedelta(hours=2)  # 2-hour completion window
+MONITORING_FREQUENCY_STEPS = {
+    MonitoringFrequency.DAILY: timedelta(days=1),
+    MonitoringFrequency.WEEKLY: timedelta(weeks=1),
+    MonitoringFrequency.BI_WEEKLY: timedelta(weeks=2),
+    MonitoringFrequency.MONTHLY: timedelta(days=30),
+}
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Stored datetimes come back naive UTC; request payloads may be timezone-aware"""
+    return value.astimezone(pytz.UTC).replace(tzinfo=None) if value.tzinfo else value
+
+def monitoring_schedule_dates(start_date: datetime, frequency: str, window_start: datetime, window_end: datetime) -> list:
+    """Scheduled dates (start_date + k * step) inside [window_start, window_end]; custom schedules have none"""
+    step = MONITORING_FREQUENCY_STEPS.get(frequency)
+    if step is None or window_end < window_start:
+        return []
+    # Jump straight to the first occurrence in the window instead of walking from start_date
+    skipped = max(0, -(-(window_start - start_date) // step))
+    dates = []
+    current = start_date + skipped * step
+    while current <= window_end:
+        dates.append(current)
+        current += step
+    return dates
+
+async def get_asset_locations(asset_ids: List[str]) -> Dict[str, Optional[dict]]:
+    """GPS location per asset id in one query (gps_coordinates, else the listing location)"""
+    if not asset_ids:
+        return {}
+    assets = await db.assets.find(
+        {"id": {"$in": list(asset_ids)}}, {"_id": 0, "id": 1, "gps_coordinates": 1, "location": 1}
+    ).to_list(None)
+    return {asset["id"]: asset.get("gps_coordinates") or asset.get("location") for asset in assets}
+
+def monitoring_day(value: datetime) -> str:
+    return to_naive_utc(value).strftime("%Y-%m-%d")
+
+def build_monitoring_task(subscription_id: str, asset_id: str, scheduled_date: datetime, window: timedelta, asset_location: Optional[dict]) -> dict:
+    return MonitoringTask(
+        subscription_id=subscription_id,
+        asset_id=asset_id,
+        scheduled_date=scheduled_date,
+        scheduled_day=monitoring_day(scheduled_date),
+        due_date=scheduled_date + window,
+        asset_location=asset_location,
+        priority=TaskPriority.MEDIUM
+    ).dict()
+
+async def upsert_monitoring_tasks(tasks: List[dict]) -> tuple:
+    """Insert tasks whose (subscription_id, asset_id, scheduled_day) is new, in one bulk_write
+    
+    Returns (created, already_present). A concurrent run inserting the same task first
+    surfaces as a duplicate key error and is counted as already present.
+    """
+    if not tasks:
+        return 0, 0
+    operations = [
+        UpdateOne(
+            {"subscription_id": task["subscription_id"], "asset_id": task["asset_id"], "scheduled_day": task["scheduled_day"]},
+            {"$setOnInsert": task},
+            upsert=True
+        )
+        for task in tasks
+    ]
     try:
-        tasks = []
-        current_date = subscription.start_date
-        
-        while current_date <= subscription.end_date:
-            for asset_id in subscription.asset_ids:
-                # Get asset location for GPS verification
-                asset = await db.assets.find_one({"id": asset_id})
-                asset_location = asset.get("gps_coordinates") if asset else None
-                
-                # Calculate due date based on frequency
-                due_date = current_date + timedelta(hours=2)  # 2-hour completion window
-                
-                task = MonitoringTask(
-                    subscription_id=subscription_id,
-                    asset_id=asset_id,
-                    scheduled_date=current_date,
-                    due_date=due_date,
-                    asset_location=asset_location,
-                    priority=TaskPriority.MEDIUM
-                )
-                tasks.append(task.dict())
-            
-            # Calculate next date based on frequency
-            if subscription.frequency == MonitoringFrequency.DAILY:
-                current_date += timedelta(days=1)
-            elif subscription.frequency == MonitoringFrequency.WEEKLY:
-                current_date += timedelta(weeks=1)
-            elif subscription.frequency == MonitoringFrequency.BI_WEEKLY:
-                current_date += timedelta(weeks=2)
-            elif subscription.frequency == MonitoringFrequency.MONTHLY:
-                current_date += timedelta(days=30)
-            else:  # CUSTOM
-                break  # Custom schedules need special handling
-        
-        if tasks:
-            await db.monitoring_tasks.insert_many(tasks)
-        
-        return len(tasks)
+        result = await db.monitoring_tasks.bulk_write(operations, ordered=False)
+        created = result.upserted_count
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        created = e.details.get("nUpserted", 0)
+    return created, len(tasks) - created
+
+async def backfill_task_scheduled_days(batch_size: int = 500) -> int:
+    """Set scheduled_day on tasks created before it existed
+    
+    A legacy duplicate of a task already holding its day fails the unique index and is
+    left without scheduled_day.
+    """
+    updated = 0
+    last_id = None
+    while True:
+        query = {"scheduled_day": {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        tasks = await db.monitoring_tasks.find(
+            query, {"_id": 1, "scheduled_date": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not tasks:
+            return updated
+        last_id = tasks[-1]["_id"]
+        operations = [
+            UpdateOne({"_id": task["_id"]}, {"$set": {"scheduled_day": monitoring_day(task["scheduled_date"])}})
+            for task in tasks if task.get("scheduled_date")
+        ]
+        if not operations:
+            continue
+        try:
+            updated += (await db.monitoring_tasks.bulk_write(operations, ordered=False)).modified_count
+        except BulkWriteError as e:
+            updated += e.details.get("nModified", 0)
+
+async def generate_monitoring_tasks(
+    subscription_id: str,
+    subscription: MonitoringServiceSubscription,
+    horizon_days: int = MONITORING_TASK_HORIZON_DAYS,
+    now: Optional[datetime] = None,
+    asset_locations: Optional[Dict[str, Optional[dict]]] = None,
+):
+    """Generate the subscription's monitoring tasks up to horizon_days from now
+    
+    Only dates after tasks_generated_through are built, so calling this again (the
+    horizon extender does) tops the horizon up; the upsert keeps it idempotent. Memory and
+    work are bounded by the horizon, not by the contract length.
+    """
+    try:
+        now = now or datetime.utcnow()
+        start_date, end_date = to_naive_utc(subscription.start_date), to_naive_utc(subscription.end_date)
+        if subscription.tasks_generated_through:
+            window_start = to_naive_utc(subscription.tasks_generated_through) + timedelta(microseconds=1)
+        else:
+            # Past dates would only produce tasks that are overdue on arrival
+            window_start = max(start_date, now.replace(hour=0, minute=0, second=0, microsecond=0))
+        window_end = min(end_date, now + timedelta(days=horizon_days))
+        dates = monitoring_schedule_dates(start_date, subscription.frequency, window_start, window_end)
+        if not dates:
+            return 0
+        
+        if asset_locations is None:
+            asset_locations = await get_asset_locations(subscription.asset_ids)
+        tasks = [
+            build_monitoring_task(
+                subscription_id, asset_id, scheduled_date, MONITORING_TASK_WINDOW, asset_locations.get(asset_id)
+            )
+            for scheduled_date in dates
+            for asset_id in subscription.asset_ids
+        ]
+        created, _ = await upsert_monitoring_tasks(tasks)
+        await db.monitoring_subscriptions.update_one(
+            {"id": subscription_id}, {"$max": {"tasks_generated_through": dates[-1]}}
+        )
+        return created
         
     except Exception as e:
         logger.error(f"Error generating monitoring tasks: {str(e)}")
         return 0
 
+async def extend_monitoring_horizons(
+    horizon_days: int = MONITORING_TASK_HORIZON_DAYS,
+    now: Optional[datetime] = None,
+) -> int:
+    """Top up every active subscription whose tasks end before the horizon"""
+    now = now or datetime.utcnow()
+    horizon_end = now + timedelta(days=horizon_days)
+    subscriptions = await db.monitoring_subscriptions.find({
+        "status": "active",
+        "$or": [{"tasks_generated_through": None}, {"tasks_generated_through": {"$lt": horizon_end}}]
+    }, {"_id": 0}).to_list(None)
+    subscriptions = [
+        MonitoringServiceSubscription(**subscription) for subscription in subscriptions
+        if not subscription.get("tasks_generated_through") or subscription["tasks_generated_through"] < subscription["end_date"]
+    ]
+    asset_locations = await get_asset_locations(
+        list({asset_id for subscription in subscriptions for asset_id in subscription.asset_ids})
+    )
+    
+    created = 0
+    for subscription in subscriptions:
+        created += await generate_monitoring_tasks(subscription.id, subscription, horizon_days, now, asset_locations)
+    return created
+
+async def backfill_monitoring_horizons() -> int:
+    """Set tasks_generated_through on subscriptions whose tasks were all created up front"""
+    subscription_ids = await db.monitoring_subscriptions.distinct("id", {"tasks_generated_through": None})
+    if not subscription_ids:
+        return 0
+    latest = await db.monitoring_tasks.aggregate([
+        {"$match": {"subscription_id": {"$in": subscription_ids}}},
+        {"$group": {"_id": "$subscription_id", "latest": {"$max": "$scheduled_date"}}}
+    ]).to_list(None)
+    if not latest:
+        return 0
+    result = await db.monitoring_subscriptions.bulk_write([
+        UpdateOne({"id": group["_id"]}, {"$max": {"tasks_generated_through": group["latest"]}})
+        for group in latest
+    ], ordered=False)
+    return result.modified_count
+
 def calculate_report_quality(report: MonitoringReport) -> float:
     """Calculate quality score for monitoring report"""
     score = 0.0
@@ -4310,26 +6239,69 @@ def calculate_report_quality(report: MonitoringReport) -> float:
     return min(score, 100.0)  # Cap at 100
 
 def calculate_gps_distance(loc1: Dict[str, float], loc2: Dict[str, float]) -> float:
-    """Calculate distance between two GPS coordinates in meters"""
+    """Calculate distance between two GPS coordinates in meters
+    
+    GPS_DISTANCE_UNKNOWN when either location is missing or malformed.
+    """
     try:
-        from math import radians, cos, sin, asin, sqrt
-        
-        # Convert to radians
-        lat1, lon1 = radians(loc1["lat"]), radians(loc1["lng"])
-        lat2, lon2 = radians(loc2["lat"]), radians(loc2["lng"])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        
-        # Earth radius in meters
-        r = 6371000
-        return c * r
-        
-    except Exception:
-        return 999.0  # Return large distance if calculation fails
+        return float(haversine_distances(
+            float(loc1["lat"]), float(loc1["lng"]), float(loc2["lat"]), float(loc2["lng"])
+        ))
+    except (KeyError, TypeError, ValueError):
+        return GPS_DISTANCE_UNKNOWN
+
+REPORT_REVERIFY_BATCH_SIZE = 1000
+
+async def reverify_report_locations(progress=None, batch_size: int = REPORT_REVERIFY_BATCH_SIZE) -> dict:
+    """Recompute location_accuracy / location_verified on every monitoring report
+    
+    Per batch: one $in lookup of the tasks' asset locations, one vectorized distance
+    computation and one bulk_write of the reports whose values changed.
+    """
+    total = await db.monitoring_reports.count_documents({})
+    checked = updated = 0
+    last_id = None
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        reports = await db.monitoring_reports.find(
+            query, {"_id": 1, "task_id": 1, "gps_location": 1, "location_accuracy": 1, "location_verified": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not reports:
+            return {"checked": checked, "updated": updated}
+        last_id = reports[-1]["_id"]
+        
+        tasks = await db.monitoring_tasks.find(
+            {"id": {"$in": list({report.get("task_id") for report in reports})}},
+            {"_id": 0, "id": 1, "asset_location": 1}
+        ).to_list(None)
+        asset_locations = {task["id"]: task.get("asset_location") for task in tasks}
+        report_lats, report_lngs = location_arrays([report.get("gps_location") for report in reports])
+        asset_lats, asset_lngs = location_arrays([asset_locations.get(report.get("task_id")) for report in reports])
+        distances = haversine_distances(report_lats, report_lngs, asset_lats, asset_lngs)
+        
+        operations = []
+        for report, has_asset, distance in zip(reports, ~np.isnan(asset_lats), distances):
+            if not has_asset:
+                continue  # submit_monitoring_report leaves these unverified too
+            distance = GPS_DISTANCE_UNKNOWN if np.isnan(distance) else float(distance)
+            verified = distance <= GPS_VERIFICATION_RADIUS_METERS
+            if report.get("location_accuracy") != distance or report.get("location_verified") != verified:
+                operations.append(UpdateOne(
+                    {"_id": report["_id"]},
+                    {"$set": {"location_accuracy": distance, "location_verified": verified}}
+                ))
+        if operations:
+            updated += (await db.monitoring_reports.bulk_write(operations, ordered=False)).modified_count
+        checked += len(reports)
+        if progress:
+            await progress(checked, total)
+
+@api_router.post("/admin/maintenance/reverify-report-locations")
+async def reverify_report_locations_admin(admin_user: User = Depends(require_admin)):
+    """Recompute GPS verification of all monitoring reports in the background (admin only)"""
+    job = await create_job("reverify_report_locations", {})
+    run_job(job, lambda progress: reverify_report_locations(progress))
+    return {"message": "Report location re-verification started", "job_id": job["id"], "status": job["status"]}
 
 # ============= PHOTO UPLOAD & MANAGEMENT =============
 
@@ -4370,12 +6342,12 @@ async def upload_monitoring_photo(
         
         # Calculate GPS distance from asset location
         gps_location = {"lat": gps_lat, "lng": gps_lng}
-        distance_accuracy = 999.0
+        distance_accuracy = GPS_DISTANCE_UNKNOWN
         location_verified = False
         
         if task.get("asset_location"):
             distance_accuracy = calculate_gps_distance(gps_location, task["asset_location"])
-            location_verified = distance_accuracy <= 50.0  # 50 meter tolerance
+            location_verified = distance_accuracy <= GPS_VERIFICATION_RADIUS_METERS
         
         # Create photo metadata
         photo_metadata = {
@@ -4444,88 +6416,223 @@ async def get_monitoring_photo(
 
 # ============= AUTOMATED TASK GENERATION =============
 
+async def generate_tasks_for_day(target_date: datetime) -> tuple:
+    """Upsert target_date's tasks for every active subscription due that day: (created, already_present)
+    
+    Tasks are built exactly like the horizon generator's (scheduled at start_date + k * step
+    with MONITORING_TASK_WINDOW), so whichever path inserts a task first, it is the same task.
+    """
+    day_start = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timedelta(days=1) - timedelta(microseconds=1)
+    # Subscriptions that ended before the day get nothing, even before the expiry job runs
+    subscriptions = await db.monitoring_subscriptions.find(
+        {"status": "active", "end_date": {"$gte": day_start}},
+        {"_id": 0, "id": 1, "asset_ids": 1, "start_date": 1, "end_date": 1, "frequency": 1}
+    ).to_list(None)
+    scheduled = []
+    for subscription in subscriptions:
+        try:
+            start_date, end_date = (
+                to_naive_utc(datetime.fromisoformat(value) if isinstance(value, str) else value)
+                for value in (subscription["start_date"], subscription["end_date"])
+            )
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue  # malformed legacy subscription
+        for scheduled_date in monitoring_schedule_dates(
+            start_date, subscription.get("frequency"), day_start, min(day_end, end_date)
+        ):
+            scheduled.append((subscription, scheduled_date))
+    asset_locations = await get_asset_locations(
+        list({asset_id for subscription, _ in scheduled for asset_id in subscription["asset_ids"]})
+    )
+    
+    tasks = [
+        build_monitoring_task(
+            subscription["id"], asset_id, scheduled_date, MONITORING_TASK_WINDOW, asset_locations.get(asset_id)
+        )
+        for subscription, scheduled_date in scheduled
+        for asset_id in subscription["asset_ids"]
+    ]
+    return await upsert_monitoring_tasks(tasks)
+
 @api_router.post("/monitoring/generate-tasks")
 async def generate_tasks_for_date(
     request: dict,
     current_user: User = Depends(require_admin_or_manager)
 ):
-    """Generate monitoring tasks for a specific date"""
+    """Generate monitoring tasks for a specific date
+    
+    Idempotent: tasks are upserted on (subscription_id, asset_id, scheduled_day) in one
+    bulk_write, so reruns and concurrent runs never duplicate. Three round-trips in total.
+    """
     try:
         date = request.get("date")
         if not date:
             raise HTTPException(status_code=400, detail="Date is required")
         
-        target_date = datetime.fromisoformat(date.replace('Z', '+00:00'))
+        target_date = to_naive_utc(datetime.fromisoformat(date.replace('Z', '+00:00')))
         
-        # Get all active subscriptions
-        subscriptions = await db.monitoring_subscriptions.find({"status": "active"}).to_list(1000)
+        tasks_created, tasks_existing = await generate_tasks_for_day(target_date)
         
-        tasks_created = 0
-        for subscription in subscriptions:
-            # Check if this date matches the subscription frequency
-            if should_generate_task_for_date(subscription, target_date):
-                for asset_id in subscription["asset_ids"]:
-                    # Check if task already exists for this date
-                    existing_task = await db.monitoring_tasks.find_one({
-                        "subscription_id": subscription["id"],
-                        "asset_id": asset_id,
-                        "scheduled_date": {
-                            "$gte": target_date.replace(hour=0, minute=0, second=0),
-                            "$lt": target_date.replace(hour=23, minute=59, second=59)
-                        }
-                    })
-                    
-                    if not existing_task:
-                        # Get asset location
-                        asset = await db.assets.find_one({"id": asset_id})
-                        asset_location = asset.get("gps_coordinates") if asset else None
-                        
-                        # Create task
-                        task = MonitoringTask(
-                            subscription_id=subscription["id"],
-                            asset_id=asset_id,
-                            scheduled_date=target_date,
-                            due_date=target_date + timedelta(hours=4),
-                            asset_location=asset_location,
-                            priority=TaskPriority.MEDIUM
-                        )
-                        
-                        await db.monitoring_tasks.insert_one(task.dict())
-                        tasks_created += 1
-        
-        return {"message": f"Generated {tasks_created} monitoring tasks for {date}", "tasks_created": tasks_created}
+        return {
+            "message": f"Generated {tasks_created} monitoring tasks for {date}",
+            "tasks_created": tasks_created,
+            "tasks_existing": tasks_existing
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating tasks: {str(e)}")
 
-def should_generate_task_for_date(subscription: dict, target_date: datetime) -> bool:
-    """Determine if a task should be generated for the given date based on frequency"""
+# ============= BACKGROUND SCHEDULER =============
+
+# Recurring jobs are scheduled in every uvicorn worker; a lease document per job in
+# scheduler_leases lets only one worker run it each interval. Jitter spreads the
+# workers' wake-ups so they don't all race for the lease at the same moment.
+SCHEDULER_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+# Only tasks nobody has started are swept; an operator already on site keeps in_progress
+UNSTARTED_TASK_STATUSES = [TaskStatus.PENDING, TaskStatus.ASSIGNED]
+
+async def generate_todays_monitoring_tasks() -> int:
+    created, _ = await generate_tasks_for_day(datetime.utcnow())
+    return created
+
+async def sweep_overdue_tasks(now: Optional[datetime] = None) -> int:
+    """Mark unstarted tasks past their due date overdue (served by the (status, due_date) index)"""
+    now = now or datetime.utcnow()
+    result = await db.monitoring_tasks.update_many(
+        {"status": {"$in": UNSTARTED_TASK_STATUSES}, "due_date": {"$lt": now}},
+        {"$set": {"status": TaskStatus.OVERDUE, "updated_at": now}}
+    )
+    return result.modified_count
+
+async def expire_monitoring_subscriptions(now: Optional[datetime] = None) -> int:
+    """Move active subscriptions past their end_date to expired"""
+    now = now or datetime.utcnow()
+    result = await db.monitoring_subscriptions.update_many(
+        {"status": "active", "end_date": {"$lt": now}},
+        {"$set": {"status": "expired", "updated_at": now}}
+    )
+    return result.modified_count
+
+async def acquire_scheduler_lease(name: str, owner: str, ttl_seconds: float, now: Optional[datetime] = None) -> bool:
+    """Take or renew the job's lease; False while another worker holds an unexpired one
+    
+    The upsert only matches an expired lease or our own; when another worker holds it the
+    insert collides on _id.
+    """
+    now = now or datetime.utcnow()
     try:
-        start_date = subscription.get("start_date")
-        if isinstance(start_date, str):
-            start_date = datetime.fromisoformat(start_date)
-        
-        # Calculate days since start
-        days_diff = (target_date.date() - start_date.date()).days
-        
-        frequency = subscription.get("frequency")
-        
-        if frequency == MonitoringFrequency.DAILY:
-            return days_diff >= 0
-        elif frequency == MonitoringFrequency.WEEKLY:
-            return days_diff >= 0 and days_diff % 7 == 0
-        elif frequency == MonitoringFrequency.BI_WEEKLY:
-            return days_diff >= 0 and days_diff % 14 == 0
-        elif frequency == MonitoringFrequency.MONTHLY:
-            return days_diff >= 0 and days_diff % 30 == 0
-        else:  # CUSTOM
-            # Custom frequency handling would go here
-            return False
-            
-    except Exception:
+        await db.scheduler_leases.find_one_and_update(
+            {"_id": name, "$or": [{"expires_at": {"$lte": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "acquired_at": now, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
         return False
 
+class ScheduledJob:
+    """A recurring coroutine function with run-time metrics; the lease lasts one interval"""
+    def __init__(self, name: str, func, interval_seconds: float, jitter_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.total_duration_ms = 0.0
+        self.last_result = None
+        self.last_error: Optional[str] = None
+
+    def next_delay(self) -> float:
+        return self.interval_seconds + random.uniform(0, self.jitter_seconds)
+
+    async def run_once(self, owner: str) -> bool:
+        """Run the job if this worker gets the lease; returns whether it ran"""
+        if not await acquire_scheduler_lease(self.name, owner, self.interval_seconds):
+            self.skipped += 1
+            return False
+        self.last_started_at = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            self.last_result = await self.func()
+            self.last_error = None
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error(f"Scheduled job {self.name} failed: {e}")
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.runs += 1
+            self.last_duration_ms = round(duration_ms, 1)
+            self.total_duration_ms += duration_ms
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "jitter_seconds": self.jitter_seconds,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_started_at": self.last_started_at,
+            "last_duration_ms": self.last_duration_ms,
+            "avg_duration_ms": round(self.total_duration_ms / self.runs, 1) if self.runs else None,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+class JobScheduler:
+    """Runs each ScheduledJob in its own asyncio loop inside this worker"""
+    def __init__(self, owner: str):
+        self.owner = owner
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def add(self, job: ScheduledJob):
+        self.jobs[job.name] = job
+
+    async def _run(self, job: ScheduledJob):
+        # First run shortly after startup, then every interval plus jitter
+        await asyncio.sleep(random.uniform(0, job.jitter_seconds))
+        while True:
+            try:
+                await job.run_once(self.owner)
+            except Exception as e:
+                logger.error(f"Scheduler could not run {job.name}: {e}")
+            await asyncio.sleep(job.next_delay())
+
+    def start(self):
+        for name, job in self.jobs.items():
+            task = self._tasks.get(name)
+            if task is None or task.done():
+                self._tasks[name] = asyncio.create_task(self._run(job))
+
+    async def stop(self):
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"worker": self.owner, "jobs": {name: job.stats() for name, job in self.jobs.items()}}
+
+scheduler = JobScheduler(SCHEDULER_WORKER_ID)
+scheduler.add(ScheduledJob("monitoring_task_generation", generate_todays_monitoring_tasks, 3600, 300))
+scheduler.add(ScheduledJob("monitoring_horizon_extension", extend_monitoring_horizons, MONITORING_HORIZON_EXTEND_INTERVAL_SECONDS, 600))
+scheduler.add(ScheduledJob("overdue_task_sweep", sweep_overdue_tasks, 300, 30))
+scheduler.add(ScheduledJob("subscription_expiry", expire_monitoring_subscriptions, 3600, 300))
+
 # WebSocket endpoint for real-time updates
 # WebSocket endpoints moved to app level - router endpoints removed
 
@@ -4626,4 +6733,7 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await scheduler.stop()
+    await last_login_buffer.stop()
+    password_hasher.shutdown()
     client.close()
\ No newline at end of file
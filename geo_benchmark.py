@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Geo kernel benchmark
+Times the NumPy distance kernel and route planner in backend/server.py:
+1. haversine_distances on 1M coordinate pairs across Bangladesh
+2. haversine_matrix + nearest neighbour + 2-opt for a 200-stop operator day
+
+Run from the repo root: python geo_benchmark.py
+Kept out of the unit suite so timings never decide whether tests pass.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# server.py reads its Mongo settings at import time; the benchmark never touches a database
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "beatspace_benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+import server  # noqa: E402
+
+
+def best_of(runs, fn):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def benchmark_haversine(pairs=1_000_000, runs=5):
+    rng = np.random.default_rng(0)
+    lat1, lat2 = rng.uniform(20.5, 26.5, (2, pairs))
+    lng1, lng2 = rng.uniform(88.0, 92.7, (2, pairs))
+    elapsed = best_of(runs, lambda: server.haversine_distances(lat1, lng1, lat2, lng2))
+    print(f"haversine_distances: {pairs:,} pairs in {elapsed * 1000:.1f} ms ({pairs / elapsed / 1e6:.1f}M pairs/s)")
+
+
+def benchmark_route(stops=200, runs=5):
+    rng = np.random.default_rng(7)
+    lats = 23.70 + rng.random(stops) * 0.15
+    lngs = 90.35 + rng.random(stops) * 0.15
+
+    def plan():
+        distances = server.haversine_matrix(lats, lngs)
+        server.two_opt_route(server.nearest_neighbour_route(distances), distances)
+
+    elapsed = best_of(runs, plan)
+    print(f"route planning: {stops} stops in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark_haversine()
+    benchmark_route()
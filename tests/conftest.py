@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# server.py reads its Mongo settings at import time; unit tests never touch a real database
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "beatspace_unit_tests")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,224 @@
+"""Minimal in-memory stand-in for the Motor collections used by server.py.
+
+Only implements what the unit tests exercise; every call is recorded on the
+owning FakeDatabase so tests can assert how many round-trips a handler makes.
+"""
+
+from pymongo.errors import DuplicateKeyError
+
+
+def _matches_condition(value, condition):
+    if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+        for op, arg in condition.items():
+            if op == "$all" and not (isinstance(value, list) and all(item in value for item in arg)):
+                return False
+            if op == "$in" and value not in arg:
+                return False
+            if op == "$nin" and value in arg:
+                return False
+            if op == "$ne" and value == arg:
+                return False
+            if op == "$exists" and (value is not None) != arg:
+                return False
+            if op == "$gte" and not (value is not None and value >= arg):
+                return False
+            if op == "$gt" and not (value is not None and value > arg):
+                return False
+            if op == "$lte" and not (value is not None and value <= arg):
+                return False
+            if op == "$lt" and not (value is not None and value < arg):
+                return False
+        return True
+    if isinstance(value, list) and not isinstance(condition, list):
+        return condition in value
+    return value == condition
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif not _matches_condition(doc.get(key), condition):
+            return False
+    return True
+
+
+def _apply_set(doc, update):
+    for stage in update if isinstance(update, list) else [update]:
+        for key, value in stage.get("$set", {}).items():
+            if isinstance(value, dict) and "$literal" in value:
+                doc[key] = value["$literal"]
+            elif not isinstance(value, dict):
+                doc[key] = value
+        for key, value in stage.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def sort(self, key, direction=1):
+        spec = key if isinstance(key, list) else [(key, direction)]
+        # Stable sorts applied from the last key to the first; nulls sort lowest like Mongo
+        for field, field_direction in reversed(spec):
+            self._docs.sort(
+                key=lambda d: (d.get(field) is not None, d.get(field)),
+                reverse=field_direction < 0,
+            )
+        return self
+
+    def limit(self, count):
+        if count:
+            self._docs = self._docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._docs if length is None else self._docs[:length])
+
+
+class FakeCollection:
+    def __init__(self, database, name, docs=None):
+        self.database = database
+        self.name = name
+        self.docs = list(docs or [])
+
+    def _record(self, op, *args):
+        self.database.calls.append((self.name, op, args))
+
+    def find(self, query=None, projection=None):
+        self._record("find", query)
+        return FakeCursor(d for d in self.docs if matches(d, query or {}))
+
+    async def find_one(self, query=None, projection=None):
+        self._record("find_one", query)
+        for doc in self.docs:
+            if matches(doc, query or {}):
+                return doc
+        return None
+
+    def aggregate(self, pipeline):
+        # Supports $match and a $group on one field with $max accumulators
+        self._record("aggregate", pipeline)
+        docs = list(self.docs)
+        for stage in pipeline:
+            if "$match" in stage:
+                docs = [d for d in docs if matches(d, stage["$match"])]
+            elif "$group" in stage:
+                spec = dict(stage["$group"])
+                key = spec.pop("_id")[1:]
+                groups = {}
+                for doc in docs:
+                    group = groups.setdefault(doc.get(key), {"_id": doc.get(key)})
+                    for name, accumulator in spec.items():
+                        (op, field), = accumulator.items()
+                        if op != "$max":
+                            raise NotImplementedError(op)
+                        value = doc.get(field[1:])
+                        if value is not None and (group.get(name) is None or value > group[name]):
+                            group[name] = value
+                        group.setdefault(name, None)
+                docs = list(groups.values())
+            else:
+                raise NotImplementedError(stage)
+        return FakeCursor(docs)
+
+    async def count_documents(self, query):
+        self._record("count_documents", query)
+        return sum(1 for d in self.docs if matches(d, query))
+
+    async def distinct(self, key, query=None, session=None):
+        self._record("distinct", key, query)
+        values = []
+        for doc in self.docs:
+            if matches(doc, query or {}) and doc.get(key) not in values:
+                values.append(doc.get(key))
+        return values
+
+    async def insert_one(self, doc, session=None):
+        self._record("insert_one", doc)
+        self.docs.append(doc)
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=False, **kwargs):
+        # Returns the document as it was before (or after with return_document=True);
+        # only literal $set values and $inc are applied
+        self._record("find_one_and_update", query, update)
+        for doc in self.docs:
+            if matches(doc, query):
+                before = dict(doc)
+                _apply_set(doc, update)
+                return dict(doc) if return_document else before
+        if upsert:
+            if "_id" in query and any(d.get("_id") == query["_id"] for d in self.docs):
+                raise DuplicateKeyError("E11000 duplicate key error")
+            doc = {key: value for key, value in query.items() if not key.startswith("$")}
+            _apply_set(doc, update)
+            self.docs.append(doc)
+            return dict(doc) if return_document else None
+        return None
+
+    async def update_one(self, query, update, session=None):
+        self._record("update_one", query, update)
+        return FakeResult(modified_count=int(any(matches(d, query) for d in self.docs)))
+
+    async def bulk_write(self, operations, ordered=True):
+        # Updates aren't applied; upserts insert their filter plus $setOnInsert when nothing matches
+        self._record("bulk_write", operations)
+        upserted = 0
+        for operation in operations:
+            if operation._upsert and not any(matches(d, operation._filter) for d in self.docs):
+                self.docs.append({**operation._filter, **operation._doc.get("$setOnInsert", {})})
+                upserted += 1
+        return FakeResult(modified_count=len(operations) - upserted, upserted_count=upserted)
+
+    async def update_many(self, query, update, session=None):
+        # Literal $set values are applied; pipeline updates are out of scope and only counted
+        self._record("update_many", query, update)
+        matched = [d for d in self.docs if matches(d, query)]
+        if isinstance(update, dict):
+            for doc in matched:
+                _apply_set(doc, update)
+        return FakeResult(modified_count=len(matched))
+
+    async def delete_many(self, query, session=None):
+        self._record("delete_many", query)
+        kept = [d for d in self.docs if not matches(d, query)]
+        deleted, self.docs = len(self.docs) - len(kept), kept
+        return FakeResult(deleted_count=deleted)
+
+    async def delete_one(self, query, session=None):
+        self._record("delete_one", query)
+        for index, doc in enumerate(self.docs):
+            if matches(doc, query):
+                del self.docs[index]
+                return FakeResult(deleted_count=1)
+        return FakeResult(deleted_count=0)
+
+
+class FakeResult:
+    def __init__(self, modified_count=0, deleted_count=0, upserted_count=0):
+        self.modified_count = modified_count
+        self.deleted_count = deleted_count
+        self.upserted_count = upserted_count
+
+
+class FakeDatabase:
+    def __init__(self, **collections):
+        self.calls = []
+        self._collections = {
+            name: FakeCollection(self, name, docs) for name, docs in collections.items()
+        }
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self, name)
+        return self._collections[name]
+
+    def calls_to(self, collection):
+        return [call for call in self.calls if call[0] == collection]
@@ -0,0 +1,134 @@
+import asyncio
+
+import server
+from tests.fake_db import FakeDatabase
+
+
+def make_buyer():
+    return server.User(
+        id="buyer-1",
+        email="buyer@example.com",
+        company_name="Buyer Co",
+        contact_name="Buyer",
+        phone="+8801000000000",
+        role="buyer",
+        status="approved",
+    )
+
+
+def make_asset(index):
+    return {
+        "id": f"asset-{index}",
+        "name": f"Billboard {index}",
+        "type": "Billboard",
+        "category": "Public",
+        "address": "Gulshan Avenue, Dhaka",
+        "location": {"lat": 23.78, "lng": 90.41},
+        "dimensions": "20ft x 10ft",
+        "pricing": {"monthly_rate": 50000},
+        "status": "Available",
+        "seller_id": "seller-1",
+        "marketplace_visible": True,
+    }
+
+
+def list_assets(fake_db, **params):
+    # Handlers are called directly, so Query(...) defaults have to be spelled out
+    defaults = {
+        "type": None, "status": None, "division": None, "marketplace": None,
+        "district": None, "min_price": None, "max_price": None, "price_key": "monthly_rate",
+        "q": None, "sort": "newest", "cursor": None, "limit": None,
+    }
+    return server.get_assets(current_user=make_buyer(), **{**defaults, **params})
+
+
+def test_marketplace_listing_uses_constant_number_of_queries(monkeypatch):
+    assets = [make_asset(i) for i in range(50)]
+    offers = [
+        {"id": "offer-old", "asset_id": "asset-3", "status": "PO Uploaded",
+         "created_at": 1, "tentative_end_date": "2026-01-01"},
+        {"id": "offer-new", "asset_id": "asset-3", "status": "PO Uploaded",
+         "created_at": 2, "confirmed_end_date": "2026-06-30"},
+        {"id": "offer-pending", "asset_id": "asset-4", "status": "Pending", "created_at": 3},
+    ]
+    fake_db = FakeDatabase(assets=assets, offer_requests=offers)
+    monkeypatch.setattr(server, "db", fake_db)
+
+    result = asyncio.run(list_assets(fake_db, marketplace=True))
+
+    assert len(result) == 50
+    assert len(fake_db.calls_to("assets")) == 1
+    assert len(fake_db.calls_to("offer_requests")) == 1
+
+    by_id = {asset["id"]: asset for asset in result}
+    assert by_id["asset-3"]["waiting_for_go_live"] is True
+    assert by_id["asset-3"]["asset_expiry_date"] == "2026-06-30"
+    assert by_id["asset-4"]["waiting_for_go_live"] is False
+
+
+def test_keyset_pagination_walks_every_asset_once(monkeypatch):
+    assets = [make_asset(i) for i in range(25)]
+    for i, asset in enumerate(assets):
+        asset["created_at"] = i // 3  # plenty of ties on the sort key
+    assets.append({**make_asset(99), "marketplace_visible": False})
+    fake_db = FakeDatabase(assets=assets, offer_requests=[])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = asyncio.run(list_assets(fake_db, marketplace=True, limit=10, cursor=cursor))
+        pages += 1
+        assert page["total"] == 25
+        assert len(page["items"]) <= 10
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 25
+    assert "asset-99" not in seen
+
+
+def test_facets_are_disjunctive_and_formatted():
+    pipeline = server.build_asset_facet_pipeline(type="Billboard", division="Dhaka", min_price=1000)
+    base, facet = pipeline[0]["$match"], pipeline[1]["$facet"]
+
+    assert base == {"marketplace_visible": True}
+    # each facet ignores its own selection but keeps the others
+    assert facet["type"][0]["$match"] == {"division": "Dhaka", "pricing.monthly_rate": {"$gte": 1000}}
+    assert facet["division"][0]["$match"] == {"type": "Billboard", "pricing.monthly_rate": {"$gte": 1000}}
+    assert facet["price"][0]["$match"] == {"type": "Billboard", "division": "Dhaka"}
+
+    formatted = server.format_asset_facets({
+        "type": [{"_id": "Billboard", "count": 3}, {"_id": None, "count": 1}],
+        "price": [{"_id": 0, "count": 2}, {"_id": 500000, "count": 1}, {"_id": "unpriced", "count": 4}],
+        "total": [{"count": 7}],
+    })
+    assert formatted["type"] == [{"value": "Billboard", "count": 3}]
+    assert formatted["price"] == [{"min": 0, "max": 10000, "count": 2}, {"min": 500000, "max": None, "count": 1}]
+    assert formatted["unpriced"] == 4
+    assert formatted["total"] == 7
+
+
+def test_search_terms_support_prefixes_and_bangla():
+    fields = server.build_search_fields({
+        "name": "Gulshan Avenue Billboard",
+        "area": "Dhanmondi",
+        "description": "গুলশান এভিনিউ",
+    })
+    assert {"gu", "gul", "gulshan", "dhanm", "গুলশান"} <= set(fields["search_terms"])
+    assert "dhanmondi" in fields["search_tokens"]
+    assert server.search_query_terms("Gul a Dhanm") == ["gul", "dhanm"]
+
+
+def test_listing_query_matches_on_search_prefixes(monkeypatch):
+    assets = [make_asset(1), {**make_asset(2), "name": "Banani Lamppost", "address": "Road 11, Banani"}]
+    for asset in assets:
+        asset.update(server.build_search_fields(asset))
+    fake_db = FakeDatabase(assets=assets, offer_requests=[])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    result = asyncio.run(list_assets(fake_db, marketplace=True, q="bana lamp"))
+
+    assert [asset["id"] for asset in result] == ["asset-2"]
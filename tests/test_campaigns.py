@@ -0,0 +1,349 @@
+import asyncio
+from datetime import datetime
+
+import server
+from tests.fake_db import FakeDatabase
+
+
+def make_admin():
+    return server.User(
+        id="admin-1",
+        email="admin@example.com",
+        company_name="BeatSpace",
+        contact_name="Admin",
+        phone="+8801000000000",
+        role="admin",
+        status="approved",
+    )
+
+
+def make_campaign(index):
+    return {
+        "id": f"campaign-{index}",
+        "name": f"Campaign {index}",
+        "buyer_id": "buyer-1",
+        "buyer_name": "Buyer Co",
+        "status": "Live",
+        "created_at": datetime(2026, 1, 1 + index),
+    }
+
+
+def test_admin_campaign_list_enriches_with_one_offer_query(monkeypatch):
+    campaigns = [make_campaign(i) for i in range(20)]
+    offers = [
+        {"id": "o1", "asset_id": "a1", "asset_name": "A1", "status": "Pending", "buyer_id": "buyer-1",
+         "campaign_id": "campaign-1"},
+        {"id": "o2", "asset_id": "a2", "asset_name": "A2", "status": "Live", "buyer_id": "buyer-1",
+         "campaign_id": "campaign-1"},
+        {"id": "o3", "asset_id": "a3", "asset_name": "A3", "status": "Pending", "buyer_id": "buyer-1",
+         "campaign_id": "campaign-2"},
+        # same campaign name but never linked: no longer joined by name
+        {"id": "o4", "asset_id": "a4", "asset_name": "A4", "status": "Pending", "buyer_id": "buyer-2",
+         "campaign_name": "Campaign 3", "campaign_id": None},
+    ]
+    fake_db = FakeDatabase(campaigns=campaigns, offer_requests=offers)
+    monkeypatch.setattr(server, "db", fake_db)
+
+    result = asyncio.run(server.get_all_campaigns_admin(cursor=None, limit=None, include_assets=True, admin_user=make_admin()))
+
+    assert len(result) == 20
+    assert len(fake_db.calls_to("offer_requests")) == 1
+    by_id = {campaign["id"]: campaign for campaign in result}
+    assert [a["asset_id"] for a in by_id["campaign-1"]["campaign_assets"]] == ["a1", "a2"]
+    assert [a["asset_id"] for a in by_id["campaign-2"]["campaign_assets"]] == ["a3"]
+    assert by_id["campaign-3"]["campaign_assets"] == []
+
+
+def test_admin_campaign_pagination_is_newest_first(monkeypatch):
+    fake_db = FakeDatabase(campaigns=[make_campaign(i) for i in range(5)], offer_requests=[])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(server.get_all_campaigns_admin(cursor=cursor, limit=2, include_assets=True, admin_user=make_admin()))
+        assert page["total"] == 5
+        seen.extend(campaign["id"] for campaign in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [f"campaign-{i}" for i in reversed(range(5))]
+
+
+def test_counter_increments_move_offer_contribution():
+    quoted = {"id": "o1", "campaign_id": "campaign-1", "status": "Quoted", "admin_quoted_price": 5000}
+
+    assert server.campaign_counter_increments(None, {**quoted, "status": "Pending", "admin_quoted_price": None}) == [
+        ({"id": "campaign-1"}, {"asset_counts_by_status.Pending": 1})
+    ]
+    assert server.campaign_counter_increments(quoted, {**quoted, "status": "Rejected"}) == [
+        ({"id": "campaign-1"}, {
+            "asset_counts_by_status.Quoted": -1,
+            "total_quoted_value": -5000,
+            "asset_counts_by_status.Rejected": 1,
+        })
+    ]
+    # a no-op transition issues no write
+    assert server.campaign_counter_increments(quoted, dict(quoted)) == []
+
+    # offers without a campaign link count nowhere
+    unlinked = {"id": "o2", "campaign_name": "Winter", "buyer_id": "buyer-1", "status": "Pending", "campaign_id": None}
+    assert server.campaign_counter_increments(unlinked, None) == []
+
+
+def test_campaign_delete_cascade_uses_batched_bulk_updates(monkeypatch):
+    campaign = {**make_campaign(1), "assets": [{"asset_id": "a-0"}, {"asset_id": "a-extra"}]}
+    offers = [
+        {"id": f"o{i}", "asset_id": f"a-{i % 7}", "campaign_id": "campaign-1"} for i in range(30)
+    ] + [{"id": "other", "asset_id": "a-99", "campaign_id": "campaign-2", "campaign_name": "Campaign 1"}]
+    fake_db = FakeDatabase(campaigns=[campaign, make_campaign(2)], offer_requests=offers, users=[])
+    monkeypatch.setattr(server, "db", fake_db)
+    monkeypatch.setattr(server, "CAMPAIGN_CASCADE_BATCH_SIZE", 5)
+
+    async def no_transactions():
+        return False
+    monkeypatch.setattr(server, "transactions_supported", no_transactions)
+
+    progress = []
+
+    async def record_progress(done, total):
+        progress.append((done, total))
+
+    result = asyncio.run(server.cascade_delete_campaign(campaign, record_progress))
+
+    assert result == {"assets_freed": 8, "offer_requests_deleted": 30}
+    asset_updates = [call for call in fake_db.calls_to("assets") if call[1] == "update_many"]
+    assert len(asset_updates) == 2
+    assert progress == [(5, 8), (8, 8)]
+    assert [c["id"] for c in fake_db.campaigns.docs] == ["campaign-2"]
+    assert [o["id"] for o in fake_db.offer_requests.docs] == ["other"]
+
+
+class BulkRecorder:
+    def __init__(self):
+        self.operations = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+
+        class Result:
+            modified_count = len(operations)
+        return Result()
+
+
+def test_backfill_resolves_legacy_links_by_id_then_buyer_and_name(monkeypatch):
+    campaigns = [
+        {**make_campaign(1), "name": "Winter"},
+        {**make_campaign(2), "name": "Winter", "buyer_id": "buyer-2"},
+        {**make_campaign(3), "name": "Summer"},
+    ]
+    offers = [
+        {"_id": 1, "buyer_id": "buyer-1", "existing_campaign_id": "campaign-3", "campaign_name": "Winter"},
+        {"_id": 2, "buyer_id": "buyer-1", "campaign_name": "Winter"},
+        {"_id": 3, "buyer_id": "buyer-2", "campaign_name": "Winter"},
+        {"_id": 4, "buyer_id": "buyer-1", "campaign_name": "Nowhere"},
+        {"_id": 5, "buyer_id": "buyer-1", "existing_campaign_id": "deleted", "campaign_name": "Summer"},
+    ]
+    fake_db = FakeDatabase(campaigns=campaigns, offer_requests=offers)
+    recorder = BulkRecorder()
+    fake_db.offer_requests.bulk_write = recorder.bulk_write
+    monkeypatch.setattr(server, "db", fake_db)
+
+    updated = asyncio.run(server.backfill_offer_campaign_ids(batch_size=2))
+
+    assert updated == 5
+    resolved = {op._filter["_id"]: op._doc["$set"]["campaign_id"] for op in recorder.operations}
+    assert resolved == {1: "campaign-3", 2: "campaign-1", 3: "campaign-2", 4: None, 5: "campaign-3"}
+
+
+def test_campaign_assets_fetch_only_the_campaigns_assets(monkeypatch):
+    campaign = {
+        **make_campaign(1),
+        "campaign_assets": [{"asset_id": "a-1", "asset_name": "A1", "asset_start_date": datetime(2026, 2, 1)}],
+    }
+    assets = [
+        {"id": f"a-{i}", "name": f"A{i}", "type": "Billboard", "address": "Dhaka", "location": {"lat": 23.7, "lng": 90.4},
+         "dimensions": "10x20", "pricing": {}, "seller_id": "seller-1", "status": "Available", "marketplace_visible": True}
+        for i in range(100)
+    ]
+    offers = [
+        {"id": "o1", "asset_id": "a-2", "campaign_id": "campaign-1", "status": "Quoted", "created_at": 1},
+        {"id": "o2", "asset_id": "a-3", "campaign_id": "campaign-1", "status": "Rejected", "created_at": 2},
+        {"id": "o3", "asset_id": "a-4", "campaign_id": "campaign-9", "status": "Pending", "created_at": 3},
+    ]
+    fake_db = FakeDatabase(campaigns=[campaign], assets=assets, offer_requests=offers)
+    monkeypatch.setattr(server, "db", fake_db)
+    buyer = server.User(**{**make_admin().dict(), "id": "buyer-1", "role": "buyer"})
+
+    result = asyncio.run(server.get_campaign_assets("campaign-1", current_user=buyer))
+
+    by_id = {asset["id"]: asset for asset in result}
+    assert set(by_id) == {"a-1", "a-2"}
+    assert by_id["a-1"]["isInCampaign"] and not by_id["a-1"]["isRequested"]
+    assert by_id["a-2"]["offerStatus"] == "Quoted" and by_id["a-2"]["offerId"] == "o1"
+    asset_query = fake_db.calls_to("assets")[0][2][0]
+    assert set(asset_query["id"]["$in"]) == {"a-1", "a-2"}
+
+
+def test_live_assets_resolve_campaigns_and_inspections_in_batches(monkeypatch):
+    assets = [
+        {"id": f"a-{i}", "name": f"A{i}", "status": "Live", "buyer_id": "buyer-1", "category": "Public"}
+        for i in range(40)
+    ]
+    offers = [
+        {"id": f"o-{i}", "asset_id": f"a-{i}", "buyer_id": "buyer-1", "status": "Live",
+         "campaign_id": f"campaign-{i % 3}", "admin_quoted_price": 1000 + i, "contract_duration": "3_months"}
+        for i in range(40)
+    ]
+    records = [
+        {"asset_id": "a-5", "inspection_date": datetime(2026, 2, 1)},
+        {"asset_id": "a-5", "inspection_date": datetime(2026, 3, 1)},
+        {"asset_id": "a-6", "inspection_date": None},
+        {"asset_id": "other-asset", "inspection_date": datetime(2026, 4, 1)},
+    ]
+    fake_db = FakeDatabase(
+        assets=assets, offer_requests=offers, campaigns=[make_campaign(i) for i in range(3)], monitoring_records=records
+    )
+    monkeypatch.setattr(server, "db", fake_db)
+    buyer = server.User(**{**make_admin().dict(), "id": "buyer-1", "role": "buyer"})
+
+    result = asyncio.run(server.get_live_assets(current_user=buyer))
+
+    assert len(result) == 40
+    assert len(fake_db.calls_to("campaigns")) == 1
+    (_, operation, (pipeline,)), = fake_db.calls_to("monitoring_records")
+    assert operation == "aggregate"
+    assert set(pipeline[0]["$match"]["asset_id"]["$in"]) == {asset["id"] for asset in assets}
+    by_id = {asset["id"]: asset for asset in result}
+    assert by_id["a-4"]["campaignName"] == "Campaign 1"
+    assert by_id["a-4"]["cost"] == 1004
+    assert by_id["a-5"]["lastInspectionDate"] == datetime(2026, 3, 1)
+    assert by_id["a-6"]["lastInspectionDate"] is None and by_id["a-7"]["lastInspectionDate"] is None
+
+
+def test_buyer_dashboard_loads_sections_concurrently_and_isolates_failures(monkeypatch):
+    buyer = server.User(**{**make_admin().dict(), "id": "buyer-1", "role": "buyer"})
+    running, peak = [0], [0]
+
+    def section(result, fail=False):
+        async def handler(**kwargs):
+            assert kwargs["current_user"] is buyer
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            if fail:
+                raise server.HTTPException(status_code=500, detail="boom")
+            return result
+        return handler
+
+    monkeypatch.setattr(server, "get_campaigns", section([{"id": "campaign-1"}]))
+    monkeypatch.setattr(server, "get_offer_requests", section([]))
+    monkeypatch.setattr(server, "get_live_assets", section(None, fail=True))
+    monkeypatch.setattr(server, "get_monitoring_services", section({"services": [{"id": "s1"}]}))
+    monkeypatch.setattr(server, "get_monitoring_reports", section({"reports": [{"_id": 1, "id": "r1"}]}))
+
+    dashboard = asyncio.run(server.get_buyer_dashboard(current_user=buyer))
+
+    assert peak[0] == 5
+    assert dashboard["campaigns"] == [{"id": "campaign-1"}]
+    assert dashboard["live_assets"] is None and dashboard["errors"] == {"live_assets": "boom"}
+    assert dashboard["monitoring_services"] == [{"id": "s1"}]
+    assert dashboard["monitoring_reports"] == [{"id": "r1"}]
+    assert set(dashboard["timings_ms"]) == {
+        "campaigns", "offer_requests", "live_assets", "monitoring_services", "monitoring_reports", "total"
+    }
+
+
+def test_seller_views_resolve_asset_ids_without_loading_assets(monkeypatch):
+    assets = [{"id": f"a-{i}", "seller_id": "seller-1" if i < 3 else "seller-2"} for i in range(6)]
+    offers = [
+        {"id": f"o-{i}", "asset_id": f"a-{i}", "buyer_id": "buyer-1", "status": "Pending",
+         "campaign_id": f"campaign-{i}", "created_at": datetime(2026, 1, 1 + i)}
+        for i in range(6)
+    ]
+    fake_db = FakeDatabase(assets=assets, offer_requests=offers, campaigns=[make_campaign(i) for i in range(6)])
+    monkeypatch.setattr(server, "db", fake_db)
+    seller = server.User(**{**make_admin().dict(), "id": "seller-1", "role": "seller"})
+
+    requests = asyncio.run(server.get_offer_requests(current_user=seller))
+    campaigns = asyncio.run(server.get_campaigns(cursor=None, limit=None, include_assets=False, current_user=seller))
+
+    assert sorted(r.id for r in requests) == ["o-0", "o-1", "o-2"]
+    assert sorted(c["id"] for c in campaigns) == ["campaign-0", "campaign-1", "campaign-2"]
+    assert all(call[1] == "distinct" for call in fake_db.calls_to("assets"))
+
+
+def make_offer(index, status="Pending", **extra):
+    return {
+        "id": f"offer-{index}",
+        "buyer_id": "buyer-1",
+        "buyer_name": "Buyer Co",
+        "asset_id": f"asset-{index}",
+        "asset_name": f"Asset {index}",
+        "campaign_name": "Campaign 1",
+        "campaign_type": "existing",
+        "contract_duration": "1_month",
+        "service_bundles": {"printing": False, "setup": False, "monitoring": False},
+        "status": status,
+        "created_at": datetime(2026, 2, 1 + index),
+        **extra,
+    }
+
+
+def test_admin_offer_queue_filters_and_pages_server_side(monkeypatch):
+    offers = [make_offer(i, status="Pending" if i % 2 else "Quoted") for i in range(7)]
+    offers.append(make_offer(7, request_type="monitoring_service"))
+    fake_db = FakeDatabase(offer_requests=offers)
+    monkeypatch.setattr(server, "db", fake_db)
+
+    def fetch(**params):
+        defaults = dict(status=None, request_type=None, buyer_id=None, created_from=None,
+                        created_to=None, cursor=None, limit=None)
+        return asyncio.run(server.get_offer_requests_admin(**{**defaults, **params}, admin_user=make_admin()))
+
+    first = fetch(status="Pending", request_type="asset_offer", limit=2)
+    assert [offer.id for offer in first["items"]] == ["offer-5", "offer-3"]
+    assert first["total"] == 3
+    second = fetch(status="Pending", request_type="asset_offer", limit=2, cursor=first["next_cursor"])
+    assert [offer.id for offer in second["items"]] == ["offer-1"]
+    assert second["next_cursor"] is None
+
+    legacy = fetch(status="Quoted,Pending", created_from=datetime(2026, 2, 5))
+    assert [offer.id for offer in legacy] == ["offer-7", "offer-6", "offer-5", "offer-4"]
+
+
+def test_offer_request_defaults_backfill_only_targets_missing_fields(monkeypatch):
+    fake_db = FakeDatabase(offer_requests=[make_offer(1)])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    asyncio.run(server.backfill_offer_request_defaults())
+
+    calls = fake_db.calls_to("offer_requests")
+    assert len(calls) == len(server.OFFER_REQUEST_DEFAULTS) + len(server.OFFER_REQUEST_DERIVED_DEFAULTS)
+    assert all(call[1] == "update_many" and list(call[2][0].values()) == [{"$exists": False}] for call in calls)
+
+
+def test_monitoring_service_requests_stay_out_of_campaign_joins(monkeypatch):
+    campaign = make_campaign(1)
+    offer = {"id": "o1", "asset_id": "a1", "asset_name": "A1", "status": "Quoted", "buyer_id": "buyer-1",
+             "campaign_id": "campaign-1"}
+    monitoring = {"id": "m1", "asset_id": "a2", "status": "Approved", "buyer_id": "buyer-1",
+                  "campaign_id": "campaign-1", "request_type": "monitoring_service"}
+    fake_db = FakeDatabase(campaigns=[campaign], offer_requests=[offer, monitoring], assets=[])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    enhanced = asyncio.run(server.attach_campaign_offer_assets([campaign]))
+    assert [a["asset_id"] for a in enhanced[0]["campaign_assets"]] == ["a1"]
+
+    assert server.campaign_counter_increments(None, monitoring) == []
+    assert server.campaign_live_operation(monitoring, ["Draft"], datetime(2026, 1, 1)) == []
+
+    async def no_transactions():
+        return False
+    monkeypatch.setattr(server, "transactions_supported", no_transactions)
+
+    result = asyncio.run(server.cascade_delete_campaign(campaign))
+
+    assert result == {"assets_freed": 1, "offer_requests_deleted": 1}
+    assert [o["id"] for o in fake_db.offer_requests.docs] == ["m1"]
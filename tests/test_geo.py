@@ -0,0 +1,156 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+import server
+from tests.fake_db import FakeCursor, FakeDatabase
+
+
+def test_geojson_point_uses_lng_lat_order_and_rejects_bad_locations():
+    assert server.to_geojson_point({"lat": 23.78, "lng": 90.41}) == {
+        "type": "Point", "coordinates": [90.41, 23.78]
+    }
+    assert server.to_geojson_point(None) is None
+    assert server.to_geojson_point({"lat": 123, "lng": 90}) is None
+    assert server.to_geojson_point({"lat": "x", "lng": 90}) is None
+
+
+def test_parse_bbox():
+    assert server.parse_bbox("90.3,23.7,90.5,23.9") == (90.3, 23.7, 90.5, 23.9)
+    with pytest.raises(HTTPException):
+        server.parse_bbox("90.5,23.7,90.3,23.9")
+    with pytest.raises(HTTPException):
+        server.parse_bbox("not,a,bbox")
+
+
+def test_tile_range_for_bbox_covers_viewport():
+    # zoom 0 is a single tile covering the world
+    assert server.tile_range_for_bbox(-180, -90, 180, 90, 0) == (0, 0, 0, 0)
+    # zoom 1 splits into 180 x 90 degree tiles; Dhaka sits in the north-east one
+    assert server.tile_range_for_bbox(90.3, 23.7, 90.5, 23.9, 1) == (1, 0, 1, 0)
+    x0, y0, x1, y1 = server.tile_range_for_bbox(88.0, 20.5, 92.7, 26.6, 8)
+    assert x0 <= x1 and y0 <= y1
+    tile_w, tile_h = server.tile_size_degrees(8)
+    assert -180 + x0 * tile_w <= 88.0 < -180 + (x1 + 1) * tile_w
+    assert 90 - (y1 + 1) * tile_h <= 20.5 and 26.6 <= 90 - y0 * tile_h
+
+
+def unit_vector(lng, lat):
+    lng, lat = math.radians(lng), math.radians(lat)
+    return np.array([math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat)])
+
+
+def inside_geodesic_polygon(polygon, lng, lat):
+    """Point-in-polygon with great-circle edges, for a convex counter-clockwise ring"""
+    ring = [unit_vector(*vertex) for vertex in polygon["coordinates"][0]]
+    point = unit_vector(lng, lat)
+    return all(np.dot(np.cross(a, b), point) >= 0 for a, b in zip(ring, ring[1:]))
+
+
+class PipelineRecorder:
+    def __init__(self):
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return FakeCursor([])
+
+
+def test_tile_prefilter_keeps_assets_near_the_equatorward_edge(monkeypatch):
+    # zoom 3 tile x=6, y=2 spans 90E-135E, 22.5N-45N; a straight polygon edge at
+    # 22.5N bows north to ~24.15N at 112.5E and would drop this asset
+    asset = (112.5, 23.0)
+    tile_w, tile_h = server.tile_size_degrees(3)
+    west, south = -180 + 6 * tile_w, 90 - 3 * tile_h
+    unpadded = {"type": "Polygon", "coordinates": [[
+        [west, south], [west + tile_w, south], [west + tile_w, south + tile_h], [west, south + tile_h], [west, south]
+    ]]}
+    assert not inside_geodesic_polygon(unpadded, *asset)
+
+    assets = PipelineRecorder()
+    monkeypatch.setattr(server, "db", type("DB", (), {"assets": assets})())
+    asyncio.run(server.compute_tile_clusters(3, 6, 2, 6, 2))
+
+    polygon = assets.pipelines[0][0]["$match"]["geo_location"]["$geoWithin"]["$geometry"]
+    assert inside_geodesic_polygon(polygon, *asset)
+    # the same holds south of the equator, where the north edge is equatorward
+    assert inside_geodesic_polygon(server.bbox_geometry(90, -45, 135, -22.5), 112.5, -23.0)
+
+
+def test_assets_within_filters_exact_coordinates_after_padded_prefilter(monkeypatch):
+    assets = PipelineRecorder()
+    monkeypatch.setattr(server, "db", type("DB", (), {"assets": assets})())
+    asyncio.run(server.get_assets_within(bbox="90,22.5,135,45", type=None, status=None, limit=10))
+
+    pipeline = assets.pipelines[0]
+    assert inside_geodesic_polygon(pipeline[0]["$match"]["geo_location"]["$geoWithin"]["$geometry"], 112.5, 23.0)
+    assert pipeline[1] == server.geo_coordinate_range_stage(90, 22.5, 135, 45)
+
+
+def scalar_haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * server.EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+def test_gps_distance_matches_scalar_haversine_and_flags_bad_input():
+    gulshan, dhanmondi = {"lat": 23.7925, "lng": 90.4078}, {"lat": 23.7461, "lng": 90.3742}
+
+    assert server.calculate_gps_distance(gulshan, dhanmondi) == pytest.approx(
+        scalar_haversine(23.7925, 90.4078, 23.7461, 90.3742)
+    )
+    assert server.calculate_gps_distance(gulshan, gulshan) == 0.0
+    assert server.calculate_gps_distance(gulshan, {}) == server.GPS_DISTANCE_UNKNOWN
+    assert server.calculate_gps_distance(None, gulshan) == server.GPS_DISTANCE_UNKNOWN
+
+
+def test_haversine_kernel_matches_scalar_formula_on_random_pairs():
+    rng = np.random.default_rng(0)
+    lat1, lat2 = rng.uniform(20.5, 26.5, (2, 10_000))
+    lng1, lng2 = rng.uniform(88.0, 92.7, (2, 10_000))
+
+    distances = server.haversine_distances(lat1, lng1, lat2, lng2)
+
+    sample = [scalar_haversine(lat1[i], lng1[i], lat2[i], lng2[i]) for i in range(0, 10_000, 1_000)]
+    assert distances[::1_000] == pytest.approx(sample)
+
+
+def test_report_reverification_batches_lookups_and_writes_only_changes(monkeypatch):
+    tasks = [{"id": f"task-{i}", "asset_location": {"lat": 23.78, "lng": 90.40}} for i in range(3)]
+    tasks.append({"id": "task-3", "asset_location": None})
+    reports = [
+        # accurate, stored values already right
+        {"_id": 1, "task_id": "task-0", "gps_location": {"lat": 23.78, "lng": 90.40},
+         "location_accuracy": 0.0, "location_verified": True},
+        # ~110 m away but stored as verified
+        {"_id": 2, "task_id": "task-1", "gps_location": {"lat": 23.781, "lng": 90.40},
+         "location_accuracy": 0.0, "location_verified": True},
+        # no GPS fix
+        {"_id": 3, "task_id": "task-2", "gps_location": {}, "location_accuracy": 0.0, "location_verified": False},
+        # asset without a location is left alone
+        {"_id": 4, "task_id": "task-3", "gps_location": {"lat": 23.78, "lng": 90.40}},
+    ]
+    fake_db = FakeDatabase(monitoring_reports=reports, monitoring_tasks=tasks)
+    monkeypatch.setattr(server, "db", fake_db)
+    written = []
+
+    async def bulk_write(operations, ordered=True):
+        written.extend(operations)
+
+        class Result:
+            modified_count = len(operations)
+        return Result()
+
+    fake_db.monitoring_reports.bulk_write = bulk_write
+
+    result = asyncio.run(server.reverify_report_locations(batch_size=10))
+
+    assert result == {"checked": 4, "updated": 2}
+    assert len(fake_db.calls_to("monitoring_tasks")) == 1
+    updates = {operation._filter["_id"]: operation._doc["$set"] for operation in written}
+    assert updates[2]["location_verified"] is False
+    assert updates[2]["location_accuracy"] == pytest.approx(111.2, abs=0.5)
+    assert updates[3] == {"location_accuracy": server.GPS_DISTANCE_UNKNOWN, "location_verified": False}
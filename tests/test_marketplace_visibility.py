@@ -0,0 +1,24 @@
+import server
+
+
+def test_visibility_rule():
+    assert server.is_marketplace_visible({"category": "Public", "status": "Booked"})
+    assert server.is_marketplace_visible({"status": "Booked"})
+    assert server.is_marketplace_visible({"category": None})
+    assert server.is_marketplace_visible({"category": ""})
+    assert not server.is_marketplace_visible({"category": "Private Asset", "show_in_marketplace": True})
+    assert server.is_marketplace_visible(
+        {"category": "Existing Asset", "show_in_marketplace": True, "status": server.AssetStatus.LIVE}
+    )
+    assert not server.is_marketplace_visible(
+        {"category": "Existing Asset", "show_in_marketplace": False, "status": "Live"}
+    )
+    assert not server.is_marketplace_visible(
+        {"category": "Existing Asset", "show_in_marketplace": True, "status": "Booked"}
+    )
+
+
+def test_pipeline_update_sets_fields_literally_then_recomputes_flag():
+    pipeline = server.with_marketplace_visibility({"status": "Live", "price_note": "$100"})
+    assert pipeline[0] == {"$set": {"status": {"$literal": "Live"}, "price_note": {"$literal": "$100"}}}
+    assert pipeline[1] == {"$set": {"marketplace_visible": server.MARKETPLACE_VISIBLE_EXPR}}
@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+from tests.fake_db import FakeDatabase
+from tests.test_campaigns import make_admin
+
+
+NOW = datetime(2026, 5, 1, 9, 0)
+
+
+def make_subscription(index=1, frequency="daily", asset_count=50, **extra):
+    return {
+        "id": f"sub-{index}",
+        "buyer_id": "buyer-1",
+        "asset_ids": [f"asset-{i}" for i in range(asset_count)],
+        "frequency": frequency,
+        "start_date": NOW,
+        "end_date": NOW + timedelta(days=365),
+        "status": "active",
+        **extra,
+    }
+
+
+def make_assets(count=50):
+    return [{"id": f"asset-{i}", "location": {"lat": 23.7 + i / 1000, "lng": 90.4}} for i in range(count)]
+
+
+def test_activation_materializes_only_the_horizon(monkeypatch):
+    fake_db = FakeDatabase(assets=make_assets(), monitoring_tasks=[], monitoring_subscriptions=[make_subscription()])
+    monkeypatch.setattr(server, "db", fake_db)
+    subscription = server.MonitoringServiceSubscription(**make_subscription())
+
+    created = asyncio.run(server.generate_monitoring_tasks(subscription.id, subscription, now=NOW))
+
+    assert created == (server.MONITORING_TASK_HORIZON_DAYS + 1) * 50
+    assert len(fake_db.calls_to("assets")) == 1
+    assert fake_db.monitoring_tasks.docs[0]["asset_location"] == {"lat": 23.7, "lng": 90.4}
+    assert max(task["scheduled_date"] for task in fake_db.monitoring_tasks.docs) == NOW + timedelta(days=14)
+
+
+def test_extender_tops_up_after_the_watermark(monkeypatch):
+    subscriptions = [
+        make_subscription(1, asset_count=2, tasks_generated_through=NOW + timedelta(days=10)),
+        make_subscription(2, frequency="weekly", asset_count=3),
+        make_subscription(3, asset_count=2, tasks_generated_through=NOW + timedelta(days=20)),
+    ]
+    fake_db = FakeDatabase(assets=make_assets(), monitoring_tasks=[], monitoring_subscriptions=subscriptions)
+    monkeypatch.setattr(server, "db", fake_db)
+
+    created = asyncio.run(server.extend_monitoring_horizons(now=NOW))
+
+    # sub-1: days 11..14, sub-2: days 0, 7 and 14, sub-3 is already ahead of the horizon
+    assert created == 4 * 2 + 3 * 3
+    assert len(fake_db.calls_to("assets")) == 1
+
+
+def test_schedule_dates_jump_to_the_window():
+    start = datetime(2025, 1, 1)
+    dates = server.monitoring_schedule_dates(start, "bi_weekly", datetime(2026, 1, 1), datetime(2026, 2, 1))
+
+    assert dates == [datetime(2026, 1, 14), datetime(2026, 1, 28)]
+    assert server.monitoring_schedule_dates(start, "custom", start, datetime(2026, 1, 1)) == []
+
+
+def test_generate_tasks_for_date_is_idempotent_in_constant_round_trips(monkeypatch):
+    subscriptions = [
+        make_subscription(1, asset_count=20),
+        make_subscription(2, frequency="weekly", asset_count=5),
+        make_subscription(3, asset_count=10, status="expired"),
+    ]
+    fake_db = FakeDatabase(assets=make_assets(), monitoring_tasks=[], monitoring_subscriptions=subscriptions)
+    monkeypatch.setattr(server, "db", fake_db)
+    manager = server.User(**{**make_admin().dict(), "role": "manager"})
+
+    def generate(date):
+        return asyncio.run(server.generate_tasks_for_date({"date": date}, current_user=manager))
+
+    first = generate("2026-05-08T09:00:00Z")
+    assert (first["tasks_created"], first["tasks_existing"]) == (25, 0)
+    assert len(fake_db.calls) == 3
+
+    second = generate("2026-05-08T09:00:00Z")
+    assert (second["tasks_created"], second["tasks_existing"]) == (0, 25)
+    assert {task["scheduled_day"] for task in fake_db.monitoring_tasks.docs} == {"2026-05-08"}
+
+
+def test_daily_job_matches_the_horizon_generator_and_skips_ended_subscriptions(monkeypatch):
+    subscriptions = [
+        make_subscription(1, asset_count=2),
+        make_subscription(2, asset_count=2, end_date=NOW + timedelta(days=3)),
+    ]
+    fake_db = FakeDatabase(assets=make_assets(), monitoring_tasks=[], monitoring_subscriptions=subscriptions)
+    monkeypatch.setattr(server, "db", fake_db)
+
+    # sub-2 ended on day 3 but is still "active" until the expiry job runs
+    created, _ = asyncio.run(server.generate_tasks_for_day(NOW + timedelta(days=5, hours=6)))
+    assert created == 2
+    daily_job_tasks = {(task["subscription_id"], task["asset_id"]): task for task in fake_db.monitoring_tasks.docs}
+
+    fake_db.monitoring_tasks.docs.clear()
+    subscription = server.MonitoringServiceSubscription(**make_subscription(1, asset_count=2))
+    asyncio.run(server.generate_monitoring_tasks(subscription.id, subscription, horizon_days=5, now=NOW))
+    horizon_tasks = {
+        (task["subscription_id"], task["asset_id"]): task
+        for task in fake_db.monitoring_tasks.docs if task["scheduled_day"] == "2026-05-06"
+    }
+
+    assert set(daily_job_tasks) == set(horizon_tasks)
+    for key, task in daily_job_tasks.items():
+        assert task["scheduled_date"] == horizon_tasks[key]["scheduled_date"] == NOW + timedelta(days=5)
+        assert task["due_date"] == horizon_tasks[key]["due_date"] == NOW + timedelta(days=5) + server.MONITORING_TASK_WINDOW
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from tests.fake_db import FakeDatabase
+from tests.test_campaigns import make_admin, make_offer
+
+
+def make_buyer(user_id="buyer-1"):
+    return server.User(
+        id=user_id,
+        email=f"{user_id}@example.com",
+        company_name="Buyer Co",
+        contact_name="Buyer",
+        phone="+8801000000001",
+        role="buyer",
+        status="approved",
+    )
+
+
+def setup_db(monkeypatch, *offers):
+    fake_db = FakeDatabase(offer_requests=list(offers), assets=[], campaigns=[])
+    monkeypatch.setattr(server, "db", fake_db)
+    return fake_db
+
+
+def test_make_live_is_one_conditional_write_plus_one_write_per_collection(monkeypatch):
+    fake_db = setup_db(monkeypatch, make_offer(1, status="PO Uploaded", campaign_id="campaign-1"))
+
+    asyncio.run(server.make_offer_live("offer-1", admin_user=make_admin()))
+
+    offer_calls = fake_db.calls_to("offer_requests")
+    assert [call[1] for call in offer_calls] == ["find_one_and_update"]
+    assert offer_calls[0][2][0] == {"id": "offer-1", "status": {"$in": server.OFFER_TRANSITIONS["make_live"][0]}}
+    assert [call[1] for call in fake_db.calls_to("assets")] == ["update_one"]
+    campaign_calls = fake_db.calls_to("campaigns")
+    assert [call[1] for call in campaign_calls] == ["bulk_write"]
+    # counter move and the Draft/Ready -> Live flip share the batch
+    assert len(campaign_calls[0][2][0]) == 2
+    assert fake_db.offer_requests.docs[0]["status"] == "Live"
+
+
+def test_transition_invalidates_public_responses_once(monkeypatch):
+    fake_db = setup_db(monkeypatch, make_offer(1, status="Quoted"))
+    monkeypatch.setattr(server, "public_response_cache", server.ResponseCache(60, 10))
+
+    asyncio.run(server.respond_to_offer("offer-1", {"action": "accept"}, current_user=make_buyer()))
+
+    assert len(fake_db.calls_to("data_versions")) == 1
+    assert fake_db.data_versions.docs == [{"_id": "public", "version": 1}]
+    assert server.public_response_cache.data_version == 1
+
+
+def test_concurrent_buyer_responses_only_apply_once(monkeypatch):
+    setup_db(monkeypatch, make_offer(1, status="Quoted"))
+
+    async def respond_twice():
+        return await asyncio.gather(
+            server.respond_to_offer("offer-1", {"action": "accept"}, current_user=make_buyer()),
+            server.respond_to_offer("offer-1", {"action": "accept"}, current_user=make_buyer()),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(respond_twice())
+
+    assert first == {"message": "Offer accepted successfully"}
+    assert isinstance(second, HTTPException) and second.status_code == 409
+
+
+def test_transition_errors_distinguish_missing_foreign_and_conflicting_offers(monkeypatch):
+    setup_db(monkeypatch, make_offer(1, status="Pending"))
+
+    def respond(request_id, user):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(server.respond_to_offer(request_id, {"action": "accept"}, current_user=user))
+        return error.value.status_code
+
+    assert respond("missing", make_buyer()) == 404
+    assert respond("offer-1", make_buyer("buyer-2")) == 403
+    assert respond("offer-1", make_buyer()) == 409
+
+
+def test_booking_window_falls_back_to_contract_duration():
+    now = datetime(2026, 3, 1)
+    start = datetime(2026, 4, 1)
+
+    assert server.offer_booking_window({"contract_duration": "3_months"}, now) == (now, now + timedelta(days=90))
+    assert server.offer_booking_window({"tentative_start_date": start, "contract_duration": "bogus"}, now) == (
+        start, start + timedelta(days=30)
+    )
+
+
+class FakePdf:
+    content_type = "application/pdf"
+
+    async def read(self):
+        return b"%PDF-1.4"
+
+
+def record_cloudinary(monkeypatch):
+    calls = []
+
+    def upload(data_uri, **options):
+        calls.append(("upload", options["public_id"]))
+        return {"secure_url": f"https://cdn.example.com/{options['public_id']}", "public_id": options["public_id"]}
+
+    def destroy(public_id, **options):
+        calls.append(("destroy", public_id))
+
+    monkeypatch.setattr(server.cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(server.cloudinary.uploader, "destroy", destroy)
+    return calls
+
+
+def test_upload_po_checks_the_offer_before_uploading(monkeypatch):
+    setup_db(monkeypatch, make_offer(1, status="Pending"))
+    calls = record_cloudinary(monkeypatch)
+
+    for request_id, status_code in (("missing", 404), ("offer-1", 409)):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(server.upload_po(request_id, file=FakePdf(), uploaded_by="buyer", current_user=make_buyer()))
+        assert error.value.status_code == status_code
+
+    assert calls == []
+
+
+def test_upload_po_deletes_the_upload_when_the_offer_moves_underneath_it(monkeypatch):
+    fake_db = setup_db(monkeypatch, make_offer(1, status="PO Required"))
+    calls = record_cloudinary(monkeypatch)
+
+    async def moved_on(*args, **kwargs):
+        fake_db.offer_requests.docs[0]["status"] = "Live"
+        raise await server.offer_transition_error("offer-1", "PO Uploaded", None)
+
+    monkeypatch.setattr(server, "transition_offer", moved_on)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.upload_po("offer-1", file=FakePdf(), uploaded_by="buyer", current_user=make_buyer()))
+
+    assert error.value.status_code == 409
+    assert [call[0] for call in calls] == ["upload", "destroy"] and calls[0][1] == calls[1][1]
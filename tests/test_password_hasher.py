@@ -0,0 +1,35 @@
+import asyncio
+
+import server
+
+
+def test_hash_and_verify_run_on_the_pool():
+    hasher = server.PasswordHasher(max_workers=2)
+
+    async def scenario():
+        hashed = await hasher.hash("secret")
+        results = await asyncio.gather(*(hasher.verify("secret", hashed) for _ in range(4)))
+        wrong = await hasher.verify("nope", hashed)
+        return results, wrong
+
+    results, wrong = asyncio.run(scenario())
+    hasher.shutdown()
+    assert all(results)
+    assert wrong is False
+    stats = hasher.stats()
+    assert stats["completed"] == 6
+    assert stats["queue_depth"] == 0
+    assert stats["active"] == 0
+    assert stats["max_queue_depth"] >= 2
+
+
+def test_uncontended_hash_is_not_counted_as_queued():
+    hasher = server.PasswordHasher(max_workers=2)
+
+    asyncio.run(hasher.hash("secret"))
+    hasher.shutdown()
+
+    stats = hasher.stats()
+    assert stats["completed"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] == 0
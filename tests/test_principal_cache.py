@@ -0,0 +1,85 @@
+import asyncio
+
+import server
+from tests.fake_db import FakeDatabase
+
+
+def make_user(user_id="u1", status="approved"):
+    return server.User(
+        id=user_id,
+        email=f"{user_id}@example.com",
+        company_name="Acme",
+        contact_name="Tester",
+        phone="+8801000000000",
+        role="buyer",
+        status=status,
+    )
+
+
+def test_cache_hit_miss_and_invalidation():
+    cache = server.PrincipalCache(ttl_seconds=60, max_size=10)
+    assert cache.get("u1") is None
+    cache.set("u1", make_user())
+    assert cache.get("u1").id == "u1"
+    cache.invalidate("u1")
+    assert cache.get("u1") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["invalidations"] == 1
+
+
+def test_cache_is_size_bounded_and_expires():
+    cache = server.PrincipalCache(ttl_seconds=60, max_size=2)
+    for user_id in ("a", "b", "c"):
+        cache.set(user_id, make_user(user_id))
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+    expired = server.PrincipalCache(ttl_seconds=0.0001, max_size=2)
+    expired.set("a", make_user("a"))
+    asyncio.run(asyncio.sleep(0.01))
+    assert expired.get("a") is None
+
+
+def test_sample_data_reset_drops_every_cached_principal(monkeypatch):
+    fake_db = FakeDatabase(users=[{"id": "u1"}], assets=[], campaigns=[], offer_requests=[])
+    monkeypatch.setattr(server, "db", fake_db)
+    monkeypatch.setattr(server, "principal_cache", server.PrincipalCache(ttl_seconds=60, max_size=10))
+
+    async def fast_hash(password):
+        return "hashed"
+    monkeypatch.setattr(server.password_hasher, "hash", fast_hash)
+    server.principal_cache.set("u1", make_user())
+
+    asyncio.run(server.init_bangladesh_sample_data())
+
+    assert server.principal_cache.get("u1") is None
+    assert [user["email"] for user in fake_db.users.docs] == ["admin@beatspace.com"]
+
+
+class RecordingUsers:
+    def __init__(self):
+        self.batches = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+
+
+class RecordingDB:
+    def __init__(self):
+        self.users = RecordingUsers()
+
+
+def test_last_login_buffer_coalesces_into_one_bulk_write(monkeypatch):
+    fake_db = RecordingDB()
+    monkeypatch.setattr(server, "db", fake_db)
+    buffer = server.LastLoginBuffer(flush_interval_seconds=60)
+    for _ in range(5):
+        buffer.record("u1")
+    buffer.record("u2")
+
+    assert asyncio.run(buffer.flush()) == 2
+    assert len(fake_db.users.batches) == 1
+    assert len(fake_db.users.batches[0]) == 2
+    assert asyncio.run(buffer.flush()) == 0
@@ -0,0 +1,107 @@
+import asyncio
+
+from starlette.requests import Request
+
+import server
+from tests.fake_db import FakeDatabase
+
+
+def make_request(if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/api/stats/public", "headers": headers})
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = server.ResponseCache(ttl_seconds=60, max_size=10)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute, 0) for _ in range(5)))
+
+    bodies = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert set(bodies) == {b'{"value":1}'}
+    assert cache.coalesced == 4
+
+
+def test_write_during_computation_is_not_cached():
+    cache = server.ResponseCache(ttl_seconds=60, max_size=10)
+
+    async def compute():
+        cache.bump()
+        return []
+
+    asyncio.run(cache.get_or_compute("key", compute, 0))
+
+    assert cache.get("key") is None
+
+
+def test_entries_from_an_older_version_are_not_served():
+    cache = server.ResponseCache(ttl_seconds=60, max_size=10)
+    values = iter([1, 2])
+
+    async def compute():
+        return {"value": next(values)}
+
+    assert asyncio.run(cache.get_or_compute("key", compute, 0)) == b'{"value":1}'
+    assert asyncio.run(cache.get_or_compute("key", compute, 3)) == b'{"value":2}'
+
+
+def setup_public_stats(monkeypatch):
+    fake_db = FakeDatabase(
+        assets=[{"id": "a1", "status": "Available"}, {"id": "a2", "status": "Booked"}],
+        users=[{"id": "u1"}],
+        campaigns=[{"id": "c1", "status": "Live"}],
+    )
+    monkeypatch.setattr(server, "db", fake_db)
+    monkeypatch.setattr(server, "public_response_cache", server.ResponseCache(60, 10))
+    return fake_db
+
+
+def data_calls(fake_db):
+    return [call for call in fake_db.calls if call[0] != "data_versions"]
+
+
+def test_public_stats_answers_304_by_version_without_rebuilding(monkeypatch):
+    fake_db = setup_public_stats(monkeypatch)
+
+    first = asyncio.run(server.get_public_stats(make_request()))
+    calls = len(data_calls(fake_db))
+    assert first.status_code == 200
+    assert b'"total_assets":2' in first.body
+
+    # Even with the body evicted, a current ETag is answered from the version alone
+    etag = first.headers["etag"]
+    server.public_response_cache.clear()
+    second = asyncio.run(server.get_public_stats(make_request(if_none_match=etag)))
+    assert second.status_code == 304
+    assert len(data_calls(fake_db)) == calls
+
+    # A write moves the version, so the old ETag no longer matches
+    asyncio.run(server.bump_data_version())
+    third = asyncio.run(server.get_public_stats(make_request(if_none_match=etag)))
+    assert third.status_code == 200
+    assert third.headers["etag"] != etag
+    assert len(data_calls(fake_db)) > calls
+
+
+def test_workers_pick_up_a_version_bumped_elsewhere(monkeypatch):
+    fake_db = setup_public_stats(monkeypatch)
+    monkeypatch.setattr(server, "DATA_VERSION_REFRESH_SECONDS", 0)
+
+    etag = asyncio.run(server.get_public_stats(make_request())).headers["etag"]
+    # another worker's write, seen only through the shared counter
+    fake_db.data_versions.docs.append({"_id": "public", "version": 5})
+
+    response = asyncio.run(server.get_public_stats(make_request(if_none_match=etag)))
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"5-')
@@ -0,0 +1,97 @@
+import asyncio
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+import server
+from tests.fake_db import FakeDatabase
+
+
+def route_length(route, distances):
+    return sum(distances[a, b] for a, b in zip(route, route[1:]))
+
+
+def test_route_follows_a_street_from_the_start_location():
+    lngs = [90.40 + i * 0.002 for i in range(8)]
+    tasks = [{"id": f"t{i}", "asset_location": {"lat": 23.78, "lng": lng}} for i, lng in enumerate(lngs)]
+    random.Random(3).shuffle(tasks)
+    tasks.append({"id": "no-gps", "asset_location": None})
+
+    plan, total_meters = server.plan_route(tasks, start_location={"lat": 23.78, "lng": 90.418})
+
+    assert [task_id for task_id, _, _ in plan] == [f"t{i}" for i in range(7, -1, -1)] + ["no-gps"]
+    assert [order for _, order, _ in plan] == list(range(1, 10))
+    assert plan[-1][2] is None
+    assert 1800 < total_meters < 1870
+
+
+def test_malformed_locations_are_routed_as_unlocated():
+    tasks = [
+        {"id": "empty", "asset_location": {}},
+        {"id": "a", "asset_location": {"lat": 23.78, "lng": 90.40}},
+        {"id": "half", "asset_location": {"lat": 23.7}},
+        {"id": "nan", "asset_location": {"lat": float("nan"), "lng": 90.41}},
+        {"id": "b", "asset_location": {"lat": 23.79, "lng": 90.40}},
+    ]
+
+    plan, total_meters = server.plan_route(tasks, start_location={"lng": 90.40})
+
+    assert [task_id for task_id, _, _ in plan] == ["a", "b", "empty", "half", "nan"]
+    assert [minutes for _, _, minutes in plan[2:]] == [None, None, None]
+    assert 1100 < total_meters < 1120
+
+
+def test_route_request_requires_a_complete_start_location():
+    with pytest.raises(ValidationError):
+        server.RouteOptimizationRequest(date="2026-05-01", start_location={"lat": 23.7})
+    request = server.RouteOptimizationRequest(date="2026-05-01", start_location={"lat": 23.7, "lng": 90.4})
+    assert request.start_location.dict() == {"lat": 23.7, "lng": 90.4}
+
+
+def test_two_opt_improves_the_greedy_route_for_two_hundred_stops():
+    rng = np.random.default_rng(7)
+    lats = 23.70 + rng.random(200) * 0.15
+    lngs = 90.35 + rng.random(200) * 0.15
+
+    distances = server.haversine_matrix(lats, lngs)
+    greedy = server.nearest_neighbour_route(distances)
+    improved = server.two_opt_route(greedy, distances)
+
+    assert sorted(improved) == list(range(200)) and improved[0] == 0
+    assert route_length(improved, distances) < route_length(greedy, distances)
+
+
+def test_optimize_operator_route_reads_once_and_writes_once(monkeypatch):
+    tasks = [
+        {"id": f"t{i}", "assigned_operator_id": "op-1", "status": "assigned", "scheduled_date": datetime(2026, 5, 1, 9),
+         "asset_location": {"lat": 23.78 + i * 0.01, "lng": 90.4}}
+        for i in range(5)
+    ]
+    fake_db = FakeDatabase(monitoring_tasks=tasks)
+    monkeypatch.setattr(server, "db", fake_db)
+
+    result = asyncio.run(server.optimize_operator_route("op-1", datetime(2026, 5, 1)))
+
+    assert [call[1] for call in fake_db.calls] == ["find", "bulk_write"]
+    assert result["stops"] == 5
+    assert [stop["task_id"] for stop in result["route"]] == ["t0", "t1", "t2", "t3", "t4"]
+    assert result["route"][0]["estimated_travel_time"] == 0
+
+
+def test_swept_overdue_tasks_stay_on_the_route(monkeypatch):
+    tasks = [
+        {"id": f"t{i}", "assigned_operator_id": "op-1", "status": "assigned", "scheduled_date": datetime(2026, 5, 1, 9),
+         "due_date": datetime(2026, 5, 1, 11 + i), "asset_location": {"lat": 23.78 + i * 0.01, "lng": 90.4}}
+        for i in range(3)
+    ]
+    fake_db = FakeDatabase(monitoring_tasks=tasks)
+    monkeypatch.setattr(server, "db", fake_db)
+
+    assert asyncio.run(server.sweep_overdue_tasks(now=datetime(2026, 5, 1, 12, 30))) == 2
+    result = asyncio.run(server.optimize_operator_route("op-1", datetime(2026, 5, 1)))
+
+    assert [task["status"] for task in fake_db.monitoring_tasks.docs] == ["overdue", "overdue", "assigned"]
+    assert [stop["task_id"] for stop in result["route"]] == ["t0", "t1", "t2"]
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+from tests.fake_db import FakeDatabase
+
+
+NOW = datetime(2026, 5, 1, 9, 0)
+
+
+def test_lease_admits_one_worker_until_it_expires(monkeypatch):
+    fake_db = FakeDatabase(scheduler_leases=[])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    def acquire(owner, now):
+        return asyncio.run(server.acquire_scheduler_lease("sweep", owner, 300, now=now))
+
+    assert acquire("worker-a", NOW)
+    assert not acquire("worker-b", NOW + timedelta(seconds=10))
+    assert acquire("worker-a", NOW + timedelta(seconds=20))
+    assert acquire("worker-b", NOW + timedelta(seconds=400))
+    assert fake_db.scheduler_leases.docs == [
+        {"_id": "sweep", "owner": "worker-b", "acquired_at": NOW + timedelta(seconds=400),
+         "expires_at": NOW + timedelta(seconds=700)}
+    ]
+
+
+def test_job_records_runs_failures_and_skips(monkeypatch):
+    leases = iter([True, True, False])
+
+    async def fake_acquire(name, owner, ttl_seconds, now=None):
+        return next(leases)
+
+    monkeypatch.setattr(server, "acquire_scheduler_lease", fake_acquire)
+    results = iter([7, RuntimeError("db down")])
+
+    async def work():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    job = server.ScheduledJob("demo", work, interval_seconds=60, jitter_seconds=5)
+    ran = [asyncio.run(job.run_once("worker-a")) for _ in range(3)]
+
+    assert ran == [True, True, False]
+    stats = job.stats()
+    assert (stats["runs"], stats["failures"], stats["skipped"]) == (2, 1, 1)
+    assert stats["last_error"] == "db down"
+    assert 60 <= job.next_delay() <= 65
+
+
+def test_sweeper_and_expiry_target_unstarted_past_due_documents(monkeypatch):
+    past_due = NOW - timedelta(hours=1)
+    tasks = [
+        {"id": status, "status": status, "due_date": past_due}
+        for status in ("pending", "assigned", "in_progress", "completed")
+    ] + [{"id": "later", "status": "assigned", "due_date": NOW + timedelta(hours=1)}]
+    fake_db = FakeDatabase(monitoring_tasks=tasks, monitoring_subscriptions=[])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    assert asyncio.run(server.sweep_overdue_tasks(now=NOW)) == 2
+    asyncio.run(server.expire_monitoring_subscriptions(now=NOW))
+
+    (_, _, (task_query, task_update)), (_, _, (subscription_query, _)) = fake_db.calls
+    assert task_query == {"status": {"$in": server.UNSTARTED_TASK_STATUSES}, "due_date": {"$lt": NOW}}
+    # an operator already on site isn't pulled off the task
+    assert {task["id"]: task["status"] for task in fake_db.monitoring_tasks.docs} == {
+        "pending": "overdue", "assigned": "overdue", "in_progress": "in_progress",
+        "completed": "completed", "later": "assigned"
+    }
+    assert subscription_query == {"status": "active", "end_date": {"$lt": NOW}}